@@ -0,0 +1,244 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from chunk_store import MANIFEST_EXTENSION, is_manifest, load_manifest
+from utils import format_bytes
+
+CATALOG_FILE = "backup_catalog.json"
+CATALOG_VERSION = 1
+BACKUP_EXTENSIONS = (".zip", MANIFEST_EXTENSION)
+
+_lock = threading.Lock()
+
+
+def is_backup_file(name: str) -> bool:
+    """
+    Перевіряє, чи є файл резервною копією каси за його іменем.
+
+    Args:
+        name (str): Ім'я файлу.
+
+    Returns:
+        bool: True для ZIP-архівів і маніфестів із "_backup_" в імені.
+    """
+    return name.lower().endswith(BACKUP_EXTENSIONS) and "_backup_" in name.lower()
+
+
+def file_sha256(path: str) -> str:
+    """
+    Обчислює SHA256 файлу, читаючи його блоками.
+
+    Args:
+        path (str): Шлях до файлу.
+
+    Returns:
+        str: SHA256 у шістнадцятковому вигляді.
+
+    Raises:
+        OSError: Якщо файл недоступний.
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def _catalog_path(backup_dir: str) -> str:
+    return os.path.join(backup_dir, CATALOG_FILE)
+
+
+def _load(backup_dir: str) -> Dict[str, Dict]:
+    try:
+        with open(_catalog_path(backup_dir), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == CATALOG_VERSION and isinstance(data.get("backups"), dict):
+            return data["backups"]
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
+def _save(backup_dir: str, backups: Dict[str, Dict]) -> None:
+    path = _catalog_path(backup_dir)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": CATALOG_VERSION, "backups": backups}, f, indent=4, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def record_backup(backup_path: str, source_dir: str, identity: Optional[Dict] = None,
+                  member_count: Optional[int] = None, content_bytes: Optional[int] = None,
+                  sha256: Optional[str] = None) -> Dict:
+    """
+    Додає створену резервну копію до каталогу поруч із нею.
+
+    Значення, які не передано, обчислюються: для маніфесту — з його вмісту, контрольна сума —
+    читанням файлу.
+
+    Args:
+        backup_path (str): Шлях до ZIP-файлу або маніфесту.
+        source_dir (str): Директорія каси, з якої створено копію.
+        identity (Optional[Dict]): Версія та фіскальний номер каси (search_utils.read_register_identity).
+        member_count (Optional[int]): Кількість файлів у копії.
+        content_bytes (Optional[int]): Сумарний розмір файлів до стиснення.
+        sha256 (Optional[str]): SHA256 файлу копії.
+
+    Returns:
+        Dict: Запис каталогу.
+
+    Raises:
+        OSError, ValueError: Якщо копію або каталог неможливо прочитати чи записати.
+    """
+    if is_manifest(backup_path) and (member_count is None or content_bytes is None):
+        files = load_manifest(backup_path)["files"]
+        member_count = len(files)
+        content_bytes = sum(entry["size"] for entry in files)
+    identity = identity or {}
+    record = {
+        "file": os.path.basename(backup_path),
+        "source": os.path.basename(os.path.normpath(source_dir)),
+        "format": "incremental" if is_manifest(backup_path) else "zip",
+        "size": os.path.getsize(backup_path),
+        "content_bytes": content_bytes,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "fiscal_number": identity.get("fiscal_number", "Unknown"),
+        "version": identity.get("version", "Unknown"),
+        "member_count": member_count,
+        "sha256": sha256 or file_sha256(backup_path)
+    }
+    backup_dir = os.path.dirname(os.path.abspath(backup_path))
+    with _lock:
+        backups = _load(backup_dir)
+        backups[record["file"]] = record
+        _save(backup_dir, backups)
+    return record
+
+
+def update_backup(backup_path: str, **fields) -> None:
+    """
+    Оновлює поля запису каталогу для наявної копії (наприклад, результат перевірки).
+
+    Args:
+        backup_path (str): Шлях до копії.
+        **fields: Поля для оновлення.
+
+    Raises:
+        OSError: Якщо каталог неможливо записати.
+    """
+    backup_dir = os.path.dirname(os.path.abspath(backup_path))
+    name = os.path.basename(backup_path)
+    with _lock:
+        backups = _load(backup_dir)
+        if name in backups:
+            backups[name].update(fields)
+            _save(backup_dir, backups)
+
+
+def get_backup(backup_path: str) -> Optional[Dict]:
+    """
+    Повертає запис каталогу для копії.
+
+    Args:
+        backup_path (str): Шлях до копії.
+
+    Returns:
+        Optional[Dict]: Запис або None, якщо копії немає в каталозі.
+    """
+    return _load(os.path.dirname(os.path.abspath(backup_path))).get(os.path.basename(backup_path))
+
+
+def forget_backup(backup_path: str) -> None:
+    """
+    Видаляє копію з каталогу.
+
+    Args:
+        backup_path (str): Шлях до видаленої копії.
+
+    Raises:
+        OSError: Якщо каталог неможливо записати.
+    """
+    backup_dir = os.path.dirname(os.path.abspath(backup_path))
+    with _lock:
+        backups = _load(backup_dir)
+        if backups.pop(os.path.basename(backup_path), None) is not None:
+            _save(backup_dir, backups)
+
+
+def list_backups(backup_dir: str) -> List[Dict]:
+    """
+    Повертає резервні копії директорії з каталогу, від найновішої до найстарішої.
+
+    Каталог звіряється з одним os.listdir: записи видалених вручну файлів прибираються,
+    а копії, створені старими версіями програми, додаються з мінімальними метаданими
+    (розмір і дата з файлової системи) без відкриття архівів.
+
+    Args:
+        backup_dir (str): Директорія з резервними копіями (profiles).
+
+    Returns:
+        List[Dict]: Записи каталогу.
+    """
+    try:
+        names = {name for name in os.listdir(backup_dir) if is_backup_file(name)}
+    except OSError:
+        return []
+    with _lock:
+        backups = _load(backup_dir)
+        changed = False
+        for name in set(backups) - names:
+            del backups[name]
+            changed = True
+        for name in names - set(backups):
+            try:
+                stat = os.stat(os.path.join(backup_dir, name))
+            except OSError:
+                continue
+            backups[name] = {
+                "file": name,
+                "source": name.split("_backup_")[0],
+                "format": "incremental" if is_manifest(name) else "zip",
+                "size": stat.st_size,
+                "content_bytes": None,
+                "created": datetime.fromtimestamp(stat.st_mtime).isoformat(timespec="seconds"),
+                "fiscal_number": "Unknown",
+                "version": "Unknown",
+                "member_count": None,
+                "sha256": None
+            }
+            changed = True
+        if changed:
+            try:
+                _save(backup_dir, backups)
+            except OSError:
+                pass
+    return sorted(backups.values(), key=lambda record: record["created"], reverse=True)
+
+
+def describe_backup(record: Dict) -> str:
+    """
+    Формує короткий опис копії для меню.
+
+    Args:
+        record (Dict): Запис каталогу.
+
+    Returns:
+        str: Рядок із датою, розміром, версією, фіскальним номером, кількістю файлів і результатом перевірки.
+    """
+    size = record["content_bytes"] if record["format"] == "incremental" and record["content_bytes"] else record["size"]
+    parts = [record["created"].replace("T", " "), format_bytes(size)]
+    if record["format"] == "incremental":
+        parts[-1] += " incremental"
+    if record.get("version") not in (None, "Unknown"):
+        parts.append(f"v{record['version']}")
+    if record.get("fiscal_number") not in (None, "Unknown"):
+        parts.append(f"FN {record['fiscal_number']}")
+    if record.get("member_count") is not None:
+        parts.append(f"{record['member_count']} files")
+    if record.get("verified"):
+        parts.append("verified" if record["verified"]["ok"] else "CORRUPT")
+    return ", ".join(parts)
@@ -1,64 +1,296 @@
+import hashlib
 import os
-import zipfile
-import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from tqdm import tqdm
 from colorama import Fore, Style
 
-from utils import find_all_processes_by_name, launch_executable, manage_process_lifecycle, \
+from utils import find_all_processes_by_name, format_bytes, launch_executable, manage_process_lifecycle, \
     run_spinner
+from readiness import wait_for_cash_register
+from backup_writer import write_parallel_zip
+from compression_policy import DEFAULT_PROFILE
+from db_snapshot import is_side_file, snapshot_session
+from tree_scan import scan_tree
+from backup_catalog import forget_backup, get_backup, record_backup, update_backup
+from backup_retention import start_retention
+from search_utils import read_register_identity
+from chunk_store import collect_garbage, create_incremental_backup, is_manifest
+from diff_restore import differential_restore
+from tracing import annotate, traced
+from integrity import print_verification_report, verify_backups
+from config import BACKUP_JOBS_PER_DISK, VERIFY_BACKUPS
 
 
-def create_backup(target_dir: str) -> Optional[str]:
+def _add_to_catalog(backup_path: str, target_dir: str, identity: Dict, **metadata) -> None:
+    try:
+        record_backup(backup_path, target_dir, identity, **metadata)
+    except Exception as e:
+        print(f"{Fore.YELLOW}⚠ Failed to update backup catalog: {e}{Style.RESET_ALL}")
+
+
+@traced()
+def check_backups(backup_paths: Iterable[str]) -> Dict[str, bool]:
     """
-    Створює резервну копію вмісту вказаної директорії у форматі ZIP.
+    Перевіряє резервні копії та записує результат у каталог поруч із ними.
 
-    Функція архівує всі файли та піддиректорії вказаної директорії, створюючи ZIP-файл із назвою,
-    що включає базове ім'я директорії та позначку часу. Прогрес архівації відображається за допомогою tqdm.
+    Копії перевіряються паралельно (integrity.verify_backups): кожен член ZIP-архіву
+    перечитується з перевіркою CRC-32, для інкрементної копії — кожен її чанк із перевіркою SHA256.
+    У каталозі зберігається поле verified із результатом, часом перевірки, а також розміром
+    і часом зміни файлу, за якими restore_from_backup визначає, чи не змінилася копія відтоді.
 
     Args:
-        target_dir (str): Шлях до директорії, яку потрібно заархівувати.
+        backup_paths (Iterable[str]): Шляхи до ZIP-файлів або маніфестів.
 
     Returns:
-        Optional[str]: Шлях до створеного ZIP-файлу або None у разі помилки.
+        Dict[str, bool]: True для кожної цілої копії.
+    """
+    backup_paths = list(backup_paths)
+    if not backup_paths:
+        return {}
+    annotate(backups=len(backup_paths))
+    print(f"{Fore.YELLOW}Verifying {len(backup_paths)} backup(s)...{Style.RESET_ALL}")
+    results = verify_backups(backup_paths)
+    for backup_path, problems in results.items():
+        try:
+            stat = os.stat(backup_path)
+            update_backup(backup_path, verified={
+                "ok": not problems,
+                "checked": datetime.now().isoformat(timespec="seconds"),
+                "problems": len(problems),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns
+            })
+        except OSError as e:
+            print(f"{Fore.YELLOW}⚠ Failed to record verification of {os.path.basename(backup_path)}: {e}{Style.RESET_ALL}")
+    failed = print_verification_report({os.path.basename(path): problems for path, problems in results.items()})
+    return {path: os.path.basename(path) not in failed for path in backup_paths}
 
-    Raises:
-        Exception: Загальні помилки, такі як PermissionError або OSError, якщо архівація не вдалася.
+
+def _discard_backup(backup_path: str) -> None:
+    """
+    Видаляє копію, що не пройшла перевірку, щоб очищення не вважало її найновішою копією каси.
+    """
+    try:
+        os.remove(backup_path)
+        forget_backup(backup_path)
+        if is_manifest(backup_path):
+            collect_garbage(os.path.dirname(os.path.abspath(backup_path)))
+    except OSError as e:
+        print(f"{Fore.YELLOW}⚠ Failed to remove corrupt backup {os.path.basename(backup_path)}: {e}{Style.RESET_ALL}")
+
+
+def _is_verified(backup_path: str) -> Optional[bool]:
+    """
+    Повертає збережений результат перевірки, якщо копія не змінилася після неї.
+
+    Для інкрементних копій успішний результат не використовується повторно, бо їхні чанки
+    лежать у спільному сховищі й могли змінитися без зміни маніфесту.
     """
+    record = get_backup(backup_path)
+    verified = record.get("verified") if record else None
+    if not verified:
+        return None
+    if not verified["ok"]:
+        return False
+    try:
+        stat = os.stat(backup_path)
+    except OSError:
+        return None
+    if is_manifest(backup_path) or (stat.st_size, stat.st_mtime_ns) != (verified["size"], verified["mtime_ns"]):
+        return None
+    return True
+
+
+@traced("backup_restore.write_backup", arg="path")
+def _write_backup(target_dir: str, incremental: bool, profile: str, position: Optional[int] = None) -> Optional[str]:
+    identity = read_register_identity(target_dir)
+    if incremental:
+        backup_path = create_incremental_backup(target_dir, profile, position)
+        if backup_path:
+            _add_to_catalog(backup_path, target_dir, identity)
+        return backup_path
+
     print(f"{Fore.CYAN}📦 Creating backup for {os.path.basename(target_dir)}...{Style.RESET_ALL}")
     backup_name = f"{os.path.basename(target_dir)}_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
     backup_path = os.path.join(os.path.dirname(target_dir), backup_name)
 
     try:
-        with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            total_files = sum(len(files) for _, _, files in os.walk(target_dir))
-            with tqdm(total=total_files, desc="Creating backup",
-                      bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}]") as pbar:
-                for root, _, files in os.walk(target_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, target_dir)
-                        zipf.write(file_path, arcname)
-                        pbar.update(1)
+        with snapshot_session() as resolve, \
+                tqdm(total=0, unit='B', unit_scale=True, position=position,
+                     desc=os.path.basename(target_dir) if position is not None else "Creating backup",
+                     bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}, {rate_fmt}]") as pbar:
+            def sources():
+                for entry in scan_tree(target_dir, skip_file=is_side_file):
+                    source_path = resolve(entry.path)
+                    if source_path is None:
+                        continue
+                    if source_path == entry.path:
+                        pbar.total += entry.size
+                        yield source_path, entry.rel_path, entry.stat
+                    else:
+                        pbar.total += os.path.getsize(source_path)
+                        yield source_path, entry.rel_path
+
+            hasher = hashlib.sha256()
+            members = write_parallel_zip(backup_path + ".tmp", sources(), profile,
+                                         on_member=lambda info: pbar.update(info.file_size), hasher=hasher)
+        os.replace(backup_path + ".tmp", backup_path)
+        content_bytes = sum(member.file_size for member in members)
+        annotate(files=len(members), bytes=content_bytes)
+        _add_to_catalog(backup_path, target_dir, identity, member_count=len(members),
+                        content_bytes=content_bytes, sha256=hasher.hexdigest())
         print(f"{Fore.GREEN}✓ Backup created: {backup_name}{Style.RESET_ALL}")
-        run_spinner("Backup created", 1.0)
         return backup_path
     except Exception as e:
         print(f"{Fore.RED}✗ Failed to create backup: {e}{Style.RESET_ALL}")
-        run_spinner("Backup failed", 2.0)
         return None
 
 
+@traced(arg="path")
+def create_backup(target_dir: str, incremental: bool = False, profile: str = DEFAULT_PROFILE,
+                  verify: bool = VERIFY_BACKUPS) -> Optional[str]:
+    """
+    Створює резервну копію вмісту вказаної директорії у форматі ZIP або інкрементну копію.
+
+    Функція архівує всі файли та піддиректорії вказаної директорії, створюючи ZIP-файл із назвою,
+    що включає базове ім'я директорії та позначку часу. Дерево обходиться один раз через os.scandir,
+    і файли передаються на стиснення одразу під час обходу. Файли стискаються паралельно в пулі потоків,
+    а архів лишається стандартним ZIP. Метод стиснення кожного файлу обирається профілем політики
+    compression_policy: вже стиснуті формати зберігаються як є. Прогрес архівації в байтах відображається за допомогою tqdm.
+    Бази даних SQLite (зокрема agent.db) копіюються через онлайн backup API, тому каса може
+    залишатися запущеною під час створення копії.
+    Після створення копія з її метаданими (розмір, версія, фіскальний номер, кількість файлів,
+    SHA256) додається до каталогу backup_catalog, після чого у фоні запускається очищення старих
+    копій за політикою config.BACKUP_RETENTION.
+    Якщо verify увімкнено, створена копія перечитується і перевіряється (check_backups); копія,
+    що не пройшла перевірку, видаляється, і функція повертає None.
+    В інкрементному режимі замість ZIP створюється маніфест, а вміст зберігається у спільному сховищі чанків.
+
+    Для кількох кас одночасно див. create_backups.
+
+    Args:
+        target_dir (str): Шлях до директорії, яку потрібно заархівувати.
+        incremental (bool, optional): Створити інкрементну копію через сховище чанків. Defaults to False.
+        profile (str, optional): Профіль стиснення ("fast", "default", "max"). Defaults to DEFAULT_PROFILE.
+        verify (bool, optional): Перевірити копію після створення. Defaults to config.VERIFY_BACKUPS.
+
+    Returns:
+        Optional[str]: Шлях до створеного ZIP-файлу чи маніфесту або None у разі помилки.
+
+    Raises:
+        Exception: Загальні помилки, такі як PermissionError або OSError, якщо архівація не вдалася.
+    """
+    backup_path = _write_backup(target_dir, incremental, profile)
+    if backup_path and verify and not check_backups([backup_path])[backup_path]:
+        print(f"{Fore.RED}✗ Backup {os.path.basename(backup_path)} failed verification.{Style.RESET_ALL}")
+        _discard_backup(backup_path)
+        backup_path = None
+    if backup_path:
+        start_retention(os.path.dirname(os.path.abspath(backup_path)))
+    run_spinner("Backup created" if backup_path else "Backup failed", 1.0 if backup_path else 2.0)
+    return backup_path
+
+
+def _disk_key(path: str):
+    try:
+        return os.stat(path).st_dev
+    except OSError:
+        return os.path.splitdrive(os.path.abspath(path))[0].lower()
+
+
+@traced()
+def create_backups(target_dirs: List[str], incremental: bool = False, profile: str = DEFAULT_PROFILE,
+                   verify: bool = VERIFY_BACKUPS) -> Dict[str, Optional[str]]:
+    """
+    Створює резервні копії кількох кас одночасно (наприклад, усіх кас перед оновленням).
+
+    Каси групуються за диском, на якому лежать їхні директорії: на кожному диску одночасно
+    працює не більше config.BACKUP_JOBS_PER_DISK копій, щоб не змушувати один диск читати
+    кілька дерев урозкид, а різні диски працюють паралельно. Кожна каса має власний рядок
+    прогресу, а після завершення виводиться підсумок із загальною швидкістю. Створені копії
+    перевіряються разом (check_backups), копії, що не пройшли перевірку, видаляються, після чого
+    у фоні запускається очищення старих копій.
+
+    Args:
+        target_dirs (List[str]): Директорії кас.
+        incremental (bool, optional): Створювати інкрементні копії. Defaults to False.
+        profile (str, optional): Профіль стиснення ("fast", "default", "max"). Defaults to DEFAULT_PROFILE.
+        verify (bool, optional): Перевірити копії після створення. Defaults to config.VERIFY_BACKUPS.
+
+    Returns:
+        Dict[str, Optional[str]]: Шлях до копії для кожної директорії або None, якщо копію
+            створити чи перевірити не вдалося.
+    """
+    by_disk: Dict[object, List[Tuple[int, str]]] = {}
+    for position, target_dir in enumerate(target_dirs):
+        by_disk.setdefault(_disk_key(target_dir), []).append((position, target_dir))
+    print(f"{Fore.CYAN}📦 Creating backups of {len(target_dirs)} register(s) "
+          f"on {len(by_disk)} disk(s)...{Style.RESET_ALL}")
+
+    results: Dict[str, Optional[str]] = {}
+    durations: Dict[str, float] = {}
+
+    def run(job: Tuple[int, str]) -> None:
+        position, target_dir = job
+        started = time.monotonic()
+        try:
+            results[target_dir] = _write_backup(target_dir, incremental, profile, position)
+        except Exception as e:
+            print(f"{Fore.RED}✗ Failed to create backup of {os.path.basename(target_dir)}: {e}{Style.RESET_ALL}")
+            results[target_dir] = None
+        durations[target_dir] = time.monotonic() - started
+
+    started = time.monotonic()
+    pools = [ThreadPoolExecutor(max_workers=BACKUP_JOBS_PER_DISK) for _ in by_disk]
+    try:
+        futures = [pool.submit(run, job) for pool, jobs in zip(pools, by_disk.values()) for job in jobs]
+        for future in futures:
+            future.result()
+    finally:
+        for pool in pools:
+            pool.shutdown()
+    elapsed = time.monotonic() - started
+
+    created = [path for path in results.values() if path]
+    verified = check_backups(created) if verify else {path: True for path in created}
+    total_bytes = 0
+    print(f"\n{Fore.CYAN}Backup summary:{Style.RESET_ALL}")
+    for target_dir in target_dirs:
+        backup_path = results[target_dir]
+        name = os.path.basename(target_dir)
+        if not backup_path or not verified[backup_path]:
+            print(f"{Fore.RED}  ✗ {name}: failed ({durations[target_dir]:.1f}s){Style.RESET_ALL}")
+            if backup_path:
+                _discard_backup(backup_path)
+            results[target_dir] = None
+            continue
+        record = get_backup(backup_path) or {}
+        content_bytes = record.get("content_bytes") or 0
+        total_bytes += content_bytes
+        print(f"{Fore.GREEN}  ✓ {name}: {os.path.basename(backup_path)}, {format_bytes(content_bytes)} "
+              f"in {durations[target_dir]:.1f}s{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}Total: {format_bytes(total_bytes)} in {elapsed:.1f}s "
+          f"({format_bytes(int(total_bytes / max(elapsed, 0.001)))}/s){Style.RESET_ALL}")
+
+    for backup_dir in {os.path.dirname(os.path.abspath(path)) for path in results.values() if path}:
+        start_retention(backup_dir)
+    return results
+
+
+@traced(arg="path")
 def delete_backup(backup_path: str) -> bool:
     """
     Видаляє вказаний файл резервної копії.
 
     Функція намагається видалити ZIP-файл резервної копії за вказаним шляхом. У разі успіху
-    повертається True, у разі помилки — False.
+    повертається True, у разі помилки — False. Після видалення маніфесту зі сховища прибираються
+    чанки, на які більше не посилається жодна копія.
 
     Args:
-        backup_path (str): Шлях до ZIP-файлу резервної копії.
+        backup_path (str): Шлях до ZIP-файлу або маніфесту резервної копії.
 
     Returns:
         bool: True, якщо файл успішно видалено, False у разі помилки.
@@ -69,6 +301,14 @@ def delete_backup(backup_path: str) -> bool:
     print(f"{Fore.CYAN}🗑 Deleting backup {os.path.basename(backup_path)}...{Style.RESET_ALL}")
     try:
         os.remove(backup_path)
+        try:
+            forget_backup(backup_path)
+        except OSError as e:
+            print(f"{Fore.YELLOW}⚠ Failed to update backup catalog: {e}{Style.RESET_ALL}")
+        if is_manifest(backup_path):
+            freed = collect_garbage(os.path.dirname(os.path.abspath(backup_path)))
+            if freed:
+                print(f"{Fore.GREEN}✓ Freed {freed / 1024 / 1024:.1f} MB of unused chunks.{Style.RESET_ALL}")
         print(f"{Fore.GREEN}✓ Backup deleted successfully!{Style.RESET_ALL}")
         run_spinner("Backup deleted", 1.0)
         return True
@@ -78,20 +318,25 @@ def delete_backup(backup_path: str) -> bool:
         return False
 
 
+@traced(arg="path")
 def restore_from_backup(target_dir: str, backup_path: str, is_rro_agent: bool = False,
-                        is_paylink: bool = False) -> bool:
+                        is_paylink: bool = False, interactive: bool = True) -> bool:
     """
-    Відновлює вміст директорії з резервної копії у форматі ZIP.
+    Відновлює вміст директорії з резервної копії у форматі ZIP або з маніфесту інкрементної копії.
 
-    Функція зупиняє відповідні процеси, очищає цільову директорію, розпаковує файли з архіву
-    та запускає необхідні програми після відновлення. Якщо це RRO-агент, також призупиняються
-    та відновлюються процеси менеджера.
+    Перед зупинкою процесів копія перевіряється (check_backups), якщо її не було перевірено
+    після останньої зміни; пошкоджена копія не відновлюється. Далі функція зупиняє відповідні процеси, порівнює копію з поточним вмістом директорії за розміром
+    і CRC-32 та переписує лише файли, що відрізняються (див. diff_restore.differential_restore):
+    нова версія збирається у staging і підміняє директорію атомарно, тому збій посередині не
+    залишає порожньої директорії. Після відновлення запускаються необхідні програми. Якщо це
+    RRO-агент, також призупиняються та відновлюються процеси менеджера.
 
     Args:
         target_dir (str): Шлях до директорії, куди буде відновлено вміст.
-        backup_path (str): Шлях до ZIP-файлу резервної копії.
+        backup_path (str): Шлях до ZIP-файлу або маніфесту резервної копії.
         is_rro_agent (bool, optional): Чи є цільовим RRO-агент. Defaults to False.
         is_paylink (bool, optional): Чи є цільовим PayLink. Defaults to False.
+        interactive (bool, optional): Запитувати підтвердження перед зупинкою процесів. Defaults to True.
 
     Returns:
         bool: True, якщо відновлення успішне, False у разі помилки.
@@ -102,11 +347,19 @@ def restore_from_backup(target_dir: str, backup_path: str, is_rro_agent: bool =
     """
     print(f"{Fore.CYAN}🔄 Restoring backup {os.path.basename(backup_path)}...{Style.RESET_ALL}")
 
+    verified = _is_verified(backup_path)
+    if verified is None:
+        verified = check_backups([backup_path])[backup_path]
+    if not verified:
+        print(f"{Fore.RED}✗ Backup {os.path.basename(backup_path)} is corrupt, restore refused.{Style.RESET_ALL}")
+        run_spinner("Restore cancelled", 2.0)
+        return False
+
     processes_to_check = ["checkbox_kasa.exe"] if is_rro_agent else (
         ["CheckboxPayLink.exe", "POSServer.exe"] if is_paylink else ["kasa_manager.exe"])
 
     if not manage_process_lifecycle(processes_to_check, [target_dir], action="terminate",
-                                    prompt=True, spinner_message="Processes terminated", spinner_duration=2.0):
+                                    prompt=interactive, spinner_message="Processes terminated", spinner_duration=2.0):
         print(f"{Fore.RED}✗ Restoration cancelled due to process termination failure.{Style.RESET_ALL}")
         run_spinner("Restore cancelled", 2.0)
         return False
@@ -125,28 +378,10 @@ def restore_from_backup(target_dir: str, backup_path: str, is_rro_agent: bool =
             pass
 
     try:
-        print(f"{Fore.YELLOW}Clearing {target_dir}...{Style.RESET_ALL}")
-        for item in os.listdir(target_dir):
-            item_path = os.path.join(target_dir, item)
-            if os.path.isfile(item_path):
-                os.remove(item_path)
-            elif os.path.isdir(item_path):
-                shutil.rmtree(item_path)
-        print(f"{Fore.GREEN}✓ Directory cleared.{Style.RESET_ALL}")
-    except Exception as e:
-        print(f"{Fore.RED}✗ Failed to clear directory: {e}{Style.RESET_ALL}")
-        run_spinner("Clear failed", 2.0)
-        return False
-
-    try:
-        with zipfile.ZipFile(backup_path, 'r') as zip_ref:
-            total_files = len(zip_ref.infolist())
-            with tqdm(total=total_files, desc="Restoring files",
-                      bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}]") as pbar:
-                for file_info in zip_ref.infolist():
-                    zip_ref.extract(file_info, target_dir)
-                    pbar.update(1)
-        print(f"{Fore.GREEN}✓ Restored successfully to {target_dir}!{Style.RESET_ALL}")
+        summary = differential_restore(target_dir, backup_path)
+        print(f"{Fore.GREEN}✓ Restored successfully to {target_dir}! "
+              f"({summary['changed']} restored, {summary['unchanged']} unchanged, "
+              f"{summary['removed']} removed){Style.RESET_ALL}")
     except Exception as e:
         print(f"{Fore.RED}✗ Restore failed: {e}{Style.RESET_ALL}")
         run_spinner("Restore failed", 2.0)
@@ -154,7 +389,8 @@ def restore_from_backup(target_dir: str, backup_path: str, is_rro_agent: bool =
 
     try:
         if is_rro_agent:
-            launch_executable("checkbox_kasa.exe", target_dir, "Cash register", spinner_duration=10.0)
+            if launch_executable("checkbox_kasa.exe", target_dir, "Cash register", spinner_duration=0.0):
+                wait_for_cash_register(target_dir)
         elif is_paylink:
             launch_executable("CheckboxPayLink.exe", target_dir, "PayLink", spinner_duration=2.0)
         else:
@@ -0,0 +1,202 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from colorama import Fore, Style
+
+from backup_catalog import forget_backup, list_backups
+from chunk_store import collect_garbage, manifest_chunk_sizes
+from config import BACKUP_RETENTION
+from utils import format_bytes
+
+_running: Dict[str, threading.Thread] = {}
+_running_lock = threading.Lock()
+
+
+def _budget_cost(backup_dir: str, record: Dict, counted: Set[str]) -> Tuple[int, Iterable[str]]:
+    # Розмір копії для бюджету і чанки, які вона додає до вже врахованих
+    if record["format"] != "incremental":
+        return record["size"], ()
+    try:
+        sizes = manifest_chunk_sizes(os.path.join(backup_dir, record["file"]))
+    except (OSError, ValueError):
+        return record["size"], ()
+    return record["size"] + sum(size for digest, size in sizes.items() if digest not in counted), sizes
+
+
+def plan_retention(backup_dir: str, policy: Optional[Dict] = None,
+                   now: Optional[datetime] = None) -> List[Dict]:
+    """
+    Визначає, які резервні копії залишити, а які видалити, окремо для кожної каси.
+
+    Правила політики (значення None вимикає правило):
+    keep_last — залишити N найновіших копій; keep_daily_days — залишити найновішу копію
+    за кожен із останніх D днів; max_total_bytes — якщо залишені копії каси займають більше,
+    найстаріші з них також видаляються. Найновіша копія каси не видаляється ніколи.
+    Копії, що не пройшли перевірку (verified.ok == False), видаляються завжди й не вважаються
+    найновішими, тож через них не можуть бути видалені цілі старіші копії.
+    Інкрементна копія враховується як розмір маніфесту плюс чанки сховища, на які ще не
+    посилається жодна новіша залишена копія цієї каси, тож спільні чанки рахуються один раз.
+
+    Args:
+        backup_dir (str): Директорія з резервними копіями.
+        policy (Optional[Dict]): Політика зберігання. За замовчуванням config.BACKUP_RETENTION.
+        now (Optional[datetime]): Поточний час (для тестів). За замовчуванням datetime.now().
+
+    Returns:
+        List[Dict]: Записи каталогу з доданими полями action ("keep" або "delete") і reason.
+    """
+    policy = BACKUP_RETENTION if policy is None else policy
+    now = now or datetime.now()
+    keep_last = policy.get("keep_last")
+    keep_daily_days = policy.get("keep_daily_days")
+    max_total_bytes = policy.get("max_total_bytes")
+
+    by_source: Dict[str, List[Dict]] = {}
+    for record in list_backups(backup_dir):
+        by_source.setdefault(record["source"], []).append(dict(record))
+
+    plan = []
+    for records in by_source.values():
+        records.sort(key=lambda record: record["created"], reverse=True)
+        plan.extend(records)
+        for record in records:
+            if not (record.get("verified") or {}).get("ok", True):
+                record["action"], record["reason"] = "delete", "failed verification"
+        records = [record for record in records if "action" not in record]
+        seen_days = set()
+        for index, record in enumerate(records):
+            created = datetime.fromisoformat(record["created"])
+            if keep_last is None and keep_daily_days is None:
+                record["action"], record["reason"] = "keep", "no age rules"
+            elif index == 0 or (keep_last is not None and index < keep_last):
+                record["action"], record["reason"] = "keep", "latest" if index == 0 else f"last {keep_last}"
+            elif (keep_daily_days is not None and created >= now - timedelta(days=keep_daily_days)
+                  and created.date() not in seen_days):
+                record["action"], record["reason"] = "keep", f"daily for {keep_daily_days} days"
+            else:
+                record["action"], record["reason"] = "delete", "outside keep rules"
+            if record["action"] == "keep":
+                seen_days.add(created.date())
+
+        if max_total_bytes is not None:
+            total = 0
+            counted = set()
+            for index, record in enumerate(records):
+                if record["action"] != "keep":
+                    continue
+                cost, chunks = _budget_cost(backup_dir, record, counted)
+                total += cost
+                if index > 0 and total > max_total_bytes:
+                    record["action"], record["reason"] = "delete", f"over {format_bytes(max_total_bytes)} budget"
+                    total -= cost
+                else:
+                    counted.update(chunks)
+    return plan
+
+
+def apply_retention(backup_dir: str, plan: List[Dict]) -> Dict[str, int]:
+    """
+    Видаляє копії, позначені в плані, і прибирає невикористані чанки.
+
+    Args:
+        backup_dir (str): Директорія з резервними копіями.
+        plan (List[Dict]): Результат plan_retention.
+
+    Returns:
+        Dict[str, int]: Кількість видалених копій (deleted) і звільнених байтів (freed_bytes).
+    """
+    deleted = 0
+    freed = 0
+    manifests_removed = False
+    for record in plan:
+        if record["action"] != "delete":
+            continue
+        path = os.path.join(backup_dir, record["file"])
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            continue
+        forget_backup(path)
+        deleted += 1
+        freed += record["size"]
+        manifests_removed = manifests_removed or record["format"] == "incremental"
+    if manifests_removed:
+        freed += collect_garbage(backup_dir)
+    return {"deleted": deleted, "freed_bytes": freed}
+
+
+def print_retention_report(plan: List[Dict]) -> None:
+    """
+    Виводить звіт плану зберігання (dry run) згрупований за касами.
+
+    Args:
+        plan (List[Dict]): Результат plan_retention.
+    """
+    print(f"\n{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}")
+    print(f"{Fore.CYAN} BACKUP RETENTION (DRY RUN) {Style.RESET_ALL}")
+    print(f"{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}")
+    source = None
+    for record in plan:
+        if record["source"] != source:
+            source = record["source"]
+            print(f"\n{Fore.WHITE}{source}{Style.RESET_ALL}")
+        color = Fore.GREEN if record["action"] == "keep" else Fore.RED
+        print(f"  {color}{record['action'].upper():<6}{Style.RESET_ALL} {record['file']} "
+              f"({format_bytes(record['size'])}) - {record['reason']}")
+    to_delete = [record for record in plan if record["action"] == "delete"]
+    print(f"\n{Fore.CYAN}To delete: {len(to_delete)} backups, "
+          f"{format_bytes(sum(record['size'] for record in to_delete))}{Style.RESET_ALL}")
+
+
+def start_retention(backup_dir: str, policy: Optional[Dict] = None) -> Optional[threading.Thread]:
+    """
+    Запускає очищення резервних копій директорії у фоновому потоці.
+
+    Для однієї директорії одночасно працює не більше одного потоку. Потік нічого не виводить,
+    щоб не заважати меню; помилки ігноруються, бо очищення повториться після наступної копії.
+
+    Args:
+        backup_dir (str): Директорія з резервними копіями.
+        policy (Optional[Dict]): Політика зберігання. За замовчуванням config.BACKUP_RETENTION.
+
+    Returns:
+        Optional[threading.Thread]: Запущений потік або None, якщо очищення вже виконується.
+    """
+    key = os.path.normcase(os.path.abspath(backup_dir))
+
+    def run():
+        try:
+            apply_retention(backup_dir, plan_retention(backup_dir, policy))
+        except Exception:
+            pass
+        finally:
+            with _running_lock:
+                _running.pop(key, None)
+
+    with _running_lock:
+        if key in _running:
+            return None
+        thread = threading.Thread(target=run, name="backup-retention", daemon=True)
+        _running[key] = thread
+    thread.start()
+    return thread
+
+
+def wait_for_retention(timeout: Optional[float] = None) -> None:
+    """
+    Чекає завершення всіх фонових очищень, запущених start_retention.
+
+    Потоки очищення — демонічні, тож команда, яка завершує процес одразу після копіювання,
+    має викликати цю функцію, інакше очищення обірветься на півдорозі.
+
+    Args:
+        timeout (Optional[float]): Максимальний час очікування кожного потоку в секундах.
+    """
+    with _running_lock:
+        threads = list(_running.values())
+    for thread in threads:
+        thread.join(timeout)
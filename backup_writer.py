@@ -0,0 +1,296 @@
+import bz2
+import os
+import struct
+import tempfile
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Iterable, List, Optional, Tuple
+
+from compression_policy import DEFAULT_PROFILE, choose_compression
+
+READ_SIZE = 1024 * 1024
+SPOOL_LIMIT = 8 * 1024 * 1024
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP64_COUNT_LIMIT = 0xFFFF
+
+LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+CENTRAL_HEADER = struct.Struct("<4sBBBBHHHHIIIHHHHHII")
+END_RECORD = struct.Struct("<4sHHHHIIH")
+ZIP64_END_RECORD = struct.Struct("<4sQHHIIQQQQ")
+ZIP64_LOCATOR = struct.Struct("<4sIQI")
+
+FLAG_UTF8 = 0x800
+
+
+def default_workers() -> int:
+    """
+    Повертає розмір пулу для стиснення: zlib звільняє GIL, тому потоки завантажують усі ядра.
+
+    Returns:
+        int: Кількість потоків.
+    """
+    return os.cpu_count() or 1
+
+
+class _StoredCompressor:
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def flush(self) -> bytes:
+        return b""
+
+
+def _make_compressor(method: int, level: int):
+    if method == zipfile.ZIP_STORED:
+        return _StoredCompressor()
+    if method == zipfile.ZIP_DEFLATED:
+        return zlib.compressobj(level, zlib.DEFLATED, -15)
+    if method == zipfile.ZIP_BZIP2:
+        return bz2.BZ2Compressor(max(1, level))
+    raise ValueError(f"Unsupported compression method: {method}")
+
+
+def _zip_info(arcname: str, stat: os.stat_result) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(arcname, time.localtime(stat.st_mtime)[0:6])
+    info.external_attr = (stat.st_mode & 0xFFFF) << 16
+    info.file_size = stat.st_size
+    return info
+
+
+def compress_file(path: str, arcname: str, compression: Tuple[int, int] = (zipfile.ZIP_DEFLATED, 6),
+                  stat: Optional[os.stat_result] = None) -> Tuple[zipfile.ZipInfo, BinaryIO]:
+    """
+    Стискає файл обраним методом, одночасно обчислюючи CRC-32 і розміри.
+
+    Результат зберігається в SpooledTemporaryFile: невеликі файли лишаються в пам'яті,
+    великі — автоматично скидаються на диск.
+
+    Args:
+        path (str): Шлях до файлу.
+        arcname (str): Ім'я файлу в архіві.
+        compression (Tuple[int, int]): Метод стиснення ZIP (stored, deflate або bzip2) і рівень.
+            За замовчуванням deflate рівня 6.
+        stat (Optional[os.stat_result]): Уже отримані метадані файлу (наприклад, з DirEntry),
+            щоб не викликати stat повторно.
+
+    Returns:
+        Tuple[zipfile.ZipInfo, BinaryIO]: Заповнені метадані члена архіву та стиснуті дані,
+            перемотані на початок.
+
+    Raises:
+        OSError: Якщо файл неможливо прочитати.
+        ValueError: Якщо метод стиснення не підтримується.
+    """
+    method, level = compression
+    compressor = _make_compressor(method, level)
+    info = _zip_info(arcname, stat or os.stat(path))
+    info.compress_type = method
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_LIMIT)
+    try:
+        crc = 0
+        size = 0
+        with open(path, "rb") as f:
+            while True:
+                block = f.read(READ_SIZE)
+                if not block:
+                    break
+                crc = zlib.crc32(block, crc)
+                size += len(block)
+                spool.write(compressor.compress(block))
+        spool.write(compressor.flush())
+        info.CRC = crc
+        info.file_size = size
+        info.compress_size = spool.tell()
+        spool.seek(0)
+        return info, spool
+    except Exception:
+        spool.close()
+        raise
+
+
+def _compress_with_policy(path: str, arcname: str, profile: str,
+                          stat: Optional[os.stat_result]) -> Tuple[zipfile.ZipInfo, BinaryIO]:
+    return compress_file(path, arcname, choose_compression(path, profile), stat)
+
+
+def _dos_date_time(info: zipfile.ZipInfo) -> Tuple[int, int]:
+    year, month, day, hour, minute, second = info.date_time
+    dos_date = (max(year, 1980) - 1980) << 9 | month << 5 | day
+    dos_time = hour << 11 | minute << 5 | second // 2
+    return dos_date, dos_time
+
+
+def _extract_version(info: zipfile.ZipInfo, zip64: bool) -> int:
+    version = 46 if info.compress_type == zipfile.ZIP_BZIP2 else 20
+    return max(version, 45) if zip64 else version
+
+
+class ZipStreamWriter:
+    """
+    Записує вже стиснуті члени у стандартний ZIP-архів послідовно, у порядку додавання.
+
+    Розміри й CRC-32 кожного члена відомі до запису, тому дескриптори даних не потрібні.
+    Для великих файлів, зміщень і кількості членів автоматично використовується ZIP64.
+
+    Args:
+        fileobj (BinaryIO): Відкритий для запису файл архіву.
+        hasher (Optional): Об'єкт hashlib, який оновлюється всіма записаними байтами,
+            щоб контрольна сума архіву не вимагала його повторного читання.
+    """
+
+    def __init__(self, fileobj: BinaryIO, hasher=None):
+        self.fileobj = fileobj
+        self.hasher = hasher
+        self.members: List[zipfile.ZipInfo] = []
+        self._offset = 0
+
+    def _write(self, data: bytes) -> None:
+        self.fileobj.write(data)
+        if self.hasher is not None:
+            self.hasher.update(data)
+        self._offset += len(data)
+
+    def add(self, info: zipfile.ZipInfo, data: BinaryIO) -> None:
+        """
+        Додає стиснутий член до архіву.
+
+        Args:
+            info (zipfile.ZipInfo): Метадані з заповненими CRC, file_size і compress_size.
+            data (BinaryIO): Стиснуті дані, перемотані на початок.
+        """
+        name = info.filename.encode("utf-8")
+        flags = FLAG_UTF8 if not info.filename.isascii() else 0
+        zip64 = info.file_size >= ZIP64_LIMIT or info.compress_size >= ZIP64_LIMIT
+        extra = struct.pack("<HHQQ", 0x0001, 16, info.file_size, info.compress_size) if zip64 else b""
+        dos_date, dos_time = _dos_date_time(info)
+        info.header_offset = self._offset
+        info.flag_bits = flags
+        self._write(LOCAL_HEADER.pack(
+            b"PK\x03\x04", _extract_version(info, zip64), flags, info.compress_type, dos_time, dos_date,
+            info.CRC, ZIP64_LIMIT if zip64 else info.compress_size, ZIP64_LIMIT if zip64 else info.file_size,
+            len(name), len(extra)))
+        self._write(name + extra)
+        while True:
+            block = data.read(READ_SIZE)
+            if not block:
+                break
+            self._write(block)
+        self.members.append(info)
+
+    def finish(self) -> None:
+        """
+        Записує центральний каталог і кінцевий запис архіву.
+        """
+        start_dir = self._offset
+        for info in self.members:
+            name = info.filename.encode("utf-8")
+            values = []
+            file_size = info.file_size
+            compress_size = info.compress_size
+            header_offset = info.header_offset
+            if file_size >= ZIP64_LIMIT:
+                values.append(file_size)
+                file_size = ZIP64_LIMIT
+            if compress_size >= ZIP64_LIMIT:
+                values.append(compress_size)
+                compress_size = ZIP64_LIMIT
+            if header_offset >= ZIP64_LIMIT:
+                values.append(header_offset)
+                header_offset = ZIP64_LIMIT
+            extra = struct.pack(f"<HH{len(values)}Q", 0x0001, 8 * len(values), *values) if values else b""
+            dos_date, dos_time = _dos_date_time(info)
+            version = _extract_version(info, bool(values))
+            self._write(CENTRAL_HEADER.pack(
+                b"PK\x01\x02", version, info.create_system, version, 0, info.flag_bits, info.compress_type,
+                dos_time, dos_date, info.CRC, compress_size, file_size, len(name), len(extra), 0, 0, 0,
+                info.external_attr, header_offset))
+            self._write(name + extra)
+
+        dir_size = self._offset - start_dir
+        count = len(self.members)
+        if count >= ZIP64_COUNT_LIMIT or dir_size >= ZIP64_LIMIT or start_dir >= ZIP64_LIMIT:
+            zip64_end = self._offset
+            self._write(ZIP64_END_RECORD.pack(
+                b"PK\x06\x06", ZIP64_END_RECORD.size - 12, 45, 45, 0, 0, count, count, dir_size, start_dir))
+            self._write(ZIP64_LOCATOR.pack(b"PK\x06\x07", 0, zip64_end, 1))
+            self._write(END_RECORD.pack(b"PK\x05\x06", 0, 0, min(count, ZIP64_COUNT_LIMIT),
+                                        min(count, ZIP64_COUNT_LIMIT), min(dir_size, ZIP64_LIMIT),
+                                        min(start_dir, ZIP64_LIMIT), 0))
+        else:
+            self._write(END_RECORD.pack(b"PK\x05\x06", 0, 0, count, count, dir_size, start_dir, 0))
+
+
+def write_parallel_zip(zip_path: str, files: Iterable[Tuple], profile: str = DEFAULT_PROFILE,
+                       max_workers: Optional[int] = None,
+                       on_member: Optional[Callable[[zipfile.ZipInfo], None]] = None,
+                       hasher=None) -> List[zipfile.ZipInfo]:
+    """
+    Створює ZIP-архів, стискаючи файли паралельно в пулі потоків.
+
+    Метод і рівень стиснення кожного файлу обираються політикою compression_policy за профілем.
+    Файли стискаються одночасно, а готові дані записуються в архів строго в порядку переліку.
+    Кількість стиснутих, але ще не записаних членів обмежена подвоєним розміром пулу,
+    тому використання пам'яті не залежить від кількості файлів.
+    Файли, які зникли до початку стиснення, пропускаються. У разі іншої помилки частково
+    записаний архів видаляється.
+
+    Args:
+        zip_path (str): Шлях до архіву, що створюється.
+        files (Iterable[Tuple]): Пари (шлях до файлу, ім'я в архіві) або трійки з os.stat_result
+            третім елементом. Перелік споживається поступово, тому його можна передавати генератором.
+        profile (str): Профіль стиснення ("fast", "default", "max"). За замовчуванням DEFAULT_PROFILE.
+        max_workers (Optional[int]): Розмір пулу потоків. За замовчуванням default_workers().
+        on_member (Optional[Callable[[zipfile.ZipInfo], None]]): Викликається після запису кожного члена.
+        hasher (Optional): Об'єкт hashlib для контрольної суми всього архіву. За замовчуванням None.
+
+    Returns:
+        List[zipfile.ZipInfo]: Метадані записаних членів.
+
+    Raises:
+        OSError: Якщо файл неможливо прочитати або архів неможливо записати.
+    """
+    workers = max_workers or default_workers()
+    pending = deque()
+
+    def flush_one(writer: ZipStreamWriter) -> None:
+        try:
+            info, data = pending.popleft().result()
+        except FileNotFoundError:
+            # Файл зник після обходу директорії
+            return
+        try:
+            writer.add(info, data)
+        finally:
+            data.close()
+        if on_member:
+            on_member(info)
+
+    try:
+        with open(zip_path, "wb") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+            writer = ZipStreamWriter(out, hasher)
+            try:
+                for item in files:
+                    path, arcname = item[0], item[1].replace(os.sep, "/")
+                    stat = item[2] if len(item) > 2 else None
+                    pending.append(pool.submit(_compress_with_policy, path, arcname, profile, stat))
+                    if len(pending) >= workers * 2:
+                        flush_one(writer)
+                while pending:
+                    flush_one(writer)
+                writer.finish()
+            finally:
+                for future in pending:
+                    future.cancel()
+                for future in pending:
+                    if not future.cancelled() and future.exception() is None:
+                        future.result()[1].close()
+        return writer.members
+    except Exception:
+        try:
+            os.remove(zip_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,79 @@
+"""
+Порівнює послідовне створення резервної копії через zipfile з паралельним write_parallel_zip.
+
+Запуск з кореня репозиторію:
+    python benchmarks/bench_backup_writer.py --files 200 --size-kb 512
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backup_writer import default_workers, write_parallel_zip  # noqa: E402
+
+WORDS = [b"checkbox", b"receipt", b"shift", b"fiscal", b"agent", b"0000", b"ERROR", b"INFO", b"kasa", b"\n"]
+
+
+def build_tree(root: str, files: int, size: int) -> list:
+    rng = random.Random(42)
+    result = []
+    for i in range(files):
+        rel_path = os.path.join(f"dir_{i % 10}", f"file_{i}.log")
+        path = os.path.join(root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            data = bytearray()
+            while len(data) < size:
+                data += rng.choice(WORDS) + (os.urandom(4) if rng.random() < 0.1 else b" ")
+            f.write(bytes(data[:size]))
+        result.append((path, rel_path))
+    return result
+
+
+def sequential_zip(zip_path: str, files: list) -> None:
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for path, arcname in files:
+            zipf.write(path, arcname)
+
+
+def measure(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=512)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="cbx_bench_")
+    try:
+        files = build_tree(os.path.join(work_dir, "tree"), args.files, args.size_kb * 1024)
+        total_mb = args.files * args.size_kb / 1024
+        zip_path = os.path.join(work_dir, "out.zip")
+
+        baseline = measure(sequential_zip, zip_path, files)
+        print(f"Tree: {args.files} files, {total_mb:.1f} MB")
+        print(f"{'writer':<22}{'seconds':>10}{'MB/s':>10}{'speedup':>10}")
+        print(f"{'zipfile (sequential)':<22}{baseline:>10.2f}{total_mb / baseline:>10.1f}{1.0:>10.2f}")
+
+        workers = sorted({1, 2, 4, default_workers()})
+        for count in workers:
+            elapsed = measure(lambda: write_parallel_zip(zip_path, files, max_workers=count))
+            with zipfile.ZipFile(zip_path) as zip_ref:
+                assert zip_ref.testzip() is None
+            print(f"{f'parallel x{count}':<22}{elapsed:>10.2f}{total_mb / elapsed:>10.1f}{baseline / elapsed:>10.2f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
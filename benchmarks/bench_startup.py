@@ -0,0 +1,150 @@
+"""
+Вимірює швидкість запуску програми: час імпорту кожного модуля (python -X importtime)
+і час від старту інтерпретатора до першого відображення головного меню.
+
+Мережеві запити під час вимірювання підміняються готовими даними, а штучні паузи
+вимкнено (CBX_NO_DELAY=1), тож враховується лише власний час запуску. Якщо медіана
+перевищує бюджет із startup_budget.json або під час "import main" завантажується модуль
+зі списку deferred_modules, бенчмарк завершується з кодом 1.
+
+Запуск з кореня репозиторію:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 9 --top 30
+    python benchmarks/bench_startup.py --write-budget
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+FIRST_MENU_MARKER = "CBX_FIRST_MENU"
+
+FIRST_MENU_DRIVER = f"""
+import os, sys
+sys.path.insert(0, {ROOT!r})
+import main as app
+import menu, network
+data = {{
+    "legacy": {{"kasa_manager": [], "rro_agent": [], "cloudlike": []}},
+    "dev": {{"kasa_manager": [], "rro_agent": [], "paylink": []}},
+    "tools": {{"paylink": {{"terminal_drivers": [], "os_tools": []}},
+              "rro_agent_tools": {{"diagnostics": [], "config_tools": []}}}}
+}}
+network.check_for_updates = lambda: (False, "", "")
+network.fetch_json = lambda url: data
+def first_menu(*args, **kwargs):
+    sys.stdout.flush()
+    sys.stderr.write({FIRST_MENU_MARKER!r} + "\\n")
+    sys.stderr.flush()
+    os._exit(0)
+menu.display_menu = first_menu
+app.main()
+"""
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["CBX_NO_DELAY"] = "1"
+    return env
+
+
+def parse_importtime(output: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Розбирає вивід -X importtime у словник {модуль: (власний час, сукупний час)} у мікросекундах.
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure_imports(runs: int) -> Dict[str, Tuple[float, float]]:
+    samples: Dict[str, List[Tuple[int, int]]] = {}
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                                cwd=ROOT, env=_env(), capture_output=True, text=True, check=True)
+        for name, times in parse_importtime(result.stderr).items():
+            samples.setdefault(name, []).append(times)
+    return {name: (statistics.median(t[0] for t in times) / 1000, statistics.median(t[1] for t in times) / 1000)
+            for name, times in samples.items()}
+
+
+def measure_first_menu(runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", FIRST_MENU_DRIVER], cwd=ROOT, env=_env(),
+                                capture_output=True, text=True, stdin=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        if FIRST_MENU_MARKER not in result.stderr:
+            raise RuntimeError(f"main menu was not reached:\n{result.stdout}\n{result.stderr}")
+        timings.append(elapsed * 1000)
+    return statistics.median(timings)
+
+
+def load_budget(path: str) -> Dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="runs per measurement (the median is reported)")
+    parser.add_argument("--top", type=int, default=20, help="modules to list by cumulative import time")
+    parser.add_argument("--budget", default=BUDGET_FILE)
+    parser.add_argument("--write-budget", action="store_true",
+                        help="store the measured times plus --headroom as the new budget")
+    parser.add_argument("--headroom", type=float, default=0.5, help="budget margin for --write-budget")
+    args = parser.parse_args()
+
+    # Прогрів: перший запуск компілює .pyc і не відображає звичайного старту
+    measure_imports(1)
+    modules = measure_imports(args.runs)
+    import_main_ms = modules.get("main", (0.0, 0.0))[1]
+    first_menu_ms = measure_first_menu(args.runs)
+
+    print(f"{'module':<40}{'self ms':>10}{'cumul ms':>10}")
+    for name, (self_ms, cumulative_ms) in sorted(modules.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"{name:<40}{self_ms:>10.1f}{cumulative_ms:>10.1f}")
+    print(f"\nimport main:    {import_main_ms:8.1f} ms")
+    print(f"first menu:     {first_menu_ms:8.1f} ms (includes interpreter startup)")
+
+    budget = load_budget(args.budget)
+    if args.write_budget:
+        budget.update(import_main_ms=round(import_main_ms * (1 + args.headroom)),
+                      first_menu_ms=round(first_menu_ms * (1 + args.headroom)))
+        with open(args.budget, "w", encoding="utf-8") as f:
+            json.dump(budget, f, indent=4)
+            f.write("\n")
+        print(f"Budget written to {args.budget}")
+        return
+
+    failures = []
+    for key, measured in (("import_main_ms", import_main_ms), ("first_menu_ms", first_menu_ms)):
+        if key in budget and measured > budget[key]:
+            failures.append(f"{key}: {measured:.1f} ms > budget {budget[key]} ms")
+    failures.extend(f"{name} is imported by 'import main' but should be deferred"
+                    for name in budget.get("deferred_modules", []) if name in modules)
+    if failures:
+        print("\nStartup budget exceeded:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    if budget:
+        print("\nStartup budget OK")
+
+
+if __name__ == "__main__":
+    main()
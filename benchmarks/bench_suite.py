@@ -0,0 +1,259 @@
+"""
+Набір бенчмарків гарячих шляхів на синтетичних даних: пошук кас на диску, читання стану каси
+з agent.db, завантаження файлу з локального HTTP-сервера, розпакування патча в кілька кас,
+створення резервної копії (ZIP та інкрементної) і відновлення з неї.
+
+Кожен випадок виконується --repeat разів, у результат іде медіана. Результати записуються
+в JSON; якщо є базовий файл із тими самими параметрами, кожен випадок порівнюється з ним,
+і бенчмарк завершується з кодом 1, коли медіана повільніша за базову більше ніж на --tolerance.
+Базові значення залежать від машини, тому їх слід оновлювати (--write-baseline) на тій самій
+машині, на якій виконується порівняння.
+
+Запуск з кореня репозиторію:
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --only download_file,create_backup_zip --repeat 5
+    python benchmarks/bench_suite.py --register-files 2000 --latency-ms 50 --bandwidth-mbps 20
+    python benchmarks/bench_suite.py --write-baseline
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import (build_drive_tree, build_patch_zip, build_register,  # noqa: E402
+                                 serve_directory)
+from backup_restore import create_backup, restore_from_backup  # noqa: E402
+from network import download_file  # noqa: E402
+from patching import extract_to_multiple_dirs  # noqa: E402
+from search_utils import find_cash_registers_by_exe, get_cash_register_info, reset_cache  # noqa: E402
+from utils import set_no_delay  # noqa: E402
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Випадок готує дані в робочій директорії й повертає функцію, яку вимірюють; ресурси
+# (наприклад, HTTP-сервер) реєструються в ExitStack і звільняються після випадку
+Case = Callable[[str, argparse.Namespace, contextlib.ExitStack], Callable[[], Optional[Dict]]]
+
+
+@contextlib.contextmanager
+def _quiet():
+    with open(os.devnull, "w", encoding="utf-8") as devnull, \
+            contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        yield
+
+
+def case_find_cash_registers(work_dir: str, args: argparse.Namespace, stack: contextlib.ExitStack):
+    root = os.path.join(work_dir, "drive")
+    expected = build_drive_tree(root, args.tree_depth, args.tree_fanout, args.tree_files, args.registers)
+
+    def run():
+        reset_cache()
+        found = find_cash_registers_by_exe(None, [root], max_depth=args.tree_depth + 1, use_cache=False)
+        assert len(found) == len(expected), f"found {len(found)} of {len(expected)} registers"
+        return {"registers": len(found)}
+    return run
+
+
+def case_get_cash_register_info(work_dir: str, args: argparse.Namespace, stack: contextlib.ExitStack):
+    path = os.path.join(work_dir, "kasa")
+    build_register(path, files=0, file_size=0, transactions=args.transactions, shifts=args.shifts)
+
+    def run():
+        info = get_cash_register_info(path)
+        assert info["health"] == "OK", info
+        return {"transactions": args.transactions}
+    return run
+
+
+def case_download_file(work_dir: str, args: argparse.Namespace, stack: contextlib.ExitStack):
+    served = os.path.join(work_dir, "served")
+    os.makedirs(served)
+    size = build_patch_zip(os.path.join(served, "patch.zip"), args.patch_files, args.patch_file_kb * 1024)
+    target = os.path.join(work_dir, "patch.zip")
+    base_url = stack.enter_context(serve_directory(served, latency=args.latency_ms / 1000,
+                                                   bandwidth=int(args.bandwidth_mbps * 1024 * 1024 / 8)))
+
+    def run():
+        if os.path.exists(target):
+            os.remove(target)
+        assert download_file(f"{base_url}/patch.zip", target), "download failed"
+        return {"bytes": size}
+    return run
+
+
+def case_extract_to_multiple_dirs(work_dir: str, args: argparse.Namespace, stack: contextlib.ExitStack):
+    zip_path = os.path.join(work_dir, "patch.zip")
+    build_patch_zip(zip_path, args.patch_files, args.patch_file_kb * 1024, depth=args.patch_depth)
+    target_dirs = [os.path.join(work_dir, f"kasa_{i}") for i in range(args.patch_targets)]
+
+    def run():
+        for target_dir in target_dirs:
+            shutil.rmtree(target_dir, ignore_errors=True)
+            os.makedirs(target_dir)
+        with zipfile.ZipFile(zip_path) as zip_ref:
+            extract_to_multiple_dirs(zip_ref, target_dirs, len(zip_ref.infolist()))
+        return {"files": args.patch_files * len(target_dirs)}
+    return run
+
+
+def _backup_case(incremental: bool) -> Case:
+    def case(work_dir: str, args: argparse.Namespace, stack: contextlib.ExitStack):
+        path = os.path.join(work_dir, "profiles", "kasa")
+        build_register(path, args.register_files, args.register_file_kb * 1024, args.transactions, args.shifts)
+
+        def run():
+            backup_path = create_backup(path, incremental=incremental, verify=False)
+            assert backup_path, "backup failed"
+            return {"files": args.register_files + 3}
+        return run
+    return case
+
+
+def case_restore_from_backup(work_dir: str, args: argparse.Namespace, stack: contextlib.ExitStack):
+    path = os.path.join(work_dir, "profiles", "kasa")
+    build_register(path, args.register_files, args.register_file_kb * 1024, args.transactions, args.shifts)
+    with _quiet():
+        backup_path = create_backup(path, verify=True)
+    data_files = sorted(os.path.join(root, name) for root, _, names in os.walk(os.path.join(path, "data"))
+                        for name in names)
+
+    def run():
+        # Кожен десятий файл змінюється, щоб відновлення переписувало частину файлів
+        for file_path in data_files[::10]:
+            with open(file_path, "ab") as f:
+                f.write(b"changed")
+        assert restore_from_backup(path, backup_path, interactive=False), "restore failed"
+        return {"files": args.register_files + 3}
+    return run
+
+
+CASES: Dict[str, Case] = {
+    "find_cash_registers_by_exe": case_find_cash_registers,
+    "get_cash_register_info": case_get_cash_register_info,
+    "download_file": case_download_file,
+    "extract_to_multiple_dirs": case_extract_to_multiple_dirs,
+    "create_backup_zip": _backup_case(incremental=False),
+    "create_backup_incremental": _backup_case(incremental=True),
+    "restore_from_backup": case_restore_from_backup,
+}
+PARAMETERS = ("tree_depth", "tree_fanout", "tree_files", "registers", "transactions", "shifts", "patch_files",
+              "patch_file_kb", "patch_depth", "patch_targets", "register_files", "register_file_kb",
+              "latency_ms", "bandwidth_mbps")
+
+
+def run_case(name: str, args: argparse.Namespace) -> Dict:
+    work_dir = tempfile.mkdtemp(prefix=f"cbx_bench_{name}_")
+    try:
+        with contextlib.ExitStack() as stack:
+            run = CASES[name](work_dir, args, stack)
+            timings = []
+            info = {}
+            for _ in range(args.repeat):
+                with _quiet():
+                    started = time.perf_counter()
+                    info = run() or {}
+                    timings.append(time.perf_counter() - started)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    median = statistics.median(timings)
+    result = {"median_s": round(median, 4), "runs_s": [round(t, 4) for t in timings], **info}
+    if "bytes" in info:
+        result["mb_per_s"] = round(info["bytes"] / 1024 / 1024 / median, 2)
+    if "files" in info:
+        result["files_per_s"] = round(info["files"] / median, 1)
+    return result
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[Tuple[str, float, float]]:
+    """
+    Повертає випадки, медіана яких повільніша за базову більше ніж на tolerance.
+    """
+    regressions = []
+    for name, result in results["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base and result["median_s"] > base["median_s"] * (1 + tolerance):
+            regressions.append((name, base["median_s"], result["median_s"]))
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", help="comma-separated case names (default: all)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tree-depth", type=int, default=3)
+    parser.add_argument("--tree-fanout", type=int, default=6)
+    parser.add_argument("--tree-files", type=int, default=20, help="small files per directory")
+    parser.add_argument("--registers", type=int, default=8)
+    parser.add_argument("--transactions", type=int, default=20000)
+    parser.add_argument("--shifts", type=int, default=500)
+    parser.add_argument("--patch-files", type=int, default=300)
+    parser.add_argument("--patch-file-kb", type=int, default=32)
+    parser.add_argument("--patch-depth", type=int, default=3)
+    parser.add_argument("--patch-targets", type=int, default=3, help="registers to extract the patch into")
+    parser.add_argument("--register-files", type=int, default=500)
+    parser.add_argument("--register-file-kb", type=int, default=64)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--bandwidth-mbps", type=float, default=0.0, help="0 means unlimited")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--write-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.only.split(",")] if args.only else list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)} (available: {', '.join(CASES)})")
+
+    set_no_delay(True)
+    results = {
+        "parameters": {name: getattr(args, name) for name in PARAMETERS},
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "results": {}
+    }
+    print(f"{'case':<30}{'median s':>10}{'MB/s':>10}{'files/s':>12}")
+    for name in names:
+        result = run_case(name, args)
+        results["results"][name] = result
+        print(f"{name:<30}{result['median_s']:>10.3f}{result.get('mb_per_s', ''):>10}"
+              f"{result.get('files_per_s', ''):>12}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+    print(f"\nResults written to {args.output}")
+
+    if args.write_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    try:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        print("No baseline to compare with.")
+        return
+    if baseline.get("parameters") != results["parameters"]:
+        print("Baseline was recorded with different parameters, comparison skipped.")
+        return
+    regressions = compare(results, baseline, args.tolerance)
+    for name, before, after in regressions:
+        print(f"REGRESSION {name}: {before:.3f}s -> {after:.3f}s ({(after / before - 1) * 100:+.0f}%)")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions beyond {args.tolerance:.0%} of the baseline.")
+
+
+if __name__ == "__main__":
+    main()
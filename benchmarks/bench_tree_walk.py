@@ -0,0 +1,99 @@
+"""
+Порівнює обхід дерева для резервної копії: старий (підрахунок через os.walk, потім другий
+os.walk зі stat для кожного файлу) і новий однопрохідний scan_tree на os.scandir.
+
+Запуск з кореня репозиторію:
+    python benchmarks/bench_tree_walk.py --files 200000
+    python benchmarks/bench_tree_walk.py --files 20000 --archive
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backup_writer import write_parallel_zip  # noqa: E402
+from tree_scan import scan_tree  # noqa: E402
+
+FILES_PER_DIR = 200
+
+
+def build_tree(root: str, files: int) -> None:
+    for i in range(files):
+        directory = os.path.join(root, f"d{i // (FILES_PER_DIR * 50)}", f"s{i // FILES_PER_DIR}")
+        if i % FILES_PER_DIR == 0:
+            os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"f{i}.txt"), "wb") as f:
+            f.write(b"x" * (i % 512))
+
+
+def two_pass_walk(root: str) -> int:
+    total_files = sum(len(files) for _, _, files in os.walk(root))
+    total_bytes = 0
+    for current, _, files in os.walk(root):
+        for name in files:
+            total_bytes += os.stat(os.path.join(current, name)).st_size
+    return total_files + total_bytes
+
+
+def single_pass_scan(root: str) -> int:
+    total_files = 0
+    total_bytes = 0
+    for entry in scan_tree(root):
+        total_files += 1
+        total_bytes += entry.size
+    return total_files + total_bytes
+
+
+def two_pass_archive(root: str, zip_path: str) -> None:
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+        sum(len(files) for _, _, files in os.walk(root))
+        for current, _, files in os.walk(root):
+            for name in files:
+                path = os.path.join(current, name)
+                zipf.write(path, os.path.relpath(path, root))
+
+
+def streaming_archive(root: str, zip_path: str) -> None:
+    write_parallel_zip(zip_path, ((e.path, e.rel_path, e.stat) for e in scan_tree(root)))
+
+
+def measure(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=200000)
+    parser.add_argument("--archive", action="store_true", help="also compare full archive creation")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="cbx_bench_")
+    try:
+        tree = os.path.join(work_dir, "tree")
+        print(f"Building tree with {args.files} files...")
+        build_tree(tree, args.files)
+        assert two_pass_walk(tree) == single_pass_scan(tree)
+
+        rows = [("os.walk x2 + stat", measure(two_pass_walk, tree)),
+                ("scan_tree (scandir)", measure(single_pass_scan, tree))]
+        if args.archive:
+            zip_path = os.path.join(work_dir, "out.zip")
+            rows.append(("archive: walk x2 + zipfile", measure(two_pass_archive, tree, zip_path)))
+            rows.append(("archive: scan_tree streaming", measure(streaming_archive, tree, zip_path)))
+
+        print(f"{'method':<30}{'seconds':>10}{'files/s':>12}")
+        for name, elapsed in rows:
+            print(f"{name:<30}{elapsed:>10.2f}{args.files / elapsed:>12.0f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Синтетичні дані для бенчмарків: дерева директорій із касами, бази agent.db, ZIP-патчі
+та локальний HTTP-сервер із заданою затримкою і пропускною здатністю.
+
+Усі генератори детерміновані (фіксований seed), тож однакові параметри дають однакові дані.
+"""
+import os
+import random
+import sqlite3
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List
+
+WORDS = [b"checkbox", b"receipt", b"shift", b"fiscal", b"agent", b"0000", b"ERROR", b"INFO", b"kasa", b"\n"]
+
+
+def _payload(rng: random.Random, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        data += rng.choice(WORDS) + (bytes(rng.getrandbits(8) for _ in range(4)) if rng.random() < 0.1 else b" ")
+    return bytes(data[:size])
+
+
+def build_agent_db(path: str, transactions: int, shifts: int, fiscal_number: str = "4000000001") -> None:
+    """
+    Створює agent.db зі структурою, яку читає search_utils.get_cash_register_info.
+
+    Args:
+        path (str): Шлях до файлу бази.
+        transactions (int): Кількість транзакцій (усі зі статусом DONE).
+        shifts (int): Кількість змін; остання відкрита.
+        fiscal_number (str): Фіскальний номер каси.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("CREATE TABLE cash_register (fiscal_number TEXT)")
+        conn.execute("INSERT INTO cash_register (fiscal_number) VALUES (?)", (fiscal_number,))
+        conn.execute("CREATE TABLE transactions (id INTEGER PRIMARY KEY, status TEXT, payload TEXT)")
+        conn.executemany("INSERT INTO transactions (status, payload) VALUES ('DONE', ?)",
+                         ((f"receipt {i} " * 8,) for i in range(transactions)))
+        conn.execute("CREATE TABLE shifts (id INTEGER PRIMARY KEY, status TEXT)")
+        conn.executemany("INSERT INTO shifts (status) VALUES (?)",
+                         (("opened" if i == shifts - 1 else "closed",) for i in range(shifts)))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def build_register(path: str, files: int, file_size: int, transactions: int, shifts: int, seed: int = 0) -> None:
+    """
+    Створює директорію каси: checkbox_kasa.exe, version, agent.db і файли даних.
+
+    Args:
+        path (str): Директорія каси.
+        files (int): Кількість додаткових файлів.
+        file_size (int): Розмір кожного файлу в байтах.
+        transactions (int): Кількість транзакцій в agent.db.
+        shifts (int): Кількість змін в agent.db.
+        seed (int): Seed генератора вмісту.
+    """
+    rng = random.Random(seed)
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "checkbox_kasa.exe"), "wb") as f:
+        f.write(b"MZ" + _payload(rng, 4096))
+    with open(os.path.join(path, "version"), "w", encoding="utf-8") as f:
+        f.write("1.4.2")
+    build_agent_db(os.path.join(path, "agent.db"), transactions, shifts, fiscal_number=f"40000{seed:05d}")
+    for i in range(files):
+        file_path = os.path.join(path, "data", f"d{i % 8}", f"file_{i}.log")
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "wb") as f:
+            f.write(_payload(rng, file_size))
+
+
+def build_drive_tree(root: str, depth: int, fanout: int, files_per_dir: int, registers: int) -> List[str]:
+    """
+    Створює дерево директорій заданої глибини з касами (checkbox_kasa.exe) на найглибшому рівні.
+
+    Args:
+        root (str): Корінь дерева (імітує диск).
+        depth (int): Глибина дерева.
+        fanout (int): Кількість піддиректорій на кожному рівні.
+        files_per_dir (int): Кількість дрібних файлів у кожній директорії.
+        registers (int): Кількість кас, розподілених по листових директоріях.
+
+    Returns:
+        List[str]: Шляхи до створених директорій кас.
+    """
+    levels = [[root]]
+    for level in range(depth):
+        levels.append([os.path.join(parent, f"dir{level}_{i}") for parent in levels[-1] for i in range(fanout)])
+    for directory in (directory for level in levels for directory in level):
+        os.makedirs(directory, exist_ok=True)
+        for i in range(files_per_dir):
+            with open(os.path.join(directory, f"note_{i}.txt"), "wb") as f:
+                f.write(b"x" * 64)
+    leaves = levels[-1]
+    registers_paths = []
+    step = max(1, len(leaves) // max(registers, 1))
+    for index, leaf in enumerate(leaves[::step][:registers]):
+        path = os.path.join(leaf, f"kasa_{index}")
+        build_register(path, files=4, file_size=1024, transactions=10, shifts=2, seed=index)
+        registers_paths.append(path)
+    return registers_paths
+
+
+def build_patch_zip(path: str, files: int, file_size: int, depth: int = 2, seed: int = 1) -> int:
+    """
+    Створює ZIP-патч із заданою кількістю файлів і вкладеністю директорій.
+
+    Args:
+        path (str): Шлях до ZIP-файлу.
+        files (int): Кількість файлів.
+        file_size (int): Розмір кожного файлу в байтах.
+        depth (int): Глибина вкладеності директорій у патчі.
+        seed (int): Seed генератора вмісту.
+
+    Returns:
+        int: Розмір ZIP-файлу в байтах.
+    """
+    rng = random.Random(seed)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+        for i in range(files):
+            parts = [f"level{level}_{i % (level + 2)}" for level in range(depth)]
+            zip_ref.writestr("/".join(parts + [f"file_{i}.js"]), _payload(rng, file_size))
+    return os.path.getsize(path)
+
+
+class ThrottledHandler(SimpleHTTPRequestHandler):
+    """
+    Обробник статичних файлів із затримкою відповіді, обмеженням швидкості та підтримкою Range.
+    """
+
+    latency = 0.0
+    bandwidth = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_head(self):
+        time.sleep(self.latency)
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return None
+        size = os.path.getsize(path)
+        start = 0
+        range_header = self.headers.get("Range", "")
+        if range_header.startswith("bytes="):
+            start = min(int(range_header[6:].split("-")[0] or 0), size)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{size - 1}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(size - start))
+        self.end_headers()
+        f = open(path, "rb")
+        f.seek(start)
+        return f
+
+    def copyfile(self, source, outputfile):
+        chunk_size = 64 * 1024
+        started = time.perf_counter()
+        sent = 0
+        for chunk in iter(lambda: source.read(chunk_size), b""):
+            outputfile.write(chunk)
+            sent += len(chunk)
+            if self.bandwidth:
+                delay = sent / self.bandwidth - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+
+
+@contextmanager
+def serve_directory(directory: str, latency: float = 0.0, bandwidth: int = 0) -> Iterator[str]:
+    """
+    Запускає локальний HTTP-сервер для файлів директорії.
+
+    Args:
+        directory (str): Директорія з файлами.
+        latency (float): Затримка перед кожною відповіддю в секундах.
+        bandwidth (int): Обмеження швидкості в байтах за секунду (0 — без обмеження).
+
+    Yields:
+        str: Базовий URL сервера, наприклад "http://127.0.0.1:54321".
+    """
+    handler = type("Handler", (ThrottledHandler,), {"latency": latency, "bandwidth": bandwidth})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), lambda *args: handler(*args, directory=directory))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,273 @@
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Очікувана структура відповіді API версій: канал -> продукти зі списками інсталяторів
+RELEASE_SCHEMA: Dict[str, Tuple[str, ...]] = {
+    "legacy": ("kasa_manager", "rro_agent", "cloudlike"),
+    "dev": ("kasa_manager", "rro_agent", "paylink"),
+}
+# Канали та продукти, для яких меню пропонує патчі
+PATCH_SCHEMA: Dict[str, Tuple[str, ...]] = {
+    "legacy": ("kasa_manager", "rro_agent"),
+    "dev": ("kasa_manager", "rro_agent", "paylink"),
+}
+# Групи інструментів у розділі "tools"
+TOOL_SCHEMA: Dict[str, Tuple[str, ...]] = {
+    "paylink": ("terminal_drivers", "os_tools"),
+    "rro_agent_tools": ("diagnostics", "config_tools"),
+}
+
+_cache_lock = threading.Lock()
+_cached: Optional[Tuple[Dict, "Catalog"]] = None
+
+
+class CatalogError(ValueError):
+    """
+    Відповідь API версій не відповідає очікуваній структурі.
+    """
+
+
+class Patch:
+    """
+    Патч продукту.
+
+    Args:
+        name (str): Ім'я файлу патча.
+        url (str): URL для завантаження.
+        sha256 (str): Очікуваний SHA256 або порожній рядок.
+    """
+
+    __slots__ = ("name", "url", "sha256")
+
+    def __init__(self, name: str, url: str, sha256: str = ""):
+        self.name = name
+        self.url = url
+        self.sha256 = sha256
+
+    def to_dict(self) -> Dict[str, str]:
+        """
+        Повертає патч у форматі, який приймає patching.patch_file.
+        """
+        return {"patch_name": self.name, "patch_url": self.url, "sha256": self.sha256}
+
+
+class Installer:
+    """
+    Інсталятор продукту з каналу legacy або dev.
+
+    Args:
+        channel (str): Канал ("legacy" або "dev").
+        product (str): Продукт ("kasa_manager", "rro_agent", "cloudlike", "paylink").
+        raw (Dict): Запис із відповіді API.
+    """
+
+    __slots__ = ("channel", "product", "name", "url", "sha256", "raw")
+
+    def __init__(self, channel: str, product: str, raw: Dict):
+        self.channel = channel
+        self.product = product
+        self.name: str = raw["name"]
+        self.url: str = raw["url"]
+        self.sha256: str = raw.get("sha256", "")
+        self.raw = raw
+
+
+class Tool:
+    """
+    Інструмент із розділу tools.
+
+    Args:
+        group (str): Група ("paylink" або "rro_agent_tools").
+        kind (str): Вид інструмента ("terminal_drivers", "os_tools", "diagnostics", "config_tools").
+        raw (Dict): Запис із відповіді API.
+    """
+
+    __slots__ = ("group", "kind", "name", "url", "sha256", "raw")
+
+    def __init__(self, group: str, kind: str, raw: Dict):
+        self.group = group
+        self.kind = kind
+        self.name: str = raw["name"]
+        self.url: str = raw["url"]
+        self.sha256: str = raw.get("sha256", "")
+        self.raw = raw
+
+
+def _patch_of(raw: Dict) -> Optional[Patch]:
+    if isinstance(raw.get("patch_name"), str) and isinstance(raw.get("patch_url"), str):
+        return Patch(raw["patch_name"], raw["patch_url"], raw.get("patch_sha256", ""))
+    return None
+
+
+def _section(payload: Dict, path: Tuple[str, ...]) -> List:
+    value = payload
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            raise CatalogError(f"missing section {'/'.join(path)}")
+        value = value[key]
+    if not isinstance(value, list):
+        raise CatalogError(f"section {'/'.join(path)} is not a list")
+    return value
+
+
+def _is_downloadable(raw) -> bool:
+    return isinstance(raw, dict) and isinstance(raw.get("name"), str) and isinstance(raw.get("url"), str)
+
+
+class Catalog:
+    """
+    Перевірений каталог версій з індексами за каналом і продуктом.
+
+    Продукти та групи інструментів поза схемою теж індексуються, хоч меню їх і не показує.
+
+    Args:
+        payload (Dict): Відповідь API версій.
+
+    Raises:
+        CatalogError: Якщо в payload бракує обов'язкових розділів.
+    """
+
+    __slots__ = ("payload", "installers", "patches", "tools", "problems", "_by_file", "_patch_by_name")
+
+    def __init__(self, payload: Dict):
+        self.payload = payload
+        self.installers: Dict[Tuple[str, str], List[Installer]] = {}
+        self.patches: Dict[Tuple[str, str], List[Patch]] = {}
+        self.tools: Dict[Tuple[str, str], List[Tool]] = {}
+        self.problems: List[str] = []
+        self._by_file: Dict[str, Installer] = {}
+        self._patch_by_name: Dict[Tuple[str, str, str], Patch] = {}
+
+        for channel, products in RELEASE_SCHEMA.items():
+            for product in products:
+                self._add_product(channel, product, _section(payload, (channel, product)))
+        for group, kinds in TOOL_SCHEMA.items():
+            for kind in kinds:
+                self._add_tools(group, kind, _section(payload, ("tools", group, kind)))
+
+        # Продукти й групи інструментів, яких ще немає в схемі: меню їх не показує,
+        # але files() їх повертає, щоб cleanup видалив і їхні завантажені файли
+        for channel, products in RELEASE_SCHEMA.items():
+            for product, items in payload[channel].items():
+                if product not in products and isinstance(items, list):
+                    self._add_product(channel, product, items)
+        for group, kinds in payload["tools"].items():
+            if not isinstance(kinds, dict):
+                continue
+            for kind, items in kinds.items():
+                if (group, kind) not in self.tools and isinstance(items, list):
+                    self._add_tools(group, kind, items)
+
+    def _add_product(self, channel: str, product: str, section: List) -> None:
+        items = []
+        patches = []
+        for index, raw in enumerate(section):
+            patch = _patch_of(raw) if isinstance(raw, dict) else None
+            if patch:
+                patches.append(patch)
+                self._patch_by_name[(channel, product, patch.name)] = patch
+            if not _is_downloadable(raw):
+                if not patch:
+                    self.problems.append(f"{channel}/{product}[{index}]: name or url missing")
+                continue
+            installer = Installer(channel, product, raw)
+            items.append(installer)
+            self._by_file.setdefault(installer.name, installer)
+        self.installers[(channel, product)] = items
+        self.patches[(channel, product)] = patches
+
+    def _add_tools(self, group: str, kind: str, section: List) -> None:
+        tools = []
+        for index, raw in enumerate(section):
+            if not _is_downloadable(raw):
+                self.problems.append(f"tools/{group}/{kind}[{index}]: name or url missing")
+                continue
+            tools.append(Tool(group, kind, raw))
+        self.tools[(group, kind)] = tools
+
+    def installer_for_file(self, filename: str) -> Optional[Installer]:
+        """
+        Повертає інсталятор за ім'ям його файлу.
+        """
+        return self._by_file.get(filename)
+
+    def find_patch(self, channel: str, product: str, name: Optional[str] = None) -> Optional[Patch]:
+        """
+        Повертає патч за іменем або, якщо ім'я не задано, останній патч продукту.
+        """
+        if name is not None:
+            return self._patch_by_name.get((channel, product, name))
+        patches = self.patches.get((channel, product))
+        return patches[-1] if patches else None
+
+    def latest_paylink_patch(self) -> Optional[Patch]:
+        """
+        Повертає патч останнього запису PayLink з каналу dev.
+        """
+        items = self.payload["dev"]["paylink"]
+        return _patch_of(items[-1]) if items and isinstance(items[-1], dict) else None
+
+    def files(self) -> Iterator[str]:
+        """
+        Повертає імена всіх файлів інсталяторів, патчів та інструментів, які могли бути завантажені.
+        """
+        for installers in self.installers.values():
+            for installer in installers:
+                yield installer.name
+        for patches in self.patches.values():
+            for patch in patches:
+                yield patch.name
+        for tools in self.tools.values():
+            for tool in tools:
+                yield tool.name
+
+    def menu_options(self) -> Dict:
+        """
+        Формує опції головного меню для menu.display_menu.
+
+        Returns:
+            Dict: Опції меню з категоріями legacy, dev, cloudlike, patching і tools.
+        """
+        def raw(channel: str, product: str) -> List[Dict]:
+            return [installer.raw for installer in self.installers[(channel, product)]]
+
+        return {
+            "legacy": {"kasa_manager": raw("legacy", "kasa_manager"), "rro_agent": raw("legacy", "rro_agent")},
+            "dev": {product: raw("dev", product) for product in RELEASE_SCHEMA["dev"]},
+            "cloudlike": {"cloudlike": raw("legacy", "cloudlike")},
+            "patching": {
+                channel: {product: [patch.to_dict() for patch in self.patches[(channel, product)]]
+                          for product in products}
+                for channel, products in PATCH_SCHEMA.items()
+            },
+            "tools": {
+                group: {kind: [tool.raw for tool in self.tools[(group, kind)]] for kind in kinds}
+                for group, kinds in TOOL_SCHEMA.items()
+            },
+        }
+
+
+def get_catalog(payload: Dict) -> Catalog:
+    """
+    Повертає каталог для відповіді API, будуючи його лише для нового payload.
+
+    Каталог кешується разом з об'єктом payload, тож повторні виклики з тими самими даними
+    (з меню, patch_file, cleanup) не перевіряють відповідь повторно.
+
+    Args:
+        payload (Dict): Відповідь API версій (network.fetch_json).
+
+    Returns:
+        Catalog: Каталог версій.
+
+    Raises:
+        CatalogError: Якщо в payload бракує обов'язкових розділів.
+    """
+    global _cached
+    with _cache_lock:
+        if _cached is not None and _cached[0] is payload:
+            return _cached[1]
+    catalog = Catalog(payload)
+    with _cache_lock:
+        _cached = (payload, catalog)
+    return catalog
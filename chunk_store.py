@@ -0,0 +1,467 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set
+
+from tqdm import tqdm
+from colorama import Fore, Style
+
+from db_snapshot import is_side_file, snapshot_session
+from tree_scan import scan_tree
+from compression_policy import DEFAULT_PROFILE, choose_compression, zlib_level
+
+CHUNK_SIZE = 4 * 1024 * 1024
+STORE_DIR_NAME = ".cbx_chunks"
+MANIFEST_EXTENSION = ".cbxm"
+MANIFEST_VERSION = 1
+
+# Інкрементні копії одного сховища можуть писатися паралельно, а прибирання чанків чекає,
+# доки всі вони завершаться, і не пускає нові копії, поки працює
+_store_guard = threading.Condition()
+_store_writers: Dict[str, int] = {}
+_store_collecting: Set[str] = set()
+
+
+def _store_key(store_dir: str) -> str:
+    return os.path.normcase(os.path.abspath(store_dir))
+
+
+@contextmanager
+def _writing_store(store_dir: str) -> Iterator[None]:
+    key = _store_key(store_dir)
+    with _store_guard:
+        _store_guard.wait_for(lambda: key not in _store_collecting)
+        _store_writers[key] = _store_writers.get(key, 0) + 1
+    try:
+        yield
+    finally:
+        with _store_guard:
+            _store_writers[key] -= 1
+            if not _store_writers[key]:
+                del _store_writers[key]
+            _store_guard.notify_all()
+
+
+@contextmanager
+def _collecting_store(store_dir: str) -> Iterator[None]:
+    key = _store_key(store_dir)
+    with _store_guard:
+        _store_guard.wait_for(lambda: key not in _store_writers and key not in _store_collecting)
+        _store_collecting.add(key)
+    try:
+        yield
+    finally:
+        with _store_guard:
+            _store_collecting.discard(key)
+            _store_guard.notify_all()
+
+
+def get_store_dir(target_dir: str) -> str:
+    """
+    Повертає шлях до сховища чанків, спільного для всіх кас в одній батьківській директорії.
+
+    Args:
+        target_dir (str): Директорія каси.
+
+    Returns:
+        str: Шлях до сховища чанків.
+    """
+    return os.path.join(os.path.dirname(os.path.normpath(target_dir)), STORE_DIR_NAME)
+
+
+def is_manifest(backup_path: str) -> bool:
+    """
+    Перевіряє, чи є файл маніфестом інкрементної резервної копії.
+
+    Args:
+        backup_path (str): Шлях до файлу резервної копії.
+
+    Returns:
+        bool: True для маніфесту, False для інших форматів (наприклад, ZIP).
+    """
+    return backup_path.lower().endswith(MANIFEST_EXTENSION)
+
+
+def _chunk_path(store_dir: str, digest: str) -> str:
+    return os.path.join(store_dir, digest[:2], digest)
+
+
+def _reuse_chunk(path: str) -> bool:
+    # Оновлює час зміни наявного чанка, щоб паралельне прибирання не вважало його застарілим
+    try:
+        os.utime(path)
+        return True
+    except OSError:
+        return False
+
+
+def put_chunk(store_dir: str, data: bytes, level: int = 1) -> str:
+    """
+    Зберігає чанк у сховищі, якщо такого ще немає.
+
+    Чанк адресується SHA256 його вмісту і записується стиснутим через тимчасовий файл,
+    тому паралельні резервні копії можуть безпечно записувати однакові чанки.
+
+    Args:
+        store_dir (str): Шлях до сховища чанків.
+        data (bytes): Вміст чанка.
+        level (int): Рівень zlib; 0 для даних, які не стискаються. За замовчуванням 1.
+
+    Returns:
+        str: SHA256 чанка в шістнадцятковому вигляді.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    path = _chunk_path(store_dir, digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(zlib.compress(data, level))
+        os.replace(temp_path, path)
+    return digest
+
+
+def read_chunk(store_dir: str, digest: str) -> bytes:
+    """
+    Читає чанк зі сховища та перевіряє його SHA256.
+
+    Args:
+        store_dir (str): Шлях до сховища чанків.
+        digest (str): SHA256 чанка.
+
+    Returns:
+        bytes: Вміст чанка.
+
+    Raises:
+        OSError: Якщо чанк відсутній.
+        ValueError: Якщо вміст чанка пошкоджено.
+    """
+    with open(_chunk_path(store_dir, digest), "rb") as f:
+        data = zlib.decompress(f.read())
+    if hashlib.sha256(data).hexdigest() != digest:
+        raise ValueError(f"Chunk {digest} is corrupted")
+    return data
+
+
+def load_manifest(manifest_path: str) -> Dict:
+    """
+    Читає маніфест інкрементної резервної копії.
+
+    Args:
+        manifest_path (str): Шлях до маніфесту.
+
+    Returns:
+        Dict: Вміст маніфесту.
+
+    Raises:
+        OSError, ValueError: Якщо маніфест недоступний або некоректний.
+    """
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported manifest version: {manifest.get('version')}")
+    return manifest
+
+
+def list_manifests(parent_dir: str, source_name: Optional[str] = None) -> List[str]:
+    """
+    Повертає маніфести в директорії, відсортовані від найстарішого до найновішого.
+
+    Args:
+        parent_dir (str): Директорія, де лежать маніфести.
+        source_name (Optional[str]): Якщо задано, лише маніфести цієї каси.
+
+    Returns:
+        List[str]: Повні шляхи до маніфестів.
+    """
+    try:
+        names = os.listdir(parent_dir)
+    except OSError:
+        return []
+    prefix = f"{source_name}_backup_" if source_name else ""
+    return [os.path.join(parent_dir, name) for name in sorted(names)
+            if name.endswith(MANIFEST_EXTENSION) and name.startswith(prefix)]
+
+
+def _previous_entries(parent_dir: str, source_name: str) -> Dict[str, Dict]:
+    for manifest_path in reversed(list_manifests(parent_dir, source_name)):
+        try:
+            return {entry["path"]: entry for entry in load_manifest(manifest_path)["files"]}
+        except (OSError, ValueError, KeyError):
+            continue
+    return {}
+
+
+def create_incremental_backup(target_dir: str, profile: str = DEFAULT_PROFILE,
+                              position: Optional[int] = None) -> Optional[str]:
+    """
+    Створює інкрементну резервну копію директорії через спільне сховище чанків.
+
+    Файли розбиваються на чанки фіксованого розміру, кожен унікальний чанк зберігається лише один раз.
+    Файли, розмір і час зміни яких не змінилися з попередньої копії, не перечитуються:
+    їхні записи беруться з попереднього маніфесту. Тому кожна наступна копія коштує лише
+    змінених байтів, а сама копія — це невеликий JSON-маніфест поруч із директорією каси.
+    Рівень стиснення нових чанків обирається політикою compression_policy за профілем.
+    Бази даних SQLite читаються з онлайн-копії, тому каса може залишатися запущеною;
+    їхні записи ніколи не беруться з попереднього маніфесту, адже зміни можуть лежати у WAL-файлі.
+
+    Args:
+        target_dir (str): Шлях до директорії, яку потрібно зберегти.
+        profile (str): Профіль стиснення ("fast", "default", "max"). За замовчуванням DEFAULT_PROFILE.
+        position (Optional[int]): Рядок індикатора прогресу, коли кілька кас копіюються одночасно.
+
+    Returns:
+        Optional[str]: Шлях до створеного маніфесту або None у разі помилки.
+
+    Raises:
+        Exception: Помилки не передаються далі, а виводяться користувачу.
+    """
+    target_dir = os.path.normpath(os.path.abspath(target_dir))
+    source_name = os.path.basename(target_dir)
+    parent_dir = os.path.dirname(target_dir)
+    store_dir = get_store_dir(target_dir)
+    print(f"{Fore.CYAN}📦 Creating incremental backup for {source_name}...{Style.RESET_ALL}")
+    stem = f"{source_name}_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    manifest_name = f"{stem}{MANIFEST_EXTENSION}"
+    suffix = 1
+    while os.path.exists(os.path.join(parent_dir, manifest_name)):
+        manifest_name = f"{stem}_{suffix}{MANIFEST_EXTENSION}"
+        suffix += 1
+    manifest_path = os.path.join(parent_dir, manifest_name)
+
+    try:
+        with _writing_store(store_dir):
+            os.makedirs(store_dir, exist_ok=True)
+            previous = _previous_entries(parent_dir, source_name)
+            files = []
+            dirs = []
+            new_bytes = 0
+            total_bytes = 0
+            with snapshot_session() as resolve, \
+                    tqdm(unit='B', unit_scale=True, desc=source_name if position is not None else "Creating backup",
+                         position=position, bar_format="{l_bar}{bar}| {n_fmt} [{elapsed}, {rate_fmt}]") as pbar:
+                for entry in scan_tree(target_dir, on_dir=dirs.append, skip_file=is_side_file):
+                    source_path = resolve(entry.path)
+                    if source_path is None:
+                        continue
+                    old = previous.get(entry.rel_path)
+                    if (source_path == entry.path and old and old["size"] == entry.size
+                            and old["mtime_ns"] == entry.mtime_ns
+                            and all(_reuse_chunk(_chunk_path(store_dir, d)) for d in old["chunks"])):
+                        files.append(old)
+                        total_bytes += entry.size
+                        pbar.update(entry.size)
+                        continue
+                    level = zlib_level(choose_compression(entry.path, profile))
+                    chunks = []
+                    crc = 0
+                    size = 0
+                    try:
+                        f = open(source_path, "rb")
+                    except FileNotFoundError:
+                        # Файл зник після обходу директорії
+                        continue
+                    with f:
+                        while True:
+                            data = f.read(CHUNK_SIZE)
+                            if not data:
+                                break
+                            digest = hashlib.sha256(data).hexdigest()
+                            if not _reuse_chunk(_chunk_path(store_dir, digest)):
+                                put_chunk(store_dir, data, level)
+                                new_bytes += len(data)
+                            chunks.append(digest)
+                            crc = zlib.crc32(data, crc)
+                            size += len(data)
+                            pbar.update(len(data))
+                    total_bytes += size
+                    files.append({
+                        "path": entry.rel_path,
+                        "size": size,
+                        "mtime_ns": entry.mtime_ns,
+                        "crc32": crc,
+                        "chunks": chunks
+                    })
+
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "source": source_name,
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "store": STORE_DIR_NAME,
+                "chunk_size": CHUNK_SIZE,
+                "dirs": dirs,
+                "files": files
+            }
+            temp_path = manifest_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(temp_path, manifest_path)
+            print(f"{Fore.GREEN}✓ Backup created: {manifest_name} "
+                  f"({new_bytes / 1024 / 1024:.1f} MB new of {total_bytes / 1024 / 1024:.1f} MB){Style.RESET_ALL}")
+            return manifest_path
+    except Exception as e:
+        print(f"{Fore.RED}✗ Failed to create incremental backup: {e}{Style.RESET_ALL}")
+        return None
+
+
+def manifest_store_dir(manifest_path: str, manifest: Dict) -> str:
+    """
+    Повертає шлях до сховища чанків, на яке посилається маніфест.
+
+    Args:
+        manifest_path (str): Шлях до маніфесту.
+        manifest (Dict): Вміст маніфесту.
+
+    Returns:
+        str: Шлях до сховища чанків.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(manifest_path)), manifest.get("store", STORE_DIR_NAME))
+
+
+def restore_file(store_dir: str, entry: Dict, file_path: str, on_data=None) -> None:
+    """
+    Збирає один файл маніфесту з чанків і відновлює час його зміни.
+
+    Args:
+        store_dir (str): Шлях до сховища чанків.
+        entry (Dict): Запис файлу з маніфесту.
+        file_path (str): Куди записати файл.
+        on_data (Optional[Callable[[int], None]]): Викликається з кількістю записаних байтів.
+
+    Raises:
+        OSError, ValueError: Якщо чанки недоступні чи пошкоджені.
+    """
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "wb") as f:
+        for digest in entry["chunks"]:
+            data = read_chunk(store_dir, digest)
+            f.write(data)
+            if on_data:
+                on_data(len(data))
+    os.utime(file_path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+
+
+def restore_incremental_backup(manifest_path: str, dest_dir: str) -> int:
+    """
+    Відтворює файли з маніфесту, читаючи чанки безпосередньо зі сховища.
+
+    Args:
+        manifest_path (str): Шлях до маніфесту.
+        dest_dir (str): Директорія, куди записуються файли.
+
+    Returns:
+        int: Кількість відновлених файлів.
+
+    Raises:
+        OSError, ValueError: Якщо маніфест або чанки недоступні чи пошкоджені.
+    """
+    manifest = load_manifest(manifest_path)
+    store_dir = manifest_store_dir(manifest_path, manifest)
+    for rel_dir in manifest.get("dirs", []):
+        os.makedirs(os.path.join(dest_dir, *rel_dir.split("/")), exist_ok=True)
+    files = manifest["files"]
+    with tqdm(total=sum(entry["size"] for entry in files), unit='B', unit_scale=True, desc="Restoring files",
+              bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}]") as pbar:
+        for entry in files:
+            restore_file(store_dir, entry, os.path.join(dest_dir, *entry["path"].split("/")), pbar.update)
+    return len(files)
+
+
+def referenced_chunks(parent_dir: str) -> Set[str]:
+    """
+    Збирає всі чанки, на які посилаються маніфести в директорії.
+
+    Args:
+        parent_dir (str): Директорія з маніфестами.
+
+    Returns:
+        Set[str]: Множина SHA256 чанків.
+
+    Raises:
+        ValueError: Якщо хоча б один маніфест неможливо прочитати (видаляти чанки тоді небезпечно).
+    """
+    digests = set()
+    for manifest_path in list_manifests(parent_dir):
+        try:
+            manifest = load_manifest(manifest_path)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Cannot read {os.path.basename(manifest_path)}: {e}")
+        for entry in manifest["files"]:
+            digests.update(entry["chunks"])
+    return digests
+
+
+def manifest_chunk_sizes(manifest_path: str) -> Dict[str, int]:
+    """
+    Повертає розміри на диску всіх чанків, на які посилається маніфест.
+
+    Args:
+        manifest_path (str): Шлях до маніфесту.
+
+    Returns:
+        Dict[str, int]: SHA256 чанка та його стиснутий розмір у сховищі (0, якщо чанка немає).
+
+    Raises:
+        OSError, ValueError: Якщо маніфест недоступний чи пошкоджений.
+    """
+    manifest = load_manifest(manifest_path)
+    store_dir = manifest_store_dir(manifest_path, manifest)
+    sizes = {}
+    for entry in manifest["files"]:
+        for digest in entry["chunks"]:
+            if digest not in sizes:
+                try:
+                    sizes[digest] = os.path.getsize(_chunk_path(store_dir, digest))
+                except OSError:
+                    sizes[digest] = 0
+    return sizes
+
+
+def collect_garbage(parent_dir: str) -> int:
+    """
+    Видаляє зі сховища чанки, на які більше не посилається жоден маніфест.
+
+    Прибирання чекає завершення інкрементних копій цього сховища в поточному процесі й не
+    пускає нові, поки працює. Тимчасові файли та чанки, змінені після початку прибирання,
+    не видаляються: їх може саме записувати копія з іншого процесу.
+
+    Args:
+        parent_dir (str): Директорія з маніфестами та сховищем чанків.
+
+    Returns:
+        int: Кількість звільнених байтів на диску.
+    """
+    store_dir = os.path.join(parent_dir, STORE_DIR_NAME)
+    if not os.path.isdir(store_dir):
+        return 0
+    with _collecting_store(store_dir):
+        started = time.time()
+        try:
+            keep = referenced_chunks(parent_dir)
+        except ValueError as e:
+            print(f"{Fore.YELLOW}⚠ Skipping chunk cleanup: {e}{Style.RESET_ALL}")
+            return 0
+        freed = 0
+        for bucket in os.listdir(store_dir):
+            bucket_dir = os.path.join(store_dir, bucket)
+            if not os.path.isdir(bucket_dir):
+                continue
+            for name in os.listdir(bucket_dir):
+                if name in keep or name.endswith(".tmp"):
+                    continue
+                path = os.path.join(bucket_dir, name)
+                try:
+                    stat = os.stat(path)
+                    if stat.st_mtime >= started:
+                        continue
+                    os.remove(path)
+                    freed += stat.st_size
+                except OSError:
+                    pass
+        return freed
@@ -1,5 +1,4 @@
 import os
-import subprocess
 import sys
 import threading
 from typing import Dict
@@ -7,21 +6,23 @@ import psutil
 from tqdm import tqdm
 from colorama import Fore, Style
 
-from utils import find_all_processes_by_name, run_spinner
+from catalog import CatalogError, get_catalog
+from platform_layer import schedule_self_delete
+from utils import find_all_processes_by_name, get_sleep_time, run_spinner
 
 
 def cleanup(data: Dict):
     """
     Виконує очищення файлів і процесів, пов'язаних із програмою, та готує її до завершення.
 
-    Функція сканує словник `data` для збору файлів, які потрібно видалити, перевіряє та завершує
+    Функція бере з каталогу версій імена файлів, які потрібно видалити, перевіряє та завершує
     відповідні процеси, видаляє файли, завершує активні потоки та створює BAT-скрипт для
-    самовидалення виконуваного файлу програми. У разі помилок виводить повідомлення та завершує
-    виконання.
+    самовидалення виконуваного файлу програми (лише для зібраного exe, не під час запуску з
+    вихідних кодів). У разі помилок виводить повідомлення та завершує виконання.
 
     Args:
-        data (Dict): Словник із даними, що містять категорії ("legacy", "dev", "tools") та
-                     інформацію про файли для видалення (імена та патчі).
+        data (Dict): Відповідь API версій; файли для видалення (інсталятори, патчі та інструменти,
+                     зокрема продуктів поза схемою каталогу) визначає catalog.Catalog.files.
 
     Returns:
         None: Функція не повертає значень, а завершує виконання програми за допомогою sys.exit(0).
@@ -32,40 +33,13 @@ def cleanup(data: Dict):
                    створення BAT-скрипту.
     """
     print(f"{Fore.CYAN}🧹 Starting cleanup...{Style.RESET_ALL}")
-    files_to_delete = []
 
     try:
-        for category in ["legacy", "dev", "tools"]:
-            if category not in data:
-                continue
-            category_data = data[category]
-            if not isinstance(category_data, dict):
-                print(f"{Fore.YELLOW}⚠ Skipping invalid category data for {category}: not a dictionary{Style.RESET_ALL}")
-                continue
-
-            for key, item in category_data.items():
-                if isinstance(item, list):
-                    for sub_item in item:
-                        if isinstance(sub_item, dict):
-                            files_to_delete.extend([sub_item.get("name", ""), sub_item.get("patch_name", "")])
-                        else:
-                            print(f"{Fore.YELLOW}⚠ Skipping invalid sub-item in {category}/{key}: not a dictionary{Style.RESET_ALL}")
-                elif isinstance(item, dict):
-                    for sub_key, sub_item in item.items():
-                        if isinstance(sub_item, list):
-                            for sub_sub_item in sub_item:
-                                if isinstance(sub_sub_item, dict):
-                                    files_to_delete.extend([sub_sub_item.get("name", ""), sub_sub_item.get("patch_name", "")])
-                                else:
-                                    print(f"{Fore.YELLOW}⚠ Skipping invalid sub-sub-item in {category}/{key}/{sub_key}: not a dictionary{Style.RESET_ALL}")
-                        elif isinstance(sub_item, dict):
-                            files_to_delete.extend([sub_item.get("name", ""), sub_item.get("patch_name", "")])
-                        else:
-                            print(f"{Fore.YELLOW}⚠ Skipping invalid sub-item in {category}/{key}/{sub_key}: not a dictionary{Style.RESET_ALL}")
-                else:
-                    print(f"{Fore.YELLOW}⚠ Skipping invalid item in {category}/{key}: not a dictionary or list{Style.RESET_ALL}")
-
-        files_to_delete = [f for f in files_to_delete if f and isinstance(f, str)]
+        try:
+            files_to_delete = [f for f in get_catalog(data).files() if f]
+        except CatalogError as e:
+            print(f"{Fore.YELLOW}⚠ Skipping file cleanup: unexpected data from server: {e}{Style.RESET_ALL}")
+            files_to_delete = []
 
         print(f"{Fore.YELLOW}🔒 Checking running processes...{Style.RESET_ALL}")
         processes_found = False
@@ -119,20 +93,13 @@ def cleanup(data: Dict):
                 thread.join(timeout=0.1)
 
         print(f"{Fore.GREEN}✓ Cleanup completed! Preparing to exit...{Style.RESET_ALL}")
+        print(f"{Fore.CYAN}Time spent in message delays this session: {get_sleep_time():.1f}s{Style.RESET_ALL}")
 
-        exe_path = os.path.abspath(sys.argv[0])
+        # Із вихідних кодів sys.argv[0] — це main.py робочої копії, його видаляти не можна
         if getattr(sys, 'frozen', False):
-            exe_path = os.path.abspath(sys.executable)
-
-        bat_path = os.path.join(os.path.dirname(exe_path), "delete_me.bat")
-        with open(bat_path, "w", encoding="utf-8") as bat_file:
-            bat_file.write(f"@echo off\n")
-            bat_file.write(f":repeat\n")
-            bat_file.write(f"ping 127.0.0.1 -n 1 >nul\n")
-            bat_file.write(f"del /f /q \"{exe_path}\"\n")
-            bat_file.write(f"if exist \"{exe_path}\" goto repeat\n")
-            bat_file.write(f"del /f /q \"{bat_path}\"\n")
-        subprocess.Popen(f"cmd /c \"{bat_path}\"", shell=True, creationflags=subprocess.CREATE_NO_WINDOW)
+            schedule_self_delete(os.path.abspath(sys.executable))
+        else:
+            print(f"{Fore.YELLOW}⚠ Running from source, skipping self-deletion.{Style.RESET_ALL}")
     except Exception as e:
         print(f"{Fore.RED}✗ Cleanup error: {e}{Style.RESET_ALL}")
 
@@ -0,0 +1,299 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from backup_catalog import list_backups
+from backup_restore import create_backups, restore_from_backup
+from backup_retention import wait_for_retention
+from catalog import CatalogError, get_catalog
+from compression_policy import DEFAULT_PROFILE, PROFILES
+from config import (DAEMON_HOST, DAEMON_PORT, DAEMON_REDISCOVER_INTERVAL, DAEMON_REFRESH_INTERVAL, DRIVES,
+                    INCREMENTAL_BACKUPS, VPS_API_URL)
+from health_check import refresh_register_shift
+from network import fetch_json
+from patching import patch_file
+from profiling import enable as enable_profiling, profile_action
+from search_utils import discover_cash_registers, get_cash_register_info, read_register_identity
+from utils import set_no_delay
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_NOT_FOUND = 3
+
+PRODUCT_FOLDERS = {
+    "kasa_manager": "checkbox.kasa.manager",
+    "rro_agent": "checkbox.kasa.manager",
+    "paylink": "Checkbox PayLink (Beta)"
+}
+
+
+class CliError(Exception):
+    """
+    Помилка виконання команди з кодом завершення.
+
+    Args:
+        message (str): Опис помилки.
+        code (int): Код завершення процесу.
+    """
+
+    def __init__(self, message: str, code: int = EXIT_FAILED):
+        super().__init__(message)
+        self.code = code
+
+
+def _discover() -> Dict:
+    return discover_cash_registers(DRIVES, use_cache=False)
+
+
+def _select_registers(args: argparse.Namespace, skip_bad: bool = False) -> List[Dict]:
+    """
+    Визначає каси за --targets/--all: "all", імена директорій, фіскальні номери або шляхи.
+
+    Шляхи до наявних директорій використовуються без пошуку кас на дисках. З skip_bad каси
+    з пошкодженою базою пропускаються для "all", а явно вказані такі каси призводять до помилки,
+    якщо не задано --force (як і відмова в меню вибору профілів).
+    """
+    targets = ["all"] if getattr(args, "all", False) else [t.strip() for t in (args.targets or "").split(",") if t.strip()]
+    if not targets:
+        raise CliError("no targets given (use --targets or --all)", EXIT_USAGE)
+    if all(os.path.isdir(target) for target in targets):
+        if skip_bad:
+            selected = [get_cash_register_info(target) for target in targets]
+        else:
+            return [{"name": os.path.basename(os.path.normpath(target)),
+                     "path": os.path.normpath(os.path.abspath(target)), **read_register_identity(target)}
+                    for target in targets]
+    elif targets == ["all"]:
+        registers = _discover()["registers"]
+        selected = [register for register in registers if not (skip_bad and register["health"] == "BAD")]
+    else:
+        registers = _discover()["registers"]
+        selected = []
+        for target in targets:
+            matches = [register for register in registers
+                       if target in (register["name"], os.path.basename(register["path"]),
+                                     register["fiscal_number"], register["path"])]
+            if not matches:
+                raise CliError(f"cash register not found: {target}", EXIT_NOT_FOUND)
+            selected.extend(match for match in matches if match not in selected)
+    if not selected:
+        raise CliError("no cash registers found", EXIT_NOT_FOUND)
+    if skip_bad and not getattr(args, "force", False):
+        bad = [register["name"] for register in selected if register["health"] == "BAD"]
+        if bad:
+            raise CliError(f"database corrupted in {', '.join(bad)} (use --force to patch anyway)")
+    return selected
+
+
+def cmd_discover(args: argparse.Namespace) -> Tuple[int, Dict]:
+    found = _discover()
+    return (EXIT_OK if found["registers"] else EXIT_NOT_FOUND), found
+
+
+def cmd_health(args: argparse.Namespace) -> Tuple[int, Dict]:
+    found = _discover()
+    registers = found["registers"]
+    for register in registers:
+        register["healthy"] = register["health"] == "OK" and register["trans_status"] in ("DONE", "EMPTY")
+    if not registers:
+        return EXIT_NOT_FOUND, found
+    return (EXIT_OK if all(register["healthy"] for register in registers) else EXIT_FAILED), found
+
+
+def cmd_patch(args: argparse.Namespace) -> Tuple[int, Dict]:
+    data = fetch_json(VPS_API_URL)
+    if not data:
+        raise CliError("failed to fetch versions from server")
+    try:
+        patch = get_catalog(data).find_patch(args.channel, args.product, args.patch)
+    except CatalogError as e:
+        raise CliError(f"unexpected data from server: {e}")
+    if patch is None:
+        raise CliError(f"no patch found for {args.channel}/{args.product}", EXIT_NOT_FOUND)
+    patch_data = patch.to_dict()
+
+    is_rro_agent = args.product == "rro_agent"
+    targets = [register["path"] for register in _select_registers(args, skip_bad=True)] if is_rro_agent else None
+    ok = patch_file(patch_data, PRODUCT_FOLDERS[args.product], data, is_rro_agent=is_rro_agent,
+                    is_paylink=args.product == "paylink", expected_sha256=patch_data["sha256"],
+                    interactive=False, targets=targets, backup=args.backup)
+    return (EXIT_OK if ok else EXIT_FAILED), {"patch": patch_data["patch_name"], "product": args.product,
+                                              "targets": targets, "ok": ok}
+
+
+def cmd_backup(args: argparse.Namespace) -> Tuple[int, Dict]:
+    target_dirs = [register["path"] for register in _select_registers(args)]
+    incremental = INCREMENTAL_BACKUPS if args.incremental is None else args.incremental
+    results = create_backups(target_dirs, incremental=incremental, profile=args.profile)
+    return (EXIT_OK if all(results.values()) else EXIT_FAILED), {"backups": results}
+
+
+def cmd_restore(args: argparse.Namespace) -> Tuple[int, Dict]:
+    registers = _select_registers(args)
+    if len(registers) != 1:
+        raise CliError("restore needs exactly one target", EXIT_USAGE)
+    target_dir = registers[0]["path"]
+    backup_dir = os.path.dirname(target_dir)
+    if args.backup == "latest":
+        records = [record for record in list_backups(backup_dir)
+                   if record["source"] == os.path.basename(target_dir)]
+        if not records:
+            raise CliError(f"no backups found for {target_dir}", EXIT_NOT_FOUND)
+        backup_path = os.path.join(backup_dir, records[0]["file"])
+    else:
+        backup_path = args.backup if os.path.isabs(args.backup) else os.path.join(backup_dir, args.backup)
+        if not os.path.isfile(backup_path):
+            raise CliError(f"backup not found: {backup_path}", EXIT_NOT_FOUND)
+
+    ok = restore_from_backup(target_dir, backup_path, is_rro_agent=args.product == "rro_agent",
+                             is_paylink=args.product == "paylink", interactive=False)
+    return (EXIT_OK if ok else EXIT_FAILED), {"target": target_dir, "backup": backup_path, "ok": ok}
+
+
+def cmd_refresh_shift(args: argparse.Namespace) -> Tuple[int, Dict]:
+    registers = [register for register in _select_registers(args) if register.get("is_running", True)]
+    with ThreadPoolExecutor(max_workers=max(1, min(16, len(registers)))) as pool:
+        errors = list(pool.map(lambda register: refresh_register_shift(register["path"]), registers))
+    results = {register["path"]: {"ok": error is None, "error": error} for register, error in zip(registers, errors)}
+    return (EXIT_OK if all(error is None for error in errors) else EXIT_FAILED), {"results": results}
+
+
+def cmd_serve(args: argparse.Namespace) -> Tuple[int, Dict]:
+    from daemon import serve
+
+    try:
+        serve(DRIVES, args.host, args.port, args.interval, args.rediscover_interval)
+    except OSError as e:
+        raise CliError(f"cannot serve on {args.host}:{args.port}: {e}")
+    return EXIT_OK, {"ok": True}
+
+
+def _add_targets(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--targets", help="comma-separated register names, fiscal numbers or paths, or 'all'")
+    parser.add_argument("--all", action="store_true", help="same as --targets all")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Створює парсер аргументів командного рядка.
+
+    Returns:
+        argparse.ArgumentParser: Парсер із підкомандами.
+    """
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--json", action="store_true", help="print the result as JSON on stdout")
+    common.add_argument("--profile-actions", nargs="?", const="", metavar="DIR",
+                        help="profile the command with cProfile and save a .prof file (default dir: cbx_profiles)")
+    parser = argparse.ArgumentParser(prog="cbx", description="CBX Multi Tool non-interactive commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("discover", parents=[common],
+                        help="find the manager and cash registers").set_defaults(handler=cmd_discover)
+    commands.add_parser("health", parents=[common], help="check register databases").set_defaults(handler=cmd_health)
+
+    patch = commands.add_parser("patch", parents=[common], help="download and apply a patch")
+    patch.add_argument("--product", choices=sorted(PRODUCT_FOLDERS), required=True)
+    patch.add_argument("--channel", choices=["legacy", "dev"], default="legacy")
+    patch.add_argument("--patch", help="patch name (defaults to the latest one)")
+    patch.add_argument("--backup", action="store_true", help="back up the registers before patching")
+    patch.add_argument("--force", action="store_true", help="patch registers even if their database is corrupted")
+    _add_targets(patch)
+    patch.set_defaults(handler=cmd_patch)
+
+    backup = commands.add_parser("backup", parents=[common], help="back up cash registers")
+    backup.add_argument("--incremental", dest="incremental", action="store_true", default=None)
+    backup.add_argument("--full", dest="incremental", action="store_false")
+    backup.add_argument("--profile", choices=sorted(PROFILES), default=DEFAULT_PROFILE)
+    _add_targets(backup)
+    backup.set_defaults(handler=cmd_backup)
+
+    restore = commands.add_parser("restore", parents=[common], help="restore a cash register from a backup")
+    restore.add_argument("--backup", default="latest", help="backup file name or path (defaults to the latest one)")
+    restore.add_argument("--product", choices=sorted(PRODUCT_FOLDERS), default="rro_agent")
+    _add_targets(restore)
+    restore.set_defaults(handler=cmd_restore)
+
+    refresh = commands.add_parser("refresh-shift", parents=[common], help="refresh the shift on running registers")
+    _add_targets(refresh)
+    refresh.set_defaults(handler=cmd_refresh_shift)
+
+    serve = commands.add_parser("serve", parents=[common],
+                                help="keep register state warm and serve it as JSON on a local HTTP port")
+    serve.add_argument("--host", default=DAEMON_HOST)
+    serve.add_argument("--port", type=int, default=DAEMON_PORT)
+    serve.add_argument("--interval", type=float, default=DAEMON_REFRESH_INTERVAL,
+                       help="seconds between incremental refreshes")
+    serve.add_argument("--rediscover-interval", type=float, default=DAEMON_REDISCOVER_INTERVAL,
+                       help="seconds between full register discoveries")
+    serve.set_defaults(handler=cmd_serve)
+    return parser
+
+
+def _print_human(command: str, result: Dict, out) -> None:
+    if command in ("discover", "health"):
+        for register in result.get("registers", []):
+            status = "ON" if register["is_running"] else "OFF"
+            print(f"{register['name']}\t{register['fiscal_number']}\t{status}\tH:{register['health']}\t"
+                  f"T:{register['trans_status']}\tS:{register['shift_status']}\tv{register['version']}", file=out)
+    elif command == "backup":
+        for target_dir, backup_path in result["backups"].items():
+            print(f"{target_dir}\t{backup_path or 'FAILED'}", file=out)
+    elif command == "refresh-shift":
+        for path, outcome in result["results"].items():
+            print(f"{path}\t{'OK' if outcome['ok'] else 'FAILED: ' + outcome['error']}", file=out)
+    else:
+        print("OK" if result.get("ok") else "FAILED", file=out)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Виконує команду без інтерактивних запитань.
+
+    Повідомлення програми та індикатори прогресу виводяться в stderr, штучні паузи вимкнено,
+    а в stdout потрапляє лише результат (з --json — у форматі JSON), тож вивід можна
+    розбирати скриптами. Перед виходом команда чекає завершення фонового очищення копій.
+    Коди завершення: 0 — успіх, 1 — операція не вдалася, 2 — некоректні аргументи,
+    3 — каси, патч або копію не знайдено.
+
+    Args:
+        argv (Optional[Sequence[str]]): Аргументи командного рядка. За замовчуванням sys.argv[1:].
+
+    Returns:
+        int: Код завершення.
+    """
+    args = build_parser().parse_args(argv)
+    stdout = sys.stdout
+    set_no_delay(True)
+    if args.profile_actions is not None:
+        enable_profiling(args.profile_actions or None)
+
+    handler: Callable[[argparse.Namespace], Tuple[int, Dict]] = args.handler
+    try:
+        with contextlib.redirect_stdout(sys.stderr), profile_action(args.command):
+            try:
+                code, result = handler(args)
+            finally:
+                # Очищення копій працює у фонових потоках, які завершаться разом із процесом
+                wait_for_retention()
+    except CliError as e:
+        code, result = e.code, {"error": str(e)}
+    except Exception as e:
+        code, result = EXIT_FAILED, {"error": str(e)}
+
+    if args.json:
+        json.dump(result, stdout, indent=2, ensure_ascii=False, default=str)
+        stdout.write("\n")
+    elif "error" in result:
+        print(f"error: {result['error']}", file=sys.stderr)
+    else:
+        _print_human(args.command, result, stdout)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
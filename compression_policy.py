@@ -0,0 +1,122 @@
+import os
+import zipfile
+import zlib
+from typing import Dict, Tuple
+
+SAMPLE_SIZE = 64 * 1024
+INCOMPRESSIBLE_RATIO = 0.9
+DEFAULT_PROFILE = "default"
+
+FILE_CLASSES: Dict[str, set] = {
+    "compressed": {".zip", ".7z", ".rar", ".gz", ".bz2", ".xz", ".jar", ".cab", ".msi", ".whl", ".apk",
+                   ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico", ".mp3", ".mp4", ".woff", ".woff2", ".pdf"},
+    "binary": {".exe", ".dll", ".pyd", ".so", ".sys", ".node", ".bin"},
+    "database": {".db", ".sqlite", ".sqlite3", ".db-wal", ".db-shm"},
+    "text": {".txt", ".log", ".json", ".xml", ".ini", ".cfg", ".conf", ".config", ".yaml", ".yml", ".csv",
+             ".html", ".htm", ".css", ".js", ".py", ".md", ".sql"},
+}
+
+# Для кожного класу: (метод стиснення ZIP, рівень). "unknown" — для файлів без відомого розширення,
+# їхня стисливість додатково перевіряється на зразку.
+PROFILES: Dict[str, Dict[str, Tuple[int, int]]] = {
+    "fast": {
+        "compressed": (zipfile.ZIP_STORED, 0),
+        "binary": (zipfile.ZIP_STORED, 0),
+        "database": (zipfile.ZIP_DEFLATED, 1),
+        "text": (zipfile.ZIP_DEFLATED, 1),
+        "unknown": (zipfile.ZIP_DEFLATED, 1),
+    },
+    "default": {
+        "compressed": (zipfile.ZIP_STORED, 0),
+        "binary": (zipfile.ZIP_DEFLATED, 6),
+        "database": (zipfile.ZIP_DEFLATED, 6),
+        "text": (zipfile.ZIP_DEFLATED, 6),
+        "unknown": (zipfile.ZIP_DEFLATED, 6),
+    },
+    "max": {
+        "compressed": (zipfile.ZIP_STORED, 0),
+        "binary": (zipfile.ZIP_DEFLATED, 9),
+        "database": (zipfile.ZIP_BZIP2, 9),
+        "text": (zipfile.ZIP_BZIP2, 9),
+        "unknown": (zipfile.ZIP_DEFLATED, 9),
+    },
+}
+
+
+def classify_file(path: str) -> str:
+    """
+    Визначає клас файлу за розширенням.
+
+    Args:
+        path (str): Шлях або ім'я файлу.
+
+    Returns:
+        str: Один із ключів FILE_CLASSES або "unknown".
+    """
+    extension = os.path.splitext(path)[1].lower()
+    for file_class, extensions in FILE_CLASSES.items():
+        if extension in extensions:
+            return file_class
+    return "unknown"
+
+
+def is_compressible(path: str, sample_size: int = SAMPLE_SIZE) -> bool:
+    """
+    Перевіряє стисливість файлу, стискаючи його початок найшвидшим рівнем deflate.
+
+    Args:
+        path (str): Шлях до файлу.
+        sample_size (int): Розмір зразка в байтах. За замовчуванням SAMPLE_SIZE.
+
+    Returns:
+        bool: False, якщо зразок стискається гірше за INCOMPRESSIBLE_RATIO. Для недоступних
+            файлів повертається True, щоб не змінювати звичайну поведінку.
+    """
+    try:
+        with open(path, "rb") as f:
+            sample = f.read(sample_size)
+    except OSError:
+        return True
+    if not sample:
+        return False
+    return len(zlib.compress(sample, 1)) < len(sample) * INCOMPRESSIBLE_RATIO
+
+
+def choose_compression(path: str, profile: str = DEFAULT_PROFILE) -> Tuple[int, int]:
+    """
+    Обирає метод і рівень стиснення для файлу відповідно до профілю.
+
+    Вже стиснуті формати зберігаються без стиснення, а файли з невідомим розширенням
+    перевіряються на зразку й зберігаються як є, якщо стиснення не дає виграшу.
+
+    Args:
+        path (str): Шлях до файлу.
+        profile (str): Назва профілю з PROFILES. За замовчуванням DEFAULT_PROFILE.
+
+    Returns:
+        Tuple[int, int]: Метод стиснення ZIP (zipfile.ZIP_*) і рівень.
+
+    Raises:
+        KeyError: Якщо профіль невідомий.
+    """
+    rules = PROFILES[profile]
+    file_class = classify_file(path)
+    if file_class == "unknown" and not is_compressible(path):
+        return zipfile.ZIP_STORED, 0
+    return rules[file_class]
+
+
+def zlib_level(compression: Tuple[int, int]) -> int:
+    """
+    Перетворює вибір політики на рівень zlib для сховища чанків, яке завжди використовує zlib.
+
+    Args:
+        compression (Tuple[int, int]): Результат choose_compression.
+
+    Returns:
+        int: Рівень zlib від 0 (без стиснення) до 9.
+    """
+    method, level = compression
+    if method == zipfile.ZIP_STORED:
+        return 0
+    return max(1, min(level, 9))
@@ -1,9 +1,35 @@
 import os
 
+from platform_layer import default_drives
+
 VPS_API_URL = "https://zoltean.zapto.org/multitool/api/versions"
 VPS_VERSION_URL = "https://zoltean.zapto.org/multitool/api/tool_version"
-DRIVES = ["C:\\", "D:\\", "E:\\", "F:\\"]
+# CBX_DRIVES=<шлях>[;<шлях>...] (через os.pathsep) замінює корені пошуку кас, наприклад змодельованим деревом
+DRIVES = [drive for drive in os.environ.get("CBX_DRIVES", "").split(os.pathsep) if drive] or default_drives()
 PROGRAM_VERSION = "0.1.3_beta"
 PROGRAM_TITLE = f"CBX Multi Tool {PROGRAM_VERSION}"
-
-os.system(f"title {PROGRAM_TITLE}")
\ No newline at end of file
+NO_DELAY = os.environ.get("CBX_NO_DELAY", "").strip() not in ("", "0")
+# CBX_TRACE=1 записує трасу сесії в cbx_trace_<дата>.json, CBX_TRACE=<файл>.json — у вказаний файл
+TRACE = os.environ.get("CBX_TRACE", "").strip()
+# Скільки останніх інтервалів траси тримати в пам'яті (служба працює довго й інакше накопичує їх без меж)
+TRACE_SPAN_LIMIT = 100000
+# CBX_PROFILE=1 профілює кожну дію меню в cbx_profiles/, CBX_PROFILE=<директорія> — у вказану директорію
+PROFILE_ACTIONS = os.environ.get("CBX_PROFILE", "").strip()
+PROFILE_TOP = 15
+READINESS_TIMEOUT = 30.0
+STREAM_PATCHES = True
+PATCH_HISTORY_FILE = "patch_history.json"
+INCREMENTAL_BACKUPS = True
+PATCH_BACKUP_PROFILE = "fast"
+VERIFY_BACKUPS = True
+BACKUP_JOBS_PER_DISK = 1
+BACKUP_RETENTION = {
+    "keep_last": 5,
+    "keep_daily_days": 7,
+    "max_total_bytes": 2 * 1024 * 1024 * 1024
+}
+# Режим служби (cli.py serve): локальний JSON API зі станом кас
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
+DAEMON_REFRESH_INTERVAL = 5.0
+DAEMON_REDISCOVER_INTERVAL = 300.0
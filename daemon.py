@@ -0,0 +1,325 @@
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from config import DAEMON_HOST, DAEMON_PORT, DAEMON_REDISCOVER_INTERVAL, DAEMON_REFRESH_INTERVAL
+from search_utils import find_register_paths, get_cash_register_info, read_transaction_summary, reset_cache
+from tracing import annotate, traced
+
+# Файли, зміна яких означає, що стан каси треба прочитати заново
+WATCHED_FILES = ("agent.db", "agent.db-wal", "version")
+
+# Представлення /health, /transactions, /shifts і /running — підмножини полів /registers
+VIEWS = {
+    "health": ("name", "path", "fiscal_number", "health", "trans_status", "healthy"),
+    "transactions": ("name", "path", "fiscal_number", "trans_status", "transactions"),
+    "shifts": ("name", "path", "fiscal_number", "shift_status"),
+    "running": ("name", "path", "fiscal_number", "is_running"),
+}
+
+
+def _signature(path: str) -> Tuple:
+    signature = []
+    for name in WATCHED_FILES:
+        try:
+            stat = os.stat(os.path.join(path, name))
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def _running_register_dirs() -> set:
+    """
+    Повертає директорії запущених checkbox_kasa.exe за один прохід по процесах.
+    """
+    import psutil
+
+    dirs = set()
+    for proc in psutil.process_iter(["name", "exe"]):
+        try:
+            if (proc.info["name"] or "").lower() == "checkbox_kasa.exe" and proc.info["exe"]:
+                dirs.add(os.path.normcase(os.path.dirname(os.path.realpath(proc.info["exe"]))))
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return dirs
+
+
+def _encode(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, default=str).encode("utf-8")
+
+
+class RegisterCache:
+    """
+    Теплий кеш пошуку кас і їхнього стану для режиму служби.
+
+    Повний пошук кас на дисках виконується раз на rediscover_interval секунд. Між ними кожне
+    оновлення лише перевіряє час зміни та розмір agent.db, agent.db-wal і version кожної каси
+    й заново читає базу тільки тих кас, у яких ці файли змінилися; стан запуску визначається
+    одним проходом по процесах. Після оновлення відповіді API кодуються в JSON наперед, тож
+    запит до служби лише віддає готові байти.
+
+    Args:
+        drives (List[str]): Диски для пошуку кас.
+        refresh_interval (float): Інтервал фонового оновлення в секундах.
+        rediscover_interval (float): Інтервал повного пошуку кас у секундах.
+    """
+
+    def __init__(self, drives: List[str], refresh_interval: float = DAEMON_REFRESH_INTERVAL,
+                 rediscover_interval: float = DAEMON_REDISCOVER_INTERVAL):
+        self.drives = drives
+        self.refresh_interval = refresh_interval
+        self.rediscover_interval = rediscover_interval
+        self._refresh_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._entries: Dict[str, Dict] = {}
+        self._discovery: Optional[Tuple[Optional[str], bool, List[Tuple[str, bool]]]] = None
+        self._discovered_at = 0.0
+        self._registers: List[Dict] = []
+        self._bodies: Dict[str, bytes] = {}
+        self.generation = 0
+
+    @traced()
+    def refresh(self, rediscover: bool = False) -> Dict:
+        """
+        Оновлює кеш і повертає статус оновлення.
+
+        Args:
+            rediscover (bool): Виконати повний пошук кас незалежно від інтервалу.
+
+        Returns:
+            Dict: Статус, який також віддається за адресою /status.
+        """
+        with self._refresh_lock:
+            started = time.perf_counter()
+            if rediscover or self._discovery is None or \
+                    time.monotonic() - self._discovered_at >= self.rediscover_interval:
+                reset_cache()
+                self._discovery = find_register_paths(self.drives, use_cache=False)
+                self._discovered_at = time.monotonic()
+            manager_dir, profiles_empty, paths = self._discovery
+
+            running = _running_register_dirs()
+            entries = {}
+            registers = []
+            inspected = 0
+            for path, is_external in paths:
+                signature = _signature(path)
+                entry = self._entries.get(path)
+                if entry is None or entry["signature"] != signature or entry["info"]["is_external"] != is_external:
+                    info = get_cash_register_info(path, is_external=is_external)
+                    info["transactions"] = read_transaction_summary(path)
+                    entry = {"signature": signature, "info": info}
+                    inspected += 1
+                entries[path] = entry
+                register = dict(entry["info"], is_running=os.path.normcase(os.path.realpath(path)) in running)
+                register["healthy"] = register["health"] == "OK" and register["trans_status"] in ("DONE", "EMPTY")
+                registers.append(register)
+            annotate(registers=len(registers), inspected=inspected)
+
+            status = {
+                "generation": self.generation + 1,
+                "updated_at": datetime.now().isoformat(timespec="seconds"),
+                "refresh_ms": round((time.perf_counter() - started) * 1000, 1),
+                "inspected": inspected,
+                "reused": len(registers) - inspected,
+                "manager_dir": manager_dir,
+                "profiles_empty": profiles_empty,
+                "registers": len(registers)
+            }
+            bodies = {
+                "/status": _encode(status),
+                "/registers": _encode({"manager_dir": manager_dir, "profiles_empty": profiles_empty,
+                                       "registers": registers})
+            }
+            for view, fields in VIEWS.items():
+                bodies[f"/{view}"] = _encode([{field: register[field] for field in fields} for register in registers])
+
+            self._entries = entries
+            self._registers = registers
+            self._bodies = bodies
+            self.generation += 1
+            return status
+
+    def body(self, path: str) -> Optional[bytes]:
+        """
+        Повертає наперед закодовану відповідь для адреси API або None, якщо кеш ще не заповнено.
+        """
+        return self._bodies.get(path)
+
+    def find(self, key: str) -> Optional[Dict]:
+        """
+        Знаходить касу в кеші за назвою, іменем директорії, фіскальним номером або шляхом.
+        """
+        for register in self._registers:
+            if key in (register["name"], os.path.basename(register["path"]), register["fiscal_number"],
+                       register["path"]):
+                return register
+        return None
+
+    def start(self) -> None:
+        """
+        Запускає фоновий потік, який оновлює кеш кожні refresh_interval секунд.
+        """
+        self._thread = threading.Thread(target=self._run, name="cbx-daemon-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Cache refresh failed: {e}", file=sys.stderr)
+            self._wakeup.wait(self.refresh_interval)
+            self._wakeup.clear()
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """
+    Обробник JSON API служби.
+
+    GET /status, /registers, /health, /transactions, /shifts, /running — стан із кешу;
+    GET /registers/<каса> — одна каса; ?fresh=1 виконує оновлення кешу перед відповіддю.
+    POST /refresh оновлює кеш (з ?rediscover=1 — із повним пошуком кас) і повертає статус.
+    """
+
+    cache: RegisterCache = None
+    server_version = "CBXDaemon/1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, code: int, body: bytes) -> None:
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, code: int, message: str) -> None:
+        self._send(code, _encode({"error": message}))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/") or "/status"
+        if parse_qs(url.query).get("fresh") == ["1"]:
+            self.cache.refresh()
+
+        if path.startswith("/registers/"):
+            register = self.cache.find(unquote(path[len("/registers/"):]))
+            if register is None:
+                self._send_error(404, "cash register not found")
+            else:
+                self._send(200, _encode(register))
+            return
+
+        body = self.cache.body(path)
+        if body is not None:
+            self._send(200, body)
+        elif path == "/status" or path == "/registers" or path[1:] in VIEWS:
+            self._send_error(503, "cache is warming up")
+        else:
+            self._send_error(404, "not found")
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") != "/refresh":
+            self._send_error(404, "not found")
+            return
+        self._send(200, _encode(self.cache.refresh(rediscover=parse_qs(url.query).get("rediscover") == ["1"])))
+
+
+def start_server(cache: RegisterCache, host: str = DAEMON_HOST, port: int = DAEMON_PORT) -> ThreadingHTTPServer:
+    """
+    Створює HTTP-сервер служби і запускає його в фоновому потоці.
+
+    Args:
+        cache (RegisterCache): Кеш, з якого сервер віддає стан кас.
+        host (str): Адреса прослуховування. За замовчуванням лише локальна.
+        port (int): Порт (0 — вибрати вільний).
+
+    Returns:
+        ThreadingHTTPServer: Запущений сервер; зупиняється через shutdown() і server_close().
+    """
+    handler = type("Handler", (DaemonHandler,), {"cache": cache})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="cbx-daemon-http", daemon=True).start()
+    return server
+
+
+def serve(drives: List[str], host: str = DAEMON_HOST, port: int = DAEMON_PORT,
+          refresh_interval: float = DAEMON_REFRESH_INTERVAL,
+          rediscover_interval: float = DAEMON_REDISCOVER_INTERVAL) -> None:
+    """
+    Запускає службу і працює до Ctrl+C.
+
+    Args:
+        drives (List[str]): Диски для пошуку кас.
+        host (str): Адреса прослуховування.
+        port (int): Порт.
+        refresh_interval (float): Інтервал фонового оновлення в секундах.
+        rediscover_interval (float): Інтервал повного пошуку кас у секундах.
+
+    Raises:
+        OSError: Якщо порт зайнятий.
+    """
+    cache = RegisterCache(drives, refresh_interval, rediscover_interval)
+    server = start_server(cache, host, port)
+    cache.start()
+    print(f"Serving cash register state on http://{host}:{server.server_address[1]} (Ctrl+C to stop)",
+          file=sys.stderr)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cache.stop()
+        server.shutdown()
+        server.server_close()
+
+
+def fetch_registers(fresh: bool = False, host: str = DAEMON_HOST, port: int = DAEMON_PORT,
+                    timeout: float = 2.0) -> Optional[Dict]:
+    """
+    Читає стан кас із запущеної служби.
+
+    Args:
+        fresh (bool): Попросити службу оновити кеш перед відповіддю.
+        host (str): Адреса служби.
+        port (int): Порт служби.
+        timeout (float): Тайм-аут запиту в секундах.
+
+    Returns:
+        Optional[Dict]: Те саме, що повертає search_utils.discover_cash_registers, або None,
+            якщо служба не запущена, ще не заповнила кеш або відповіла некоректно.
+    """
+    from urllib.request import ProxyHandler, build_opener
+
+    url = f"http://{host}:{port}/registers{'?fresh=1' if fresh else ''}"
+    # Служба слухає лише локальну адресу, тож HTTP(S)_PROXY з оточення обходимо
+    opener = build_opener(ProxyHandler({}))
+    try:
+        with opener.open(url, timeout=timeout) as response:
+            found = json.loads(response.read().decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(found, dict) or not isinstance(found.get("registers"), list) or "manager_dir" not in found:
+        return None
+    return found
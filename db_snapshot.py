@@ -0,0 +1,112 @@
+import itertools
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+SNAPSHOT_PAGES = 256
+SNAPSHOT_SLEEP = 0.005
+SNAPSHOT_TIMEOUT = 30.0
+DATABASE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+SIDE_FILE_SUFFIXES = ("-wal", "-shm", "-journal")
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+
+def is_sqlite_database(path: str) -> bool:
+    """
+    Перевіряє, чи є файл базою даних SQLite, за розширенням і заголовком.
+
+    Args:
+        path (str): Шлях до файлу.
+
+    Returns:
+        bool: True, якщо файл має розширення бази даних і заголовок SQLite.
+    """
+    if not path.lower().endswith(DATABASE_EXTENSIONS):
+        return False
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+    except OSError:
+        return False
+
+
+def snapshot_database(db_path: str, dest_path: str, pages: int = SNAPSHOT_PAGES) -> None:
+    """
+    Створює узгоджену копію бази даних через онлайн backup API SQLite.
+
+    Копіювання виконується порціями по `pages` сторінок із короткою паузою між ними,
+    тому каса може продовжувати писати в базу. Якщо база змінюється під час копіювання,
+    SQLite сам перезапускає процес, і результат завжди відповідає одному стану бази
+    (включно з даними, які ще лежать у WAL-файлі).
+
+    Args:
+        db_path (str): Шлях до бази даних.
+        dest_path (str): Шлях до файлу копії.
+        pages (int): Кількість сторінок за один крок. За замовчуванням SNAPSHOT_PAGES.
+
+    Raises:
+        sqlite3.Error: Якщо базу неможливо прочитати або копію неможливо записати.
+    """
+    source = sqlite3.connect(db_path, timeout=SNAPSHOT_TIMEOUT)
+    try:
+        target = sqlite3.connect(dest_path)
+        try:
+            source.backup(target, pages=pages, sleep=SNAPSHOT_SLEEP)
+        finally:
+            target.close()
+    finally:
+        source.close()
+
+
+def is_side_file(path: str) -> bool:
+    """
+    Перевіряє, чи є файл службовим файлом SQLite (-wal, -shm, -journal) поруч із базою даних.
+
+    Такі файли не потрібні в резервній копії: їхній вміст уже враховано в онлайн-копії бази,
+    а відновлення старого WAL поруч із новою базою може її пошкодити.
+
+    Args:
+        path (str): Шлях до файлу.
+
+    Returns:
+        bool: True, якщо файл належить базі даних SQLite.
+    """
+    for suffix in SIDE_FILE_SUFFIXES:
+        if path.endswith(suffix) and is_sqlite_database(path[:-len(suffix)]):
+            return True
+    return False
+
+
+@contextmanager
+def snapshot_session(pages: int = SNAPSHOT_PAGES) -> Iterator[Callable[[str], Optional[str]]]:
+    """
+    Готує джерела для резервної копії працюючої каси під час потокового обходу дерева.
+
+    Повертає функцію, яка для кожного файлу визначає, що саме слід читати: для бази SQLite
+    одразу створюється онлайн-копія в тимчасовій директорії, службові файли бази пропускаються,
+    решта файлів читається як є. Тимчасова директорія видаляється після виходу з блоку.
+
+    Args:
+        pages (int): Кількість сторінок за один крок. За замовчуванням SNAPSHOT_PAGES.
+
+    Yields:
+        Callable[[str], Optional[str]]: Шлях до файлу -> шлях, який слід читати, або None, якщо файл пропускається.
+
+    Raises:
+        sqlite3.Error: Якщо онлайн-копію бази створити не вдалося.
+    """
+    with tempfile.TemporaryDirectory(prefix="cbx_db_") as work_dir:
+        counter = itertools.count()
+
+        def resolve(path: str) -> Optional[str]:
+            if is_sqlite_database(path):
+                dest_path = os.path.join(work_dir, f"{next(counter)}_{os.path.basename(path)}")
+                snapshot_database(path, dest_path, pages)
+                return dest_path
+            if is_side_file(path):
+                return None
+            return path
+
+        yield resolve
@@ -0,0 +1,208 @@
+import os
+import shutil
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from tqdm import tqdm
+from colorama import Fore, Style
+
+from chunk_store import is_manifest, load_manifest, manifest_store_dir, restore_file
+from integrity import check_member, default_workers
+from stream_unzip import safe_member_path
+from tree_scan import scan_tree
+
+STAGING_SUFFIX = ".cbx_restore"
+OLD_SUFFIX = ".cbx_old"
+
+
+class _ZipSource:
+    """
+    Джерело файлів для відновлення з ZIP-архіву.
+    """
+
+    def __init__(self, backup_path: str):
+        self._zip = zipfile.ZipFile(backup_path, "r")
+        infos = self._zip.infolist()
+        self.members: List[zipfile.ZipInfo] = [info for info in infos if not info.is_dir()]
+        self.dirs: List[str] = [info.filename.rstrip("/") for info in infos if info.is_dir()]
+
+    def write(self, member: zipfile.ZipInfo, dest_path: str) -> None:
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with self._zip.open(member) as src, open(dest_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+
+    def close(self) -> None:
+        self._zip.close()
+
+
+class _ManifestSource:
+    """
+    Джерело файлів для відновлення з маніфесту інкрементної копії.
+
+    Записи маніфесту подаються як zipfile.ZipInfo з розміром і CRC-32, тому порівняння
+    з поточними файлами однакове для обох форматів.
+    """
+
+    def __init__(self, backup_path: str):
+        manifest = load_manifest(backup_path)
+        self._store_dir = manifest_store_dir(backup_path, manifest)
+        self._entries: Dict[str, Dict] = {}
+        self.members: List[zipfile.ZipInfo] = []
+        self.dirs: List[str] = list(manifest.get("dirs", []))
+        for entry in manifest["files"]:
+            info = zipfile.ZipInfo(entry["path"])
+            info.file_size = entry["size"]
+            info.CRC = entry["crc32"]
+            self._entries[entry["path"]] = entry
+            self.members.append(info)
+
+    def write(self, member: zipfile.ZipInfo, dest_path: str) -> None:
+        restore_file(self._store_dir, self._entries[member.filename], dest_path)
+
+    def close(self) -> None:
+        pass
+
+
+def _open_source(backup_path: str):
+    return _ManifestSource(backup_path) if is_manifest(backup_path) else _ZipSource(backup_path)
+
+
+def plan_restore(target_dir: str, members: List[zipfile.ZipInfo]) -> Dict[str, List]:
+    """
+    Порівнює члени резервної копії з поточним вмістом директорії за розміром і CRC-32.
+
+    Args:
+        target_dir (str): Директорія каси.
+        members (List[zipfile.ZipInfo]): Файли резервної копії.
+
+    Returns:
+        Dict[str, List]: unchanged і changed — члени копії, extra — відносні шляхи файлів,
+            яких немає в копії.
+    """
+    jobs = [(member, safe_member_path(target_dir, member.filename)) for member in members]
+    jobs = [(member, path) for member, path in jobs if path]
+    with ThreadPoolExecutor(max_workers=default_workers()) as pool:
+        reasons = list(pool.map(lambda job: check_member(job[1], job[0]), jobs))
+
+    backup_paths = {os.path.normcase(os.path.normpath(path)) for _, path in jobs}
+    extra = [] if not os.path.isdir(target_dir) else [
+        entry.rel_path for entry in scan_tree(target_dir)
+        if os.path.normcase(os.path.normpath(entry.path)) not in backup_paths
+    ]
+    return {
+        "unchanged": [member for (member, _), reason in zip(jobs, reasons) if reason is None],
+        "changed": [member for (member, _), reason in zip(jobs, reasons) if reason is not None],
+        "extra": extra
+    }
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _apply_in_place(target_dir: str, staging_dir: str, changed: List[zipfile.ZipInfo], extra: List[str]) -> None:
+    for member in changed:
+        src = safe_member_path(staging_dir, member.filename)
+        dst = safe_member_path(target_dir, member.filename)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        os.replace(src, dst)
+    for rel_path in extra:
+        os.remove(os.path.join(target_dir, *rel_path.split("/")))
+
+
+def differential_restore(target_dir: str, backup_path: str) -> Dict[str, int]:
+    """
+    Відновлює директорію з резервної копії, переписуючи лише файли, що відрізняються.
+
+    Нова версія директорії спочатку повністю збирається поруч у staging: незмінені файли
+    переносяться жорсткими посиланнями (або копіюються, якщо посилання неможливі), а змінені
+    та відсутні розпаковуються з копії. Потім staging атомарно підміняє цільову директорію
+    двома перейменуваннями. Якщо директорію перейменувати неможливо (наприклад, її тримає
+    інший процес), змінені файли переносяться поверх поточних по одному, а зайві видаляються.
+    Будь-яка помилка до підміни залишає цільову директорію недоторканою. Якщо попереднє
+    відновлення перервалося після першого перейменування, стара версія повертається на місце.
+
+    Args:
+        target_dir (str): Директорія, яку потрібно відновити.
+        backup_path (str): Шлях до ZIP-файлу або маніфесту резервної копії.
+
+    Returns:
+        Dict[str, int]: Кількість незмінених, переписаних і видалених файлів
+            (ключі unchanged, changed, removed).
+
+    Raises:
+        OSError, ValueError, zipfile.BadZipFile: Якщо копію неможливо прочитати або записати файли.
+    """
+    target_dir = os.path.normpath(os.path.abspath(target_dir))
+    staging_dir = target_dir + STAGING_SUFFIX
+    old_dir = target_dir + OLD_SUFFIX
+    if os.path.exists(staging_dir):
+        shutil.rmtree(staging_dir)
+    if os.path.exists(old_dir):
+        if os.path.isdir(target_dir):
+            shutil.rmtree(old_dir)
+        else:
+            # Попереднє відновлення перервалося між двома перейменуваннями — повертаємо стару версію
+            os.rename(old_dir, target_dir)
+
+    source = _open_source(backup_path)
+    try:
+        print(f"{Fore.YELLOW}Comparing backup with {target_dir}...{Style.RESET_ALL}")
+        plan = plan_restore(target_dir, source.members)
+        changed = plan["changed"]
+        print(f"{Fore.CYAN}Unchanged: {len(plan['unchanged'])}, to restore: {len(changed)}, "
+              f"to remove: {len(plan['extra'])}{Style.RESET_ALL}")
+
+        os.makedirs(staging_dir)
+        try:
+            for rel_dir in source.dirs:
+                path = safe_member_path(staging_dir, rel_dir)
+                if path:
+                    os.makedirs(path, exist_ok=True)
+            for member in plan["unchanged"]:
+                _link_or_copy(safe_member_path(target_dir, member.filename),
+                              safe_member_path(staging_dir, member.filename))
+            with tqdm(total=len(changed), desc="Restoring files",
+                      bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}]") as pbar:
+                for member in changed:
+                    source.write(member, safe_member_path(staging_dir, member.filename))
+                    pbar.update(1)
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+    finally:
+        source.close()
+
+    swapped = False
+    if os.path.isdir(target_dir):
+        try:
+            os.rename(target_dir, old_dir)
+        except OSError:
+            print(f"{Fore.YELLOW}⚠ {target_dir} is in use, applying changes in place...{Style.RESET_ALL}")
+            try:
+                _apply_in_place(target_dir, staging_dir, changed, plan["extra"])
+            finally:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+        else:
+            swapped = True
+    else:
+        swapped = True
+        old_dir = None
+
+    if swapped:
+        try:
+            os.rename(staging_dir, target_dir)
+        except OSError:
+            if old_dir:
+                os.rename(old_dir, target_dir)
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    return {"unchanged": len(plan["unchanged"]), "changed": len(changed), "removed": len(plan["extra"])}
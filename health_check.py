@@ -1,20 +1,42 @@
 import os
 import requests
-from typing import Dict
+from typing import Dict, Optional
 from colorama import Fore, Style, init
 from config import DRIVES
+from daemon import fetch_registers
+from platform_layer import open_folder
 from utils import (
-    run_spinner, launch_executable, manage_process_lifecycle, read_json_file, write_json_file
+    clear_screen, run_spinner, launch_executable, manage_process_lifecycle, read_json_file, spinner, write_json_file
 )
 from cleanup import cleanup
-from search_utils import (
-    find_manager_by_exe, find_cash_registers_by_profiles_json,
-    find_cash_registers_by_exe, get_cash_register_info, reset_cache
-)
+from readiness import get_web_server_address, wait_for_cash_register
+from search_utils import discover_cash_registers, reset_cache
 
 init(autoreset=True)
 
 
+def refresh_register_shift(cash_path: str) -> Optional[str]:
+    """
+    Надсилає касі запит на оновлення зміни (POST /api/v1/shift/refresh).
+
+    Args:
+        cash_path (str): Шлях до директорії каси.
+
+    Returns:
+        Optional[str]: None у разі успіху або опис помилки.
+    """
+    address = get_web_server_address(cash_path)
+    if not address:
+        return "cannot read web_server settings from config.json"
+    host, port = address
+    try:
+        response = requests.post(f"http://{host}:{port}/api/v1/shift/refresh", timeout=5)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        return str(e)
+    return None
+
+
 def check_cash_profiles(data: Dict):
     """
     Перевіряє стан кас та надає інтерфейс для їх управління.
@@ -38,39 +60,19 @@ def check_cash_profiles(data: Dict):
     """
     cache_valid = False
     while True:
-        os.system("cls" if os.name == "nt" else "clear")
+        clear_screen()
         print(f"{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}")
         print(f"{Fore.CYAN} CASH REGISTER HEALTH CHECK ".center(50) + f"{Style.RESET_ALL}")
         print(f"{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}\n")
 
-        profiles_info = []
-        seen_paths = set()
-        profile_paths = set()
-
-        manager_dir = find_manager_by_exe(DRIVES, use_cache=cache_valid)
-        if not manager_dir:
+        with spinner("Searching cash registers"):
+            # Якщо запущена служба (cli.py serve), стан кас береться з її кешу
+            found = fetch_registers(fresh=not cache_valid) or discover_cash_registers(DRIVES, use_cache=cache_valid)
+        profiles_info = found["registers"]
+        if not found["manager_dir"]:
             print(f"{Fore.RED}✗ Manager directory or kasa_manager.exe not found!{Style.RESET_ALL}")
-
-        if manager_dir:
-            profile_cashes, is_empty, profile_seen_paths = find_cash_registers_by_profiles_json(manager_dir, use_cache=cache_valid)
-            if is_empty:
-                print(f"{Fore.RED}! ! ! PROFILES.JSON IS EMPTY ! ! !{Style.RESET_ALL}")
-            for cash in profile_cashes:
-                normalized_path = os.path.normpath(os.path.abspath(cash["path"]))
-                if normalized_path not in seen_paths:
-                    profiles_info.append(get_cash_register_info(cash["path"], is_external=False))
-                    seen_paths.add(normalized_path)
-                    profile_paths.add(normalized_path)
-
-        cash_registers = find_cash_registers_by_exe(manager_dir, DRIVES, use_cache=cache_valid)
-        for cash in cash_registers:
-            normalized_path = os.path.normpath(os.path.abspath(cash["path"]))
-            if normalized_path not in seen_paths:
-                is_external = normalized_path not in profile_paths
-                profiles_info.append(get_cash_register_info(cash["path"], is_external=is_external))
-                seen_paths.add(normalized_path)
-
-        run_spinner("Searching cash registers", 1.0)
+        if found["profiles_empty"]:
+            print(f"{Fore.RED}! ! ! PROFILES.JSON IS EMPTY ! ! !{Style.RESET_ALL}")
 
         if not profiles_info:
             print(f"{Fore.RED}✗ No cash registers found!{Style.RESET_ALL}")
@@ -124,7 +126,7 @@ def check_cash_profiles(data: Dict):
                     selected_profile = profiles_info[profile_num - 1]
                     folder_path = os.path.normpath(os.path.abspath(selected_profile['path']))
                     if os.path.exists(folder_path):
-                        os.startfile(folder_path)
+                        open_folder(folder_path)
                         print(f"{Fore.GREEN}✓ Opened folder {folder_path}{Style.RESET_ALL}")
                         run_spinner("Folder opened", 1.0)
                     else:
@@ -191,7 +193,9 @@ def check_cash_profiles(data: Dict):
                         print(f"{Fore.YELLOW}⚠ No changes made (empty inputs){Style.RESET_ALL}")
                         run_spinner("No changes", 2.0)
 
-                    if launch_executable("checkbox_kasa.exe", selected_profile['path'], "Cash register"):
+                    if launch_executable("checkbox_kasa.exe", selected_profile['path'], "Cash register",
+                                         spinner_duration=0.0):
+                        wait_for_cash_register(selected_profile['path'])
                         reset_cache()
                         cache_valid = False
 
@@ -213,26 +217,14 @@ def check_cash_profiles(data: Dict):
                     selected_profile = profiles_info[profile_num - 1]
                     print(f"{Fore.CYAN}🔄 Refreshing shift for {selected_profile['name']}...{Style.RESET_ALL}")
 
-                    config_path = os.path.normpath(os.path.join(selected_profile['path'], "config.json"))
-                    config = read_json_file(config_path)
-                    if not config:
-                        run_spinner("Config error", 2.0)
-                        continue
-
-                    web_server = config.get("web_server", {})
-                    host = web_server.get("host", "127.0.0.1")
-                    port = web_server.get("port", 9200)
-                    url = f"http://{host}:{port}/api/v1/shift/refresh"
-
-                    try:
-                        response = requests.post(url, timeout=5)
-                        response.raise_for_status()
+                    error = refresh_register_shift(selected_profile['path'])
+                    if error is None:
                         print(f"{Fore.GREEN}✓ Shift refreshed successfully!{Style.RESET_ALL}")
                         reset_cache()
                         cache_valid = False
                         run_spinner("Shift refreshed", 1.0)
-                    except requests.RequestException as e:
-                        print(f"{Fore.RED}✗ Failed to refresh shift: {e}{Style.RESET_ALL}")
+                    else:
+                        print(f"{Fore.RED}✗ Failed to refresh shift: {error}{Style.RESET_ALL}")
                         run_spinner("Shift refresh failed", 2.0)
                 else:
                     print(f"{Fore.RED}✗ Invalid profile number!{Style.RESET_ALL}")
@@ -260,7 +252,9 @@ def check_cash_profiles(data: Dict):
                     run_spinner("Suspend failed", 2.0)
                     continue
 
-                if launch_executable("checkbox_kasa.exe", selected_profile['path'], "Cash register"):
+                if launch_executable("checkbox_kasa.exe", selected_profile['path'], "Cash register",
+                                     spinner_duration=0.0):
+                    wait_for_cash_register(selected_profile['path'])
                     reset_cache()
                     cache_valid = False
 
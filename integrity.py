@@ -0,0 +1,267 @@
+import os
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from colorama import Fore, Style
+
+from chunk_store import is_manifest, load_manifest, manifest_store_dir, read_chunk
+from stream_unzip import safe_member_path
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def default_workers() -> int:
+    """
+    Повертає розмір пулу для задач хешування, які впираються в диск і zlib.
+
+    Returns:
+        int: Кількість потоків.
+    """
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def file_crc32(path: str) -> Tuple[int, int]:
+    """
+    Обчислює CRC-32 (як у ZIP) і розмір файлу, читаючи його блоками.
+
+    Args:
+        path (str): Шлях до файлу.
+
+    Returns:
+        Tuple[int, int]: CRC-32 і кількість прочитаних байтів.
+
+    Raises:
+        OSError: Якщо файл недоступний.
+    """
+    crc = 0
+    size = 0
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(CHUNK_SIZE)
+            if not block:
+                break
+            crc = zlib.crc32(block, crc)
+            size += len(block)
+    return crc, size
+
+
+def check_member(path: str, member: zipfile.ZipInfo) -> Optional[str]:
+    """
+    Порівнює файл на диску з метаданими члена архіву.
+
+    Спочатку перевіряється розмір, і лише якщо він збігається, файл читається для CRC-32.
+
+    Args:
+        path (str): Шлях до файлу на диску.
+        member (zipfile.ZipInfo): Метадані члена архіву.
+
+    Returns:
+        Optional[str]: None, якщо файл збігається, інакше причина: "missing", "size", "crc" або текст помилки.
+    """
+    try:
+        if os.stat(path).st_size != member.file_size:
+            return "size"
+        crc, _ = file_crc32(path)
+    except FileNotFoundError:
+        return "missing"
+    except OSError as e:
+        return str(e)
+    return None if crc == member.CRC else "crc"
+
+
+def verify_extracted_files(members: Iterable[zipfile.ZipInfo], target_dirs: List[str],
+                           skip_names: Optional[Set[str]] = None,
+                           max_workers: Optional[int] = None) -> Dict[str, List[Dict]]:
+    """
+    Перевіряє, що кожен файл архіву коректно записано в кожну цільову директорію.
+
+    Перевірки всіх файлів у всіх директоріях виконуються одним пулом потоків.
+
+    Args:
+        members (Iterable[zipfile.ZipInfo]): Члени архіву.
+        target_dirs (List[str]): Директорії, куди було розпаковано архів.
+        skip_names (Optional[Set[str]]): Базові імена файлів, які навмисно видаляються
+            після розпакування (наприклад, ".need_reboot"). За замовчуванням None.
+        max_workers (Optional[int]): Розмір пулу потоків. За замовчуванням default_workers().
+
+    Returns:
+        Dict[str, List[Dict]]: Для кожної директорії — список невідповідностей (file, reason).
+    """
+    skip_names = skip_names or set()
+    jobs = []
+    for member in members:
+        if member.is_dir() or os.path.basename(member.filename.rstrip("/")) in skip_names:
+            continue
+        for target_dir in target_dirs:
+            path = safe_member_path(target_dir, member.filename)
+            if path:
+                jobs.append((target_dir, member, path))
+
+    results: Dict[str, List[Dict]] = {target_dir: [] for target_dir in target_dirs}
+    with ThreadPoolExecutor(max_workers=max_workers or default_workers()) as pool:
+        outcomes = pool.map(lambda job: check_member(job[2], job[1]), jobs)
+        for (target_dir, member, _), reason in zip(jobs, outcomes):
+            if reason:
+                results[target_dir].append({"file": member.filename, "reason": reason})
+    return results
+
+
+def print_verification_report(results: Dict[str, List[Dict]], max_items: int = 10) -> List[str]:
+    """
+    Виводить звіт перевірки по кожній директорії.
+
+    Args:
+        results (Dict[str, List[Dict]]): Результат verify_extracted_files.
+        max_items (int): Скільки невідповідностей показувати для однієї директорії. За замовчуванням 10.
+
+    Returns:
+        List[str]: Директорії, для яких перевірка не пройшла.
+    """
+    failed = []
+    print(f"{Fore.CYAN}🔎 Verification report:{Style.RESET_ALL}")
+    for target_dir, problems in results.items():
+        if not problems:
+            print(f"{Fore.GREEN}  ✓ PASS {target_dir}{Style.RESET_ALL}")
+            continue
+        failed.append(target_dir)
+        print(f"{Fore.RED}  ✗ FAIL {target_dir} ({len(problems)} files){Style.RESET_ALL}")
+        for problem in problems[:max_items]:
+            print(f"{Fore.RED}      - {problem['file']}: {problem['reason']}{Style.RESET_ALL}")
+        if len(problems) > max_items:
+            print(f"{Fore.RED}      ... and {len(problems) - max_items} more{Style.RESET_ALL}")
+    return failed
+
+
+def _read_member(zip_ref: zipfile.ZipFile, name: str) -> Optional[str]:
+    try:
+        with zip_ref.open(name) as member:
+            while member.read(CHUNK_SIZE):
+                pass
+    except (zipfile.BadZipFile, zlib.error, EOFError) as e:
+        return str(e) or "corrupt"
+    except OSError as e:
+        return str(e)
+    return None
+
+
+def verify_zip_archive(zip_path: str, max_workers: Optional[int] = None) -> List[Dict]:
+    """
+    Перечитує кожен член ZIP-архіву та перевіряє його CRC-32.
+
+    Члени перевіряються паралельно; кожен потік відкриває архів окремо, щоб читання не
+    серіалізувалося на спільному дескрипторі файлу.
+
+    Args:
+        zip_path (str): Шлях до архіву.
+        max_workers (Optional[int]): Розмір пулу потоків. За замовчуванням default_workers().
+
+    Returns:
+        List[Dict]: Невідповідності (file, reason); порожній список, якщо архів цілий.
+    """
+    try:
+        with zipfile.ZipFile(zip_path, "r") as zip_ref:
+            names = [info.filename for info in zip_ref.infolist() if not info.is_dir()]
+    except (zipfile.BadZipFile, OSError) as e:
+        return [{"file": os.path.basename(zip_path), "reason": str(e)}]
+
+    local = threading.local()
+    opened: List[zipfile.ZipFile] = []
+    opened_lock = threading.Lock()
+
+    def check(name: str) -> Optional[str]:
+        zip_ref = getattr(local, "zip_ref", None)
+        if zip_ref is None:
+            zip_ref = local.zip_ref = zipfile.ZipFile(zip_path, "r")
+            with opened_lock:
+                opened.append(zip_ref)
+        return _read_member(zip_ref, name)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers or default_workers()) as pool:
+            reasons = list(pool.map(check, names))
+    except (zipfile.BadZipFile, OSError) as e:
+        return [{"file": os.path.basename(zip_path), "reason": str(e)}]
+    finally:
+        for zip_ref in opened:
+            zip_ref.close()
+    return [{"file": name, "reason": reason} for name, reason in zip(names, reasons) if reason]
+
+
+def verify_manifest(manifest_path: str, max_workers: Optional[int] = None) -> List[Dict]:
+    """
+    Перевіряє, що всі чанки інкрементної копії наявні у сховищі та мають правильний SHA256.
+
+    Кожен унікальний чанк читається один раз, чанки перевіряються паралельно.
+
+    Args:
+        manifest_path (str): Шлях до маніфесту.
+        max_workers (Optional[int]): Розмір пулу потоків. За замовчуванням default_workers().
+
+    Returns:
+        List[Dict]: Невідповідності (file, reason); порожній список, якщо копія ціла.
+    """
+    try:
+        manifest = load_manifest(manifest_path)
+    except (OSError, ValueError) as e:
+        return [{"file": os.path.basename(manifest_path), "reason": str(e)}]
+    store_dir = manifest_store_dir(manifest_path, manifest)
+    digests = sorted({digest for entry in manifest["files"] for digest in entry["chunks"]})
+
+    def check(digest: str) -> Optional[str]:
+        try:
+            read_chunk(store_dir, digest)
+        except FileNotFoundError:
+            return "missing chunk"
+        except (OSError, ValueError, zlib.error) as e:
+            return str(e) or "corrupt chunk"
+        return None
+
+    with ThreadPoolExecutor(max_workers=max_workers or default_workers()) as pool:
+        bad = {digest: reason for digest, reason in zip(digests, pool.map(check, digests)) if reason}
+    problems = []
+    for entry in manifest["files"]:
+        reason = next((bad[digest] for digest in entry["chunks"] if digest in bad), None)
+        if reason:
+            problems.append({"file": entry["path"], "reason": reason})
+    return problems
+
+
+def verify_backup(backup_path: str, max_workers: Optional[int] = None) -> List[Dict]:
+    """
+    Перевіряє резервну копію будь-якого формату (ZIP або маніфест).
+
+    Args:
+        backup_path (str): Шлях до копії.
+        max_workers (Optional[int]): Розмір пулу потоків. За замовчуванням default_workers().
+
+    Returns:
+        List[Dict]: Невідповідності (file, reason); порожній список, якщо копія ціла.
+    """
+    if is_manifest(backup_path):
+        return verify_manifest(backup_path, max_workers)
+    return verify_zip_archive(backup_path, max_workers)
+
+
+def verify_backups(backup_paths: Iterable[str], max_workers: Optional[int] = None) -> Dict[str, List[Dict]]:
+    """
+    Перевіряє кілька резервних копій одночасно (наприклад, копії всіх кас перед оновленням).
+
+    Кожна копія перевіряється у власному потоці, а її члени — у власному пулі, тож повільний
+    диск однієї каси не затримує перевірку інших.
+
+    Args:
+        backup_paths (Iterable[str]): Шляхи до копій.
+        max_workers (Optional[int]): Розмір пулу для членів кожної копії. За замовчуванням default_workers().
+
+    Returns:
+        Dict[str, List[Dict]]: Невідповідності для кожної копії.
+    """
+    backup_paths = list(backup_paths)
+    if not backup_paths:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(backup_paths)) as pool:
+        results = pool.map(lambda path: verify_backup(path, max_workers), backup_paths)
+        return dict(zip(backup_paths, results))
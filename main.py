@@ -1,10 +1,10 @@
-
+import atexit
+import sys
 from colorama import init, Fore, Style
-from config import PROGRAM_TITLE, VPS_API_URL, VPS_CONFIG_URL
-from network import check_for_updates, fetch_json
-from menu import display_menu
-from utils import is_admin, run_spinner
-from cleanup import cleanup
+from catalog import CatalogError, get_catalog
+from config import PROGRAM_TITLE, VPS_API_URL
+from platform_layer import set_title
+from utils import is_admin, run_spinner, settle_status
 
 init()
 
@@ -26,10 +26,17 @@ def main():
         Exception: Загальні помилки, такі як проблеми з мережею, доступом до файлів або
                    несподівані помилки під час виконання.
     """
+    # Останні повідомлення статусу мають бути видні до закриття вікна
+    atexit.register(settle_status)
+    set_title(PROGRAM_TITLE)
     print(f"{Fore.CYAN}{'=' * 40}{Style.RESET_ALL}")
     print(f"{Fore.CYAN} Welcome to {PROGRAM_TITLE} {Style.RESET_ALL}")
     print(f"{Fore.CYAN}{'=' * 40}{Style.RESET_ALL}\n")
 
+    # network (requests) і menu імпортуються після привітання, щоб вікно не було порожнім під час запуску
+    from network import check_for_updates, fetch_json
+    from menu import display_menu
+
     try:
         if not is_admin():
             print(f"{Fore.YELLOW}⚠ Please run as administrator for full functionality.{Style.RESET_ALL}")
@@ -46,81 +53,15 @@ def main():
             input("\nPress Enter to exit...")
             return
 
-        menu_options = {
-            "legacy": {
-                "kasa_manager": data["legacy"]["kasa_manager"],
-                "rro_agent": data["legacy"]["rro_agent"]
-            },
-            "dev": {
-                "kasa_manager": data["dev"]["kasa_manager"],
-                "rro_agent": data["dev"]["rro_agent"],
-                "paylink": data["dev"]["paylink"]
-            },
-            "cloudlike": {
-                "cloudlike": data["legacy"]["cloudlike"]
-            },
-            "patching": {
-                "legacy": {
-                    "kasa_manager": [
-                        {
-                            "patch_name": item["patch_name"],
-                            "patch_url": item["patch_url"],
-                            "sha256": item.get("patch_sha256", "")
-                        }
-                        for item in data["legacy"]["kasa_manager"]
-                        if "patch_name" in item and "patch_url" in item
-                    ],
-                    "rro_agent": [
-                        {
-                            "patch_name": item["patch_name"],
-                            "patch_url": item["patch_url"],
-                            "sha256": item.get("patch_sha256", "")
-                        }
-                        for item in data["legacy"]["rro_agent"]
-                        if "patch_name" in item and "patch_url" in item
-                    ]
-                },
-                "dev": {
-                    "kasa_manager": [
-                        {
-                            "patch_name": item["patch_name"],
-                            "patch_url": item["patch_url"],
-                            "sha256": item.get("patch_sha256", "")
-                        }
-                        for item in data["dev"]["kasa_manager"]
-                        if "patch_name" in item and "patch_url" in item
-                    ],
-                    "rro_agent": [
-                        {
-                            "patch_name": item["patch_name"],
-                            "patch_url": item["patch_url"],
-                            "sha256": item.get("patch_sha256", "")
-                        }
-                        for item in data["dev"]["rro_agent"]
-                        if "patch_name" in item and "patch_url" in item
-                    ],
-                    "paylink": [
-                        {
-                            "patch_name": item["patch_name"],
-                            "patch_url": item["patch_url"],
-                            "sha256": item.get("patch_sha256", "")
-                        }
-                        for item in data["dev"]["paylink"]
-                        if "patch_name" in item and "patch_url" in item
-                    ]
-                }
-            },
-            "tools": {
-                "paylink": {
-                    "terminal_drivers": data["tools"]["paylink"]["terminal_drivers"],
-                    "os_tools": data["tools"]["paylink"]["os_tools"]
-                },
-                "rro_agent_tools": {
-                    "diagnostics": data["tools"]["rro_agent_tools"]["diagnostics"],
-                    "config_tools": data["tools"]["rro_agent_tools"]["config_tools"]
-                }
-            },
-        }
+        try:
+            catalog = get_catalog(data)
+        except CatalogError as e:
+            print(f"{Fore.RED}✗ Unexpected data from server: {e}{Style.RESET_ALL}")
+            input("\nPress Enter to exit...")
+            return
+        for problem in catalog.problems:
+            print(f"{Fore.YELLOW}⚠ Skipping invalid entry {problem}{Style.RESET_ALL}")
+        menu_options = catalog.menu_options()
 
         display_menu("Main Menu", menu_options, data,
                      update_available=update_available, download_url=download_url, sha256=sha256)
@@ -131,4 +72,12 @@ def main():
         input("\nPress Enter to exit...")
 
 if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0].split("=")[0] == "--profile-actions" and len(args) == 1:
+        # Інтерактивний режим із профілюванням дій меню: --profile-actions[=<директорія>]
+        from profiling import enable
+        enable(args.pop().partition("=")[2] or None)
+    if args:
+        from cli import main as cli_main
+        sys.exit(cli_main(args))
     main()
\ No newline at end of file
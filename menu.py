@@ -1,21 +1,15 @@
 import os
-import subprocess
 import sys
-import time
-import threading
-import platform
-import sqlite3
 from typing import Dict, Optional
 
-import psutil
-from colorama import init, Fore, Style
+from colorama import Fore, Style
 
-from config import PROGRAM_TITLE, VPS_API_URL, DRIVES
-from network import check_for_updates, fetch_json, refresh_shift
-from utils import is_admin, run_spinner, find_all_processes_by_name, find_process_by_path
-from cleanup import cleanup
-from patching import install_file, patch_file
-from health_check import check_cash_profiles
+from menu_model import MenuEntry, MenuNode, compile_menu
+from profiling import profile_action
+from utils import clear_screen, run_spinner
+
+# Модулі дій (patching, health_check, network, cleanup) імпортуються під час вибору пункту меню,
+# щоб їхні залежності (requests, psutil, sqlite3, tqdm) не сповільнювали запуск програми
 
 if sys.stdout.encoding != 'utf-8':
     sys.stdout = open(sys.stdout.fileno(), mode='w', encoding='utf-8', buffering=1)
@@ -27,8 +21,8 @@ def display_menu(title: str, options: Dict, data: Dict, parent_menu: Optional[Di
     """
     Відображає інтерактивне меню з опціями та обробляє вибір користувача.
 
-    Функція створює структуроване меню на основі переданих опцій, групуючи їх за категоріями
-    (Менеджери, каси, PayLink тощо), і дозволяє користувачу вибирати дії,
+    Функція один раз компілює опції в дерево меню (menu_model.compile_menu), згруповане за
+    категоріями (Менеджери, каси, PayLink тощо), і дозволяє користувачу вибирати дії,
     такі як встановлення файлів, застосування патчів, перевірка стану кас або вихід із програми.
     Підтримує навігацію між меню, оновлення програми та очищення даних при виході.
 
@@ -50,170 +44,84 @@ def display_menu(title: str, options: Dict, data: Dict, parent_menu: Optional[Di
         Exception: Загальні помилки, такі як ValueError при некоректному введенні або проблеми
                    з мережею чи файловою системою.
     """
-    while True:
-        try:
-            os.system("cls")
-            print(f"{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}")
-            print(f"{Fore.CYAN}{title.center(50)}{Style.RESET_ALL}")
-            print(f"{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}\n")
-
-            menu_items = []
-            for key, value in options.items():
-                if isinstance(value, list):
-                    for i, item in enumerate(value):
-                        menu_items.append((f"{key}_{i}", item))
-                else:
-                    menu_items.append((key, value))
-
-            is_top_level = title.lower() in ["main menu", "patching", "tools"]
-            ordered_items = menu_items.copy()
+    _show_menu(compile_menu(title, options, data), data, bool(parent_menu),
+               update_available=update_available, download_url=download_url, sha256=sha256)
+
+
+def _run_entry(entry: MenuEntry, data: Dict, update_available: bool, download_url: str, sha256: str) -> None:
+    if entry.kind == "submenu":
+        _show_menu(entry.submenu, data, True,
+                   update_available=update_available, download_url=download_url, sha256=sha256)
+        return
+    with profile_action(f"{entry.kind} {entry.label}"):
+        if entry.kind == "action":
+            entry.value()
+        elif entry.kind == "install":
+            from patching import install_file
+            install_file(entry.value, entry.paylink_patch_data, data, expected_sha256=entry.value.get("sha256", ""))
+        else:
+            from patching import patch_file
+            patch_file(entry.value, entry.product_folder, data, entry.is_rro_agent, entry.is_paylink,
+                       expected_sha256=entry.value.get("sha256", ""))
+
+
+def _show_menu(node: MenuNode, data: Dict, has_parent: bool, update_available: bool = False,
+               download_url: str = "", sha256: str = "") -> None:
+    """
+    Показує скомпільоване меню та обробляє вибір користувача до виходу або повернення назад.
 
-            if not is_top_level:
-                ordered_items = []
-                for key, value in menu_items:
-                    if "kasa_manager" in key.lower():
-                        ordered_items.append((key, value))
-                for key, value in menu_items:
-                    if ("rro_agent" in key.lower() and "tools" not in key.lower()) or \
-                            (title.lower() == "cloudlike" and "kasa_manager" not in key.lower() and "paylink" not in key.lower()):
-                        ordered_items.append((key, value))
-                for key, value in menu_items:
-                    if "paylink" in key.lower():
-                        ordered_items.append((key, value))
-                for key, value in menu_items:
-                    if "terminal_drivers" in key.lower():
-                        ordered_items.append((key, value))
-                for key, value in menu_items:
-                    if "os_tools" in key.lower():
-                        ordered_items.append((key, value))
-                for key, value in menu_items:
-                    if "diagnostics" in key.lower():
-                        ordered_items.append((key, value))
-                for key, value in menu_items:
-                    if "config_tools" in key.lower():
-                        ordered_items.append((key, value))
-                for key, value in menu_items:
-                    if "rro_agent_tools" in key.lower():
-                        ordered_items.append((key, value))
-                for key, value in menu_items:
-                    if (all(x not in key.lower() for x in
-                            ["kasa_manager", "rro_agent", "paylink", "terminal_drivers", "os_tools", "diagnostics",
-                             "config_tools", "rro_agent_tools"]) and
-                            not (title.lower() == "cloudlike" and "kasa_manager" not in key.lower() and "paylink" not in key.lower())):
-                        ordered_items.append((key, value))
+    Args:
+        node (MenuNode): Меню з menu_model.compile_menu.
+        data (Dict): Дані, отримані з API.
+        has_parent (bool): Чи показувати пункт "0. Back".
+        update_available (bool, optional): Чи доступне оновлення програми. Defaults to False.
+        download_url (str, optional): URL для завантаження оновлення. Defaults to "".
+        sha256 (str, optional): SHA256-хеш оновлення для перевірки. Defaults to "".
+    """
+    header = [f"{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}", f"{Fore.CYAN}{node.title.center(50)}{Style.RESET_ALL}",
+              f"{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}\n"]
+    footer = [f"\n{Fore.WHITE}=== Options ==={Style.RESET_ALL}"]
+    if has_parent:
+        footer.append(f"{Fore.WHITE}0. Back{Style.RESET_ALL}")
+    if node.is_main:
+        footer.append(f"{Fore.WHITE}H. Check Cash Register Health{Style.RESET_ALL}")
+        footer.append(f"{Fore.WHITE}R. Refresh Shift{Style.RESET_ALL}")
+    footer.append(f"{Fore.WHITE}Q. Exit{Style.RESET_ALL}")
+    footer.append(f"{Fore.WHITE}{'=' * 50}{Style.RESET_ALL}\n")
+    if node.is_main and update_available:
+        footer.append(f"{Fore.YELLOW}🎉 New version available! Press U to download.{Style.RESET_ALL}\n")
+    screen = "\n".join(header + node.lines + footer)
 
-            if not ordered_items:
+    while True:
+        try:
+            clear_screen()
+            if not node.entries:
+                print("\n".join(header))
                 print(f"{Fore.RED}✗ No options available.{Style.RESET_ALL}")
                 run_spinner("No options", 2.0)
                 return
+            print(screen)
 
-            current_index = 1
-
-            if is_top_level:
-                for key, value in ordered_items:
-                    name = key.capitalize() if isinstance(value, dict) else value.get("name", value.get("patch_name", key.capitalize()))
-                    print(f"{Fore.WHITE}{current_index}. {name}{Style.RESET_ALL}")
-                    current_index += 1
-            else:
-                managers = [item for item in ordered_items if "kasa_manager" in item[0].lower()]
-                if managers:
-                    print(f"{Fore.CYAN}=== Managers ==={Style.RESET_ALL}")
-                    for key, value in managers:
-                        name = value.get("name", value.get("patch_name", key.capitalize()))
-                        print(f"{Fore.WHITE}{current_index}. {name}{Style.RESET_ALL}")
-                        current_index += 1
-                    print()
-
-                cash_registers = [item for item in ordered_items if "rro_agent" in item[0].lower() and "tools" not in item[0].lower() or (title.lower() == "cloudlike" and "kasa_manager" not in item[0].lower() and "paylink" not in item[0].lower())]
-                if cash_registers:
-                    print(f"{Fore.GREEN}=== Cash Registers ==={Style.RESET_ALL}")
-                    for key, value in cash_registers:
-                        name = value.get("name", value.get("patch_name", key.capitalize()))
-                        print(f"{Fore.WHITE}{current_index}. {name}{Style.RESET_ALL}")
-                        current_index += 1
-                    print()
-
-                paylinks = [item for item in ordered_items if "paylink" in item[0].lower()]
-                if paylinks:
-                    print(f"{Fore.YELLOW}=== PayLinks ==={Style.RESET_ALL}")
-                    for key, value in paylinks:
-                        name = value.get("name", value.get("patch_name", key.capitalize()))
-                        print(f"{Fore.WHITE}{current_index}. {name}{Style.RESET_ALL}")
-                        current_index += 1
-                    print()
-
-                terminal_drivers = [item for item in ordered_items if "terminal_drivers" in item[0].lower()]
-                if terminal_drivers:
-                    print(f"{Fore.MAGENTA}=== Terminal Drivers ==={Style.RESET_ALL}")
-                    for key, value in terminal_drivers:
-                        name = value.get("name", value.get("patch_name", key.capitalize()))
-                        print(f"{Fore.WHITE}{current_index}. {name}{Style.RESET_ALL}")
-                        current_index += 1
-                    print()
-
-                os_tools = [item for item in ordered_items if "os_tools" in item[0].lower()]
-                if os_tools:
-                    print(f"{Fore.BLUE}=== OS Tools ==={Style.RESET_ALL}")
-                    for key, value in os_tools:
-                        name = value.get("name", value.get("patch_name", key.capitalize()))
-                        print(f"{Fore.WHITE}{current_index}. {name}{Style.RESET_ALL}")
-                        current_index += 1
-                    print()
-
-                diagnostics = [item for item in ordered_items if "diagnostics" in item[0].lower()]
-                if diagnostics:
-                    print(f"{Fore.GREEN}=== Diagnostics ==={Style.RESET_ALL}")
-                    for key, value in diagnostics:
-                        name = value.get("name", value.get("patch_name", key.capitalize()))
-                        print(f"{Fore.WHITE}{current_index}. {name}{Style.RESET_ALL}")
-                        current_index += 1
-                    print()
-
-                config_tools = [item for item in ordered_items if "config_tools" in item[0].lower()]
-                if config_tools:
-                    print(f"{Fore.BLUE}=== Config Tools ==={Style.RESET_ALL}")
-                    for key, value in config_tools:
-                        name = value.get("name", value.get("patch_name", key.capitalize()))
-                        print(f"{Fore.WHITE}{current_index}. {name}{Style.RESET_ALL}")
-                        current_index += 1
-                    print()
-
-                rro_agent_tools = [item for item in ordered_items if "rro_agent_tools" in item[0].lower()]
-                if rro_agent_tools:
-                    print(f"{Fore.GREEN}=== RRO Agent Tools ==={Style.RESET_ALL}")
-                    for key, value in rro_agent_tools:
-                        name = value.get("name", value.get("patch_name", key.capitalize()))
-                        print(f"{Fore.WHITE}{current_index}. {name}{Style.RESET_ALL}")
-                        current_index += 1
-                    print()
-
-            print(f"\n{Fore.WHITE}=== Options ==={Style.RESET_ALL}")
-            if parent_menu:
-                print(f"{Fore.WHITE}0. Back{Style.RESET_ALL}")
-            if title.lower() == "main menu":
-                print(f"{Fore.WHITE}H. Check Cash Register Health{Style.RESET_ALL}")
-                print(f"{Fore.WHITE}R. Refresh Shift{Style.RESET_ALL}")
-            print(f"{Fore.WHITE}Q. Exit{Style.RESET_ALL}")
-            print(f"{Fore.WHITE}{'=' * 50}{Style.RESET_ALL}\n")
-
-            if title.lower() == "main menu" and update_available:
-                print(f"{Fore.YELLOW}🎉 New version available! Press U to download.{Style.RESET_ALL}\n")
-
-            choice = input(f"{Fore.CYAN}Enter your choice: {Style.RESET_ALL}")
+            choice = input(f"{Fore.CYAN}Enter your choice: {Style.RESET_ALL}").lower()
 
-            if choice.lower() in ["q", "й"]:
+            if choice in ["q", "й"]:
+                from cleanup import cleanup
                 cleanup(data)
                 sys.exit(0)
 
-            if title.lower() == "main menu" and choice.lower() in ["h", "р"]:
-                check_cash_profiles(data)
+            if node.is_main and choice in ["h", "р"]:
+                with profile_action("health check"):
+                    from health_check import check_cash_profiles
+                    check_cash_profiles(data)
                 continue
 
-            if title.lower() == "main menu" and choice.lower() in ["r", "к"]:
-                refresh_shift()
+            if node.is_main and choice in ["r", "к"]:
+                with profile_action("refresh shift"):
+                    from network import refresh_shift
+                    refresh_shift()
                 continue
 
-            if title.lower() == "main menu" and choice.lower() in ["u", "г"] and update_available:
+            if node.is_main and choice in ["u", "г"] and update_available:
                 print(f"{Fore.CYAN}Downloading update...{Style.RESET_ALL}")
                 from network import download_file
                 filename = os.path.basename(download_url)
@@ -228,24 +136,11 @@ def display_menu(title: str, options: Dict, data: Dict, parent_menu: Optional[Di
 
             try:
                 choice_int = int(choice)
-                if choice_int == 0 and parent_menu:
+                if choice_int == 0 and has_parent:
                     return
-                if 1 <= choice_int <= len(ordered_items):
-                    key, value = ordered_items[choice_int - 1]
-                    if callable(value):
-                        value()
-                    elif "url" in value:
-                        paylink_patch_data = None
-                        if "paylink" in key.lower() and "dev" in title.lower():
-                            paylink_patch_data = data["dev"]["paylink"][-1]
-                        install_file(value, paylink_patch_data, data, expected_sha256=value.get("sha256", ""))
-                    elif "patch_url" in value:
-                        is_rro_agent = "rro_agent" in key.lower() and "tools" not in key.lower()
-                        is_paylink = "paylink" in key.lower()
-                        patch_file(value, "checkbox.kasa.manager" if not (is_rro_agent or is_paylink) else "Checkbox PayLink (Beta)" if is_paylink else "checkbox.kasa.manager", data, is_rro_agent, is_paylink, expected_sha256=value.get("sha256", ""))
-                    else:
-                        display_menu(key.capitalize(), value, data, parent_menu={"title": title, "options": options},
-                                     update_available=update_available, download_url=download_url, sha256=sha256)
+                entry = node.entry(choice_int)
+                if entry is not None:
+                    _run_entry(entry, data, update_available, download_url, sha256)
                 else:
                     print(f"{Fore.RED}✗ Invalid option!{Style.RESET_ALL}")
                     run_spinner("Invalid option", 2.0)
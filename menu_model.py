@@ -0,0 +1,156 @@
+from typing import Dict, List, Optional, Tuple
+
+from colorama import Fore, Style
+
+TOP_LEVEL_TITLES = ("main menu", "patching", "tools")
+
+# Порядок і оформлення розділів вкладених меню: (ідентифікатор, заголовок, колір)
+SECTIONS: Tuple[Tuple[str, str, str], ...] = (
+    ("kasa_manager", "Managers", Fore.CYAN),
+    ("cash_register", "Cash Registers", Fore.GREEN),
+    ("paylink", "PayLinks", Fore.YELLOW),
+    ("terminal_drivers", "Terminal Drivers", Fore.MAGENTA),
+    ("os_tools", "OS Tools", Fore.BLUE),
+    ("diagnostics", "Diagnostics", Fore.GREEN),
+    ("config_tools", "Config Tools", Fore.BLUE),
+    ("rro_agent_tools", "RRO Agent Tools", Fore.GREEN),
+)
+OTHER_SECTION = "other"
+
+
+class MenuEntry:
+    """
+    Пункт скомпільованого меню.
+
+    Args:
+        key (str): Ключ пункту в опціях (для списків — "<категорія>_<індекс>").
+        label (str): Текст пункту.
+        value: Дані пункту з API, дочірні опції або функція.
+        kind (str): Дія пункту: "action", "install", "patch" або "submenu".
+        section (str): Ідентифікатор розділу з SECTIONS або OTHER_SECTION.
+    """
+
+    __slots__ = ("key", "label", "value", "kind", "section", "number", "submenu",
+                 "product_folder", "is_rro_agent", "is_paylink", "paylink_patch_data")
+
+    def __init__(self, key: str, label: str, value, kind: str, section: str):
+        self.key = key
+        self.label = label
+        self.value = value
+        self.kind = kind
+        self.section = section
+        self.number = 0
+        self.submenu: Optional["MenuNode"] = None
+        self.product_folder = "checkbox.kasa.manager"
+        self.is_rro_agent = False
+        self.is_paylink = False
+        self.paylink_patch_data: Optional[Dict] = None
+
+
+class MenuNode:
+    """
+    Скомпільоване меню: пункти в порядку відображення та готові рядки для виводу.
+
+    Args:
+        title (str): Заголовок меню.
+        entries (List[MenuEntry]): Пункти, пронумеровані від 1 у порядку відображення.
+        lines (List[str]): Відформатовані рядки розділів і пунктів.
+    """
+
+    __slots__ = ("title", "entries", "lines", "is_main")
+
+    def __init__(self, title: str, entries: List[MenuEntry], lines: List[str]):
+        self.title = title
+        self.entries = entries
+        self.lines = lines
+        self.is_main = title.lower() == "main menu"
+
+    def entry(self, number: int) -> Optional[MenuEntry]:
+        return self.entries[number - 1] if 1 <= number <= len(self.entries) else None
+
+
+def _section_of(key: str, title: str) -> str:
+    if "kasa_manager" in key:
+        return "kasa_manager"
+    if ("rro_agent" in key and "tools" not in key) or (title == "cloudlike" and "paylink" not in key):
+        return "cash_register"
+    for section, _, _ in SECTIONS[2:]:
+        if section in key:
+            return section
+    return OTHER_SECTION
+
+
+def _flatten(options: Dict) -> List[Tuple[str, object]]:
+    items = []
+    for key, value in options.items():
+        if isinstance(value, list):
+            items.extend((f"{key}_{i}", item) for i, item in enumerate(value))
+        else:
+            items.append((key, value))
+    return items
+
+
+def _make_entry(key: str, value, title: str, is_top_level: bool, data: Dict) -> MenuEntry:
+    lower_key = key.lower()
+    section = OTHER_SECTION if is_top_level else _section_of(lower_key, title.lower())
+    if callable(value):
+        return MenuEntry(key, key.capitalize(), value, "action", section)
+    if is_top_level and isinstance(value, dict):
+        label = key.capitalize()
+    else:
+        label = value.get("name", value.get("patch_name", key.capitalize()))
+
+    if "url" in value:
+        entry = MenuEntry(key, label, value, "install", section)
+        if "paylink" in lower_key and "dev" in title.lower():
+            entry.paylink_patch_data = (data.get("dev", {}).get("paylink") or [None])[-1]
+    elif "patch_url" in value:
+        entry = MenuEntry(key, label, value, "patch", section)
+        entry.is_rro_agent = "rro_agent" in lower_key and "tools" not in lower_key
+        entry.is_paylink = "paylink" in lower_key
+        if entry.is_paylink:
+            entry.product_folder = "Checkbox PayLink (Beta)"
+    else:
+        entry = MenuEntry(key, label, value, "submenu", section)
+        entry.submenu = compile_menu(key.capitalize(), value, data)
+    return entry
+
+
+def compile_menu(title: str, options: Dict, data: Dict) -> MenuNode:
+    """
+    Компілює опції меню в дерево з упорядкованими пунктами та готовими рядками.
+
+    Класифікація пунктів за розділами (менеджери, каси, PayLink, інструменти) виконується
+    один раз для всього дерева, тож відображення меню — це один прохід по готових рядках,
+    а повернення до вже відкритого підменю не компілює його повторно.
+    Пункти верхніх меню (Main Menu, Patching, Tools) виводяться без розділів.
+
+    Args:
+        title (str): Заголовок меню.
+        options (Dict): Опції меню: ключі — назви категорій, значення — списки або словники з даними.
+        data (Dict): Дані, отримані з API.
+
+    Returns:
+        MenuNode: Скомпільоване меню з дочірніми підменю.
+    """
+    is_top_level = title.lower() in TOP_LEVEL_TITLES
+    groups: Dict[str, List[MenuEntry]] = {section: [] for section, _, _ in SECTIONS}
+    groups[OTHER_SECTION] = []
+    for key, value in _flatten(options):
+        entry = _make_entry(key, value, title, is_top_level, data)
+        groups[entry.section].append(entry)
+    entries = [entry for group in groups.values() for entry in group]
+    for number, entry in enumerate(entries, 1):
+        entry.number = number
+
+    headers = {section: f"{color}=== {name} ==={Style.RESET_ALL}" for section, name, color in SECTIONS}
+    lines = []
+    for section, group in groups.items():
+        if not group:
+            continue
+        if section in headers:
+            lines.append(headers[section])
+        lines.extend(f"{Fore.WHITE}{entry.number}. {entry.label}{Style.RESET_ALL}" for entry in group)
+        if not is_top_level:
+            lines.append("")
+    return MenuNode(title, entries, lines)
@@ -1,13 +1,16 @@
 import os
+import shutil
+import zipfile
 import requests
 import hashlib
-from typing import Dict, Optional, Tuple
-from tqdm import tqdm
-from ping3 import ping
+from typing import Dict, List, Optional, Tuple
 from colorama import Fore, Style
-from utils import run_spinner
+from utils import run_spinner, spinner
 from config import VPS_VERSION_URL
+from tracing import annotate, traced
+from stream_unzip import StreamingZipExtractor, StreamingUnsupported
 
+@traced(arg="path")
 def calculate_file_hash(filepath: str) -> str:
     """
     Обчислює SHA256-хеш файлу.
@@ -33,6 +36,7 @@ def calculate_file_hash(filepath: str) -> str:
         print(f"{Fore.RED}✗ Error calculating hash for {filepath}: {e}{Style.RESET_ALL}")
         return ""
 
+@traced()
 def check_for_updates() -> Tuple[bool, str, str]:
     """
     Перевіряє наявність оновлень програми, порівнюючи поточну версію з версією на сервері.
@@ -79,6 +83,7 @@ def check_for_updates() -> Tuple[bool, str, str]:
         run_spinner("Update check error", 2.0)
         return False, "", ""
 
+@traced(arg="url")
 def check_server_status(url: str) -> bool:
     """
     Перевіряє доступність сервера шляхом виконання пінгу.
@@ -97,6 +102,7 @@ def check_server_status(url: str) -> bool:
     """
     try:
         domain = url.replace("https://", "").replace("http://", "").split("/")[0]
+        from ping3 import ping
         result = ping(domain, timeout=5)
         if result is not None and result is not False:
             print(f"{Fore.GREEN}✓ Server is online.{Style.RESET_ALL}")
@@ -111,12 +117,13 @@ def check_server_status(url: str) -> bool:
         run_spinner("Server ping failed", 2.0)
         return False
 
+@traced(arg="url")
 def fetch_json(url: str) -> Optional[Dict]:
     """
     Отримує JSON-дані з вказаного URL.
 
     Функція виконує HTTP GET-запит до сервера, отримує відповідь у форматі JSON
-    та повертає її як словник. Відображає прогрес із використанням tqdm.
+    та повертає її як словник. Поки запит виконується, відображається спінер.
 
     Args:
         url (str): URL для отримання JSON-даних.
@@ -130,18 +137,16 @@ def fetch_json(url: str) -> Optional[Dict]:
     """
     print(f"{Fore.CYAN}📡 Connecting to server...{Style.RESET_ALL}")
     try:
-        with tqdm(total=100, desc="Fetching data", bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt}") as pbar:
+        with spinner("Fetching data"):
             response = requests.get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
-            if "error" in data:
-                print(f"{Fore.RED}✗ Server error: {data['error']}{Style.RESET_ALL}")
-                run_spinner("Server error", 2.0)
-                return None
-            pbar.update(100)
-            print(f"{Fore.GREEN}✓ Data retrieved successfully!{Style.RESET_ALL}")
-            run_spinner("Data fetch completed", 1.0)
-            return data
+        if "error" in data:
+            print(f"{Fore.RED}✗ Server error: {data['error']}{Style.RESET_ALL}")
+            run_spinner("Server error", 2.0)
+            return None
+        print(f"{Fore.GREEN}✓ Data retrieved successfully!{Style.RESET_ALL}")
+        return data
     except requests.RequestException as e:
         print(f"{Fore.RED}✗ Failed to connect: {e}{Style.RESET_ALL}")
         run_spinner("Connection failed", 2.0)
@@ -151,6 +156,7 @@ def fetch_json(url: str) -> Optional[Dict]:
         run_spinner("Fetch error", 2.0)
         return None
 
+@traced(arg="url")
 def download_file(url: str, filename: str, expected_sha256: str = "") -> bool:
     """
     Завантажує файл із вказаного URL із підтримкою докачки та перевіркою SHA256-хеша.
@@ -172,6 +178,8 @@ def download_file(url: str, filename: str, expected_sha256: str = "") -> bool:
         requests.RequestException: Якщо не вдалося виконати HTTP-запит.
         Exception: Інші помилки, такі як проблеми з файловою системою.
     """
+    from tqdm import tqdm
+
     print(f"{Fore.CYAN}📥 Preparing to download {filename}...{Style.RESET_ALL}")
     expected_sha256 = expected_sha256.lower() if expected_sha256 else ""
 
@@ -228,6 +236,7 @@ def download_file(url: str, filename: str, expected_sha256: str = "") -> bool:
                                 pbar.update(len(chunk))
                                 current_size += len(chunk)
 
+                annotate(bytes=current_size)
                 print(f"{Fore.GREEN}✓ Downloaded {filename} successfully!{Style.RESET_ALL}")
 
                 # Перевірка хеша після завантаження
@@ -260,6 +269,78 @@ def download_file(url: str, filename: str, expected_sha256: str = "") -> bool:
         run_spinner("Download error", 2.0)
         return False
 
+@traced(arg="url")
+def stream_extract_archive(url: str, staging_dir: str, expected_sha256: str = "") -> Optional[List[zipfile.ZipInfo]]:
+    """
+    Завантажує ZIP-архів і розпаковує його в директорію staging під час завантаження.
+
+    Архів не зберігається на диск: кожен шматок HTTP-відповіді одночасно додається до SHA256-хеша
+    та передається потоковому розпаковувачу, тож розпакування йде паралельно із завантаженням.
+    Хеш усього архіву перевіряється наприкінці, до того як файли з staging буде застосовано.
+    У разі мережевої помилки завантаження повторюється з початку до трьох разів.
+
+    Args:
+        url (str): URL архіву.
+        staging_dir (str): Директорія для розпакованих файлів. Її вміст перезаписується.
+        expected_sha256 (str, optional): Очікуваний SHA256-хеш архіву. Defaults to "".
+
+    Returns:
+        Optional[List[zipfile.ZipInfo]]: Метадані розпакованих файлів або None, якщо потоковий
+        режим не вдався і слід завантажити архів звичайним способом.
+
+    Raises:
+        Exception: Помилки не передаються далі, а виводяться користувачу; у такому разі повертається None.
+    """
+    from tqdm import tqdm
+
+    print(f"{Fore.CYAN}📥 Streaming {os.path.basename(url)} directly into staging...{Style.RESET_ALL}")
+    expected_sha256 = expected_sha256.lower() if expected_sha256 else ""
+    max_retries = 3
+    retry_delay = 5
+
+    for attempt in range(max_retries):
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        os.makedirs(staging_dir, exist_ok=True)
+        extractor = StreamingZipExtractor(staging_dir)
+        sha256_hash = hashlib.sha256()
+        try:
+            with requests.get(url, stream=True, timeout=10) as r:
+                r.raise_for_status()
+                total_size = int(r.headers.get('content-length', 0)) or None
+                with tqdm(total=total_size, unit='B', unit_scale=True, desc="Downloading & extracting",
+                          bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}]") as pbar:
+                    for chunk in r.iter_content(chunk_size=65536):
+                        sha256_hash.update(chunk)
+                        extractor.feed(chunk)
+                        pbar.update(len(chunk))
+            members = extractor.close()
+        except requests.RequestException:
+            if attempt < max_retries - 1:
+                print(f"{Fore.YELLOW}⚠ Download failed, retrying in {retry_delay} seconds...{Style.RESET_ALL}")
+                run_spinner("Retrying download", retry_delay)
+                continue
+            print(f"{Fore.RED}✗ Download failed after {max_retries} attempts.{Style.RESET_ALL}")
+            return None
+        except StreamingUnsupported as e:
+            print(f"{Fore.YELLOW}⚠ Streaming extraction not possible: {e}{Style.RESET_ALL}")
+            return None
+        except Exception as e:
+            print(f"{Fore.RED}✗ Streaming extraction failed: {e}{Style.RESET_ALL}")
+            return None
+
+        if expected_sha256:
+            if sha256_hash.hexdigest().lower() != expected_sha256:
+                print(f"{Fore.RED}✗ Hash mismatch: streamed archive is corrupted.{Style.RESET_ALL}")
+                return None
+            print(f"{Fore.GREEN}✓ Hash matches: streamed archive is valid.{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.YELLOW}⚠ No expected hash provided, skipping hash check.{Style.RESET_ALL}")
+        annotate(files=len(members), bytes=pbar.n)
+        print(f"{Fore.GREEN}✓ Extracted {len(members)} entries to staging.{Style.RESET_ALL}")
+        return members
+    return None
+
+@traced()
 def refresh_shift():
     """
 
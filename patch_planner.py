@@ -0,0 +1,158 @@
+import json
+import os
+import shutil
+import statistics
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from colorama import Fore, Style
+
+from config import PATCH_HISTORY_FILE
+from integrity import check_member, default_workers
+from stream_unzip import safe_member_path
+from utils import format_bytes
+
+HISTORY_LIMIT = 20
+DEFAULT_THROUGHPUT = 20 * 1024 * 1024
+DEFAULT_RESTART_SECONDS = 10.0
+
+
+def load_patch_history() -> List[Dict]:
+    """
+    Читає історію попередніх оновлень, яка використовується для оцінки часу простою.
+
+    Returns:
+        List[Dict]: Записи з кількістю записаних байтів, тривалістю запису та часом перезапуску кас.
+    """
+    try:
+        with open(PATCH_HISTORY_FILE, "r", encoding="utf-8") as f:
+            history = json.load(f)
+        return history if isinstance(history, list) else []
+    except (OSError, ValueError):
+        return []
+
+
+def record_patch_run(bytes_written: int, apply_seconds: float, restart_seconds: List[float]) -> None:
+    """
+    Додає вимірювання завершеного оновлення до історії.
+
+    Args:
+        bytes_written (int): Скільки байтів було записано під час застосування патча.
+        apply_seconds (float): Тривалість запису файлів у секундах.
+        restart_seconds (List[float]): Час до готовності кожної перезапущеної каси.
+    """
+    history = load_patch_history()
+    history.append({
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "bytes": bytes_written,
+        "seconds": round(apply_seconds, 3),
+        "restart_seconds": [round(s, 3) for s in restart_seconds]
+    })
+    try:
+        with open(PATCH_HISTORY_FILE, "w", encoding="utf-8") as f:
+            json.dump(history[-HISTORY_LIMIT:], f, indent=4)
+    except OSError:
+        pass
+
+
+def estimate_rates(history: List[Dict]) -> Dict:
+    """
+    Обчислює пропускну здатність запису та типовий час перезапуску каси за історією.
+
+    Args:
+        history (List[Dict]): Історія оновлень із load_patch_history.
+
+    Returns:
+        Dict: throughput (байт/с), restart_seconds і measured (чи є реальні вимірювання).
+    """
+    total_bytes = sum(run.get("bytes", 0) for run in history)
+    total_seconds = sum(run.get("seconds", 0) for run in history)
+    restarts = [s for run in history for s in run.get("restart_seconds", [])]
+    measured = total_bytes > 0 and total_seconds > 0
+    return {
+        "throughput": total_bytes / total_seconds if measured else DEFAULT_THROUGHPUT,
+        "restart_seconds": statistics.median(restarts) if restarts else DEFAULT_RESTART_SECONDS,
+        "measured": measured
+    }
+
+
+def build_patch_plan(members: List[zipfile.ZipInfo], target_dirs: List[str],
+                     history: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    Будує план оновлення без зміни жодного файлу.
+
+    Для кожної каси визначає, які файли патча відрізняються від встановлених (за розміром і CRC-32),
+    скільки байтів буде записано, скільки вільного місця на диску та орієнтовний час простою.
+
+    Args:
+        members (List[zipfile.ZipInfo]): Члени архіву патча.
+        target_dirs (List[str]): Цільові директорії.
+        history (Optional[List[Dict]]): Історія оновлень. За замовчуванням читається з файлу.
+
+    Returns:
+        List[Dict]: План для кожної директорії.
+    """
+    rates = estimate_rates(load_patch_history() if history is None else history)
+    files = [m for m in members if not m.is_dir()]
+    apply_bytes = sum(m.file_size for m in files)
+
+    jobs = [(target_dir, member, safe_member_path(target_dir, member.filename))
+            for target_dir in target_dirs for member in files]
+    jobs = [job for job in jobs if job[2]]
+    with ThreadPoolExecutor(max_workers=default_workers()) as pool:
+        reasons = list(pool.map(lambda job: check_member(job[2], job[1]), jobs))
+
+    plan = []
+    for target_dir in target_dirs:
+        changes = [{"file": member.filename, "size": member.file_size,
+                    "action": "add" if reason == "missing" else "update"}
+                   for (job_dir, member, _), reason in zip(jobs, reasons)
+                   if job_dir == target_dir and reason]
+        try:
+            free_bytes = shutil.disk_usage(target_dir).free
+        except OSError:
+            free_bytes = None
+        plan.append({
+            "target_dir": target_dir,
+            "changes": changes,
+            "bytes_to_change": sum(c["size"] for c in changes),
+            "bytes_to_write": apply_bytes,
+            "free_bytes": free_bytes,
+            "enough_space": free_bytes is None or free_bytes > apply_bytes,
+            "estimated_downtime": apply_bytes / rates["throughput"] + rates["restart_seconds"],
+            "estimate_measured": rates["measured"]
+        })
+    return plan
+
+
+def print_patch_plan(plan: List[Dict], max_items: int = 10) -> None:
+    """
+    Виводить план оновлення у вигляді звіту.
+
+    Args:
+        plan (List[Dict]): Результат build_patch_plan.
+        max_items (int): Скільки змінених файлів показувати для однієї каси. За замовчуванням 10.
+    """
+    print(f"\n{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}")
+    print(f"{Fore.CYAN} DRY-RUN PLAN {Style.RESET_ALL}")
+    print(f"{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}")
+    total_downtime = 0.0
+    for entry in plan:
+        total_downtime += entry["estimated_downtime"]
+        changes = entry["changes"]
+        print(f"\n{Fore.WHITE}{os.path.basename(entry['target_dir'])} ({entry['target_dir']}){Style.RESET_ALL}")
+        print(f"  Files to change: {len(changes)} ({format_bytes(entry['bytes_to_change'])})")
+        for change in changes[:max_items]:
+            print(f"    {'+' if change['action'] == 'add' else '~'} {change['file']} ({format_bytes(change['size'])})")
+        if len(changes) > max_items:
+            print(f"    ... and {len(changes) - max_items} more")
+        print(f"  Bytes written during apply: {format_bytes(entry['bytes_to_write'])}")
+        if entry["free_bytes"] is not None:
+            space_color = Fore.GREEN if entry["enough_space"] else Fore.RED
+            print(f"  Free disk space: {space_color}{format_bytes(entry['free_bytes'])}{Style.RESET_ALL}")
+        source = "measured" if entry["estimate_measured"] else "default, no history yet"
+        print(f"  Estimated downtime: {entry['estimated_downtime']:.1f}s ({source})")
+    print(f"\n{Fore.CYAN}Total estimated downtime: {total_downtime:.1f}s{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}")
@@ -1,19 +1,38 @@
 import os
-import subprocess
+import shutil
 import sys
 import time
 import zipfile
-import threading
 from typing import Dict, Optional, List
 from tqdm import tqdm
 from colorama import Fore, Style
 import psutil
-from config import DRIVES
-from utils import find_process_by_path, find_all_processes_by_name, manage_processes, run_spinner, launch_executable
-from network import download_file
-from backup_restore import create_backup, restore_from_backup, delete_backup
+from catalog import CatalogError, Installer, get_catalog
+from config import DRIVES, INCREMENTAL_BACKUPS, PATCH_BACKUP_PROFILE, STREAM_PATCHES
+from utils import find_process_by_path, find_all_processes_by_name, format_bytes, run_spinner, launch_executable, spinner, \
+    clear_screen, wait_for_exit
+from platform_layer import launch
+from tracing import traced
+from process_watcher import ProcessWatcher
+from readiness import wait_for_cash_register, wait_for_process
+from network import download_file, stream_extract_archive
+from stream_unzip import safe_member_path
+from integrity import verify_extracted_files, print_verification_report
+from patch_planner import build_patch_plan, print_patch_plan, record_patch_run
+from backup_restore import create_backups, restore_from_backup, delete_backup
+from backup_catalog import describe_backup, list_backups
+from backup_retention import apply_retention, plan_retention, print_retention_report
 from search_utils import find_cash_registers_by_profiles_json, find_cash_registers_by_exe, get_cash_register_info, reset_cache
 
+def _find_installer(data: Optional[Dict], filename: str) -> Optional[Installer]:
+    if not data:
+        return None
+    try:
+        return get_catalog(data).installer_for_file(filename)
+    except CatalogError:
+        return None
+
+@traced()
 def install_file(file_data: Dict, paylink_patch_data: Optional[Dict] = None, data: Optional[Dict] = None, expected_sha256: str = "") -> bool:
     """
     Встановлює файл із вказаного URL із можливістю оновлення PayLink.
@@ -57,57 +76,54 @@ def install_file(file_data: Dict, paylink_patch_data: Optional[Dict] = None, dat
             raise FileNotFoundError(f"Installer {filename} not found")
 
         full_path = os.path.abspath(filename)
-        cmd = f'start "" "{full_path}"'
-        subprocess.Popen(cmd, shell=True, cwd=os.path.dirname(full_path))
+        launch(full_path, os.path.dirname(full_path))
 
         run_spinner("Starting installation", 1.0)
 
         print(f"{Fore.GREEN}✓ Installation started successfully!{Style.RESET_ALL}")
 
-        if data and "dev" in data and "paylink" in data["dev"]:
-            paylink_items = data["dev"]["paylink"]
-            if any(item.get("name") == filename for item in paylink_items):
-                latest_paylink_patch = paylink_items[-1]
-                if "patch_name" in latest_paylink_patch and "patch_url" in latest_paylink_patch:
-                    print()
-                    choice = input(
-                        f"{Fore.CYAN}Update PayLink to {latest_paylink_patch['patch_name']}? (Y/N): {Style.RESET_ALL}"
-                    ).strip().lower()
-                    if choice == "y":
-                        patch_success = patch_file(
-                            latest_paylink_patch,
-                            "Checkbox PayLink (Beta)",
-                            data,
-                            is_paylink=True,
-                            expected_sha256=latest_paylink_patch.get("patch_sha256", "")
-                        )
-                        if patch_success:
-                            print(f"{Fore.GREEN}✓ PayLink updated successfully!{Style.RESET_ALL}")
-                        else:
-                            print(f"{Fore.RED}✗ Failed to update PayLink.{Style.RESET_ALL}")
-
-                        paylink_dir = None
-                        drives = DRIVES if DRIVES is not None else ["C:\\"]
-                        for drive in drives:
-                            path = f"{drive}\\Checkbox PayLink (Beta)"
-                            if os.path.exists(path):
-                                paylink_dir = path
-                                break
-
-                        if paylink_dir:
-                            paylink_path = os.path.join(paylink_dir, "CheckboxPayLink.exe")
-                            if os.path.exists(paylink_path):
-                                print(f"{Fore.CYAN}🚀 Launching PayLink...{Style.RESET_ALL}")
-                                subprocess.Popen(f'start "" "{paylink_path}"', cwd=paylink_dir, shell=True)
-                                print(f"{Fore.GREEN}✓ PayLink launched successfully!{Style.RESET_ALL}")
-                            else:
-                                print(f"{Fore.YELLOW}⚠ PayLink executable not found.{Style.RESET_ALL}")
+        installer = _find_installer(data, filename)
+        if installer is not None and (installer.channel, installer.product) == ("dev", "paylink"):
+            latest_paylink_patch = get_catalog(data).latest_paylink_patch()
+            if latest_paylink_patch is not None:
+                print()
+                choice = input(
+                    f"{Fore.CYAN}Update PayLink to {latest_paylink_patch.name}? (Y/N): {Style.RESET_ALL}"
+                ).strip().lower()
+                if choice == "y":
+                    patch_success = patch_file(
+                        latest_paylink_patch.to_dict(),
+                        "Checkbox PayLink (Beta)",
+                        data,
+                        is_paylink=True,
+                        expected_sha256=latest_paylink_patch.sha256
+                    )
+                    if patch_success:
+                        print(f"{Fore.GREEN}✓ PayLink updated successfully!{Style.RESET_ALL}")
+                    else:
+                        print(f"{Fore.RED}✗ Failed to update PayLink.{Style.RESET_ALL}")
+
+                    paylink_dir = None
+                    for drive in DRIVES:
+                        path = os.path.join(drive, "Checkbox PayLink (Beta)")
+                        if os.path.exists(path):
+                            paylink_dir = path
+                            break
+
+                    if paylink_dir:
+                        paylink_path = os.path.join(paylink_dir, "CheckboxPayLink.exe")
+                        if os.path.exists(paylink_path):
+                            print(f"{Fore.CYAN}🚀 Launching PayLink...{Style.RESET_ALL}")
+                            launch(paylink_path, paylink_dir)
+                            print(f"{Fore.GREEN}✓ PayLink launched successfully!{Style.RESET_ALL}")
                         else:
-                            print(f"{Fore.YELLOW}⚠ PayLink directory not found.{Style.RESET_ALL}")
-                        run_spinner("Update completed", 2.0)
+                            print(f"{Fore.YELLOW}⚠ PayLink executable not found.{Style.RESET_ALL}")
                     else:
-                        print(f"{Fore.GREEN}✓ Update skipped.{Style.RESET_ALL}")
-                        run_spinner("Update skipped", 1.0)
+                        print(f"{Fore.YELLOW}⚠ PayLink directory not found.{Style.RESET_ALL}")
+                    run_spinner("Update completed", 2.0)
+                else:
+                    print(f"{Fore.GREEN}✓ Update skipped.{Style.RESET_ALL}")
+                    run_spinner("Update skipped", 1.0)
 
         return True
     except Exception as e:
@@ -115,7 +131,41 @@ def install_file(file_data: Dict, paylink_patch_data: Optional[Dict] = None, dat
         run_spinner("Installation failed", 2.0)
         return False
 
-def extract_to_multiple_dirs(zip_ref: zipfile.ZipFile, target_dirs: List[str], total_files: int) -> None:
+def handle_process_violations(watcher: Optional[ProcessWatcher], interactive: bool = True) -> None:
+    """
+    Обробляє в основному потоці процеси, які спостерігач виявив під час оновлення.
+
+    Для кожного процесу, запущеного з цільової директорії, запитує підтвердження
+    та завершує процес. Фоновий потік спостерігача ніколи не звертається до користувача сам.
+
+    Args:
+        watcher (Optional[ProcessWatcher]): Спостерігач за процесами або None.
+        interactive (bool): Запитувати підтвердження. Якщо False, процеси завершуються без запитання,
+            як і процеси, закриті перед оновленням. За замовчуванням True.
+
+    Returns:
+        None
+    """
+    if watcher is None:
+        return
+    for violation in watcher.drain():
+        print(f"\n{Fore.RED}⚠ {violation['name']} (PID: {violation['pid']}) started in "
+              f"{violation['target_dir']} during update!{Style.RESET_ALL}")
+        confirm = input(
+            f"{Fore.CYAN}Terminate {violation['name']} (PID: {violation['pid']})? (Y/N): {Style.RESET_ALL}").strip().lower() if interactive else "y"
+        if confirm != "y":
+            continue
+        try:
+            violation["process"].terminate()
+            print(f"{Fore.YELLOW}⚠ Terminated {violation['name']} (PID: {violation['pid']}).{Style.RESET_ALL}")
+        except psutil.NoSuchProcess:
+            pass
+        except Exception:
+            print(f"{Fore.RED}✗ Failed to terminate {violation['name']}.{Style.RESET_ALL}")
+
+@traced()
+def extract_to_multiple_dirs(zip_ref: zipfile.ZipFile, target_dirs: List[str], total_files: int,
+                             watcher: Optional[ProcessWatcher] = None, interactive: bool = True) -> None:
     """
     Розпаковує ZIP-архів у кілька цільових директорій.
 
@@ -126,6 +176,10 @@ def extract_to_multiple_dirs(zip_ref: zipfile.ZipFile, target_dirs: List[str], t
         zip_ref (zipfile.ZipFile): Об’єкт ZIP-архіву.
         target_dirs (List[str]): Список цільових директорій для розпакування.
         total_files (int): Загальна кількість файлів у архіві.
+        watcher (Optional[ProcessWatcher]): Спостерігач за процесами, чиї порушення
+            обробляються між файлами. За замовчуванням None.
+        interactive (bool): Запитувати підтвердження перед завершенням виявлених процесів.
+            За замовчуванням True.
 
     Returns:
         None
@@ -143,22 +197,311 @@ def extract_to_multiple_dirs(zip_ref: zipfile.ZipFile, target_dirs: List[str], t
                         os.remove(target_path)
                     zip_ref.extract(file_info, target_dir)
                     pbar.update(1)
+                handle_process_violations(watcher, interactive)
+    except Exception as e:
+        print(f"{Fore.RED}✗ Extraction error: {e}{Style.RESET_ALL}")
+        raise
+
+@traced(arg="staging_dir")
+def apply_staged_files(staging_dir: str, members: List[zipfile.ZipInfo], target_dirs: List[str],
+                       watcher: Optional[ProcessWatcher] = None, interactive: bool = True) -> None:
+    """
+    Переносить файли патча, попередньо розпаковані в staging, у цільові директорії.
+
+    Кожен файл спочатку копіюється поруч із цільовим під тимчасовим ім'ям, а потім атомарно
+    замінює його через os.replace, тож перерваний запис не залишає напівзаписаних файлів.
+
+    Args:
+        staging_dir (str): Директорія з розпакованими файлами патча.
+        members (List[zipfile.ZipInfo]): Метадані членів архіву в порядку розпакування.
+        target_dirs (List[str]): Список цільових директорій.
+        watcher (Optional[ProcessWatcher]): Спостерігач за процесами, чиї порушення
+            обробляються між файлами. За замовчуванням None.
+        interactive (bool): Запитувати підтвердження перед завершенням виявлених процесів.
+            За замовчуванням True.
+
+    Returns:
+        None
+
+    Raises:
+        Exception: Помилки, такі як PermissionError або проблеми з файловою системою.
+    """
+    try:
+        with tqdm(total=len(members) * len(target_dirs), desc="Applying staged files",
+                  bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}]") as pbar:
+            for file_info in members:
+                source_path = safe_member_path(staging_dir, file_info.filename)
+                for target_dir in target_dirs:
+                    target_path = safe_member_path(target_dir, file_info.filename)
+                    if source_path and target_path:
+                        if file_info.is_dir():
+                            os.makedirs(target_path, exist_ok=True)
+                        else:
+                            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                            temp_path = target_path + ".cbx_tmp"
+                            try:
+                                shutil.copyfile(source_path, temp_path)
+                                os.replace(temp_path, target_path)
+                            finally:
+                                if os.path.exists(temp_path):
+                                    os.remove(temp_path)
+                    pbar.update(1)
+                handle_process_violations(watcher, interactive)
     except Exception as e:
         print(f"{Fore.RED}✗ Extraction error: {e}{Style.RESET_ALL}")
         raise
 
+def offer_dry_run(members: List[zipfile.ZipInfo], target_dirs: List[str]) -> bool:
+    """
+    Пропонує показати план оновлення до зупинки будь-яких процесів.
+
+    План містить файли, що зміняться в кожній касі, обсяг запису, вільне місце на диску
+    та орієнтовний час простою на основі попередніх оновлень.
+
+    Args:
+        members (List[zipfile.ZipInfo]): Члени архіву патча.
+        target_dirs (List[str]): Цільові директорії.
+
+    Returns:
+        bool: True, якщо оновлення слід продовжити, False, якщо користувач його скасував.
+    """
+    choice = input(f"{Fore.CYAN}Show dry-run plan before stopping processes? (Y/N): {Style.RESET_ALL}").strip().lower()
+    if choice != "y":
+        return True
+    print(f"{Fore.CYAN}🔎 Comparing patch with installed files...{Style.RESET_ALL}")
+    print_patch_plan(build_patch_plan(members, target_dirs))
+    choice = input(f"{Fore.CYAN}Proceed with update? (Y/N): {Style.RESET_ALL}").strip().lower()
+    if choice != "y":
+        print(f"{Fore.RED}✗ Update cancelled.{Style.RESET_ALL}")
+        run_spinner("Update cancelled", 2.0)
+        return False
+    return True
+
+@traced(arg="install_dir")
+def select_rro_profiles(install_dir: str, drives: List[str], data: Dict) -> Optional[List[str]]:
+    """
+    Знаходить каси менеджера та пропонує вибрати, які з них оновити.
+
+    Меню також дозволяє відновити або видалити резервні копії кас і переглянути звіт
+    політики зберігання копій.
+
+    Args:
+        install_dir (str): Директорія менеджера.
+        drives (List[str]): Диски для пошуку зовнішніх кас.
+        data (Dict): Дані API для очищення під час виходу.
+
+    Returns:
+        Optional[List[str]]: Директорії вибраних кас або None, якщо користувач повернувся назад.
+    """
+    profiles_info = []
+    manager_dir = install_dir
+
+    with spinner("Searching cash registers"):
+        reset_cache()
+        if manager_dir:
+            cash_registers, is_empty, seen_paths = find_cash_registers_by_profiles_json(manager_dir)
+            if is_empty:
+                print(f"{Fore.RED}! ! ! PROFILES.JSON IS EMPTY ! ! !{Style.RESET_ALL}")
+
+            if cash_registers:
+                for cash in cash_registers:
+                    if cash and "path" in cash:
+                        profile_info = get_cash_register_info(cash["path"], is_external=False)
+                        if profile_info:
+                            profiles_info.append(profile_info)
+            external_cashes = find_cash_registers_by_exe(manager_dir, drives, max_depth=4)
+            if external_cashes:
+                for cash in external_cashes:
+                    if cash and "path" in cash:
+                        normalized_path = os.path.normpath(os.path.abspath(cash["path"]))
+                        if normalized_path not in seen_paths:
+                            profile_info = get_cash_register_info(cash["path"], is_external=True)
+                            if profile_info:
+                                profiles_info.append(profile_info)
+                        seen_paths.add(normalized_path)
+        else:
+            external_cashes = find_cash_registers_by_exe(None, drives, max_depth=4)
+            if external_cashes:
+                for cash in external_cashes:
+                    if cash and "path" in cash:
+                        profile_info = get_cash_register_info(cash["path"], is_external=True)
+                        if profile_info:
+                            profiles_info.append(profile_info)
+
+    if not profiles_info:
+        print(f"{Fore.RED}✗ No profiles found in {install_dir}.{Style.RESET_ALL}")
+        run_spinner("No profiles", 2.0)
+        return None
+
+    while True:
+        clear_screen()
+        print(f"{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}")
+        print(f"{Fore.CYAN} SELECT PROFILE TO UPDATE {Style.RESET_ALL}")
+        print(f"{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}\n")
+        print(f"{Fore.CYAN}Available profiles:{Style.RESET_ALL}\n")
+        for i, profile in enumerate(profiles_info, 1):
+            if profile is None:
+                continue
+            health_color = Fore.GREEN if profile["health"] == "OK" else Fore.RED
+            trans_color = Fore.GREEN if profile["trans_status"] in ["DONE", "EMPTY"] else Fore.RED
+            shift_color = Fore.GREEN if profile["shift_status"] == "CLOSED" else Fore.RED
+            status_text = "ON" if profile["is_running"] else "OFF"
+            status_color = Fore.RED if profile["is_running"] else Fore.GREEN
+            profile_str = (
+                f"| {Fore.YELLOW}FN:{profile['fiscal_number']}{Style.RESET_ALL} "
+                f"| {status_color}{status_text}{Style.RESET_ALL} "
+                f"| H:{health_color}{profile['health']}{Style.RESET_ALL} "
+                f"| T:{trans_color}{profile['trans_status']}{Style.RESET_ALL} "
+                f"| S:{shift_color}{profile['shift_status']}{Style.RESET_ALL} "
+                f"| v{profile['version']}"
+            )
+            print(f"{Fore.WHITE}{i}. {profile['name']} {profile_str}{Style.RESET_ALL}")
+        print(f"\n{Fore.WHITE}{len(profiles_info) + 1}. All profiles{Style.RESET_ALL}")
+        print(f"{Fore.WHITE}0. Back{Style.RESET_ALL}")
+        print(f"{Fore.WHITE}Q. Exit{Style.RESET_ALL}")
+
+        profiles_dir = os.path.join(install_dir, "profiles")
+        backup_records = []
+        try:
+            if os.path.exists(profiles_dir):
+                backup_records = list_backups(profiles_dir)
+        except Exception as e:
+            print(f"{Fore.RED}✗ Failed to list backups: {e}{Style.RESET_ALL}")
+        backup_files = [record["file"] for record in backup_records]
+
+        if backup_files:
+            print(f"\n{Fore.YELLOW}Available backups:{Style.RESET_ALL}")
+            for i, record in enumerate(backup_records, 1):
+                print(f"{Fore.WHITE}B{i}. Restore {record['file']}{Style.RESET_ALL}")
+                print(f"{Fore.WHITE}D{i}. Delete {record['file']}{Style.RESET_ALL}")
+                print(f"    {describe_backup(record)}")
+            print(f"{Fore.WHITE}R. Backup retention report{Style.RESET_ALL}")
+            print()
+
+        print(f"{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}")
+        choice = input(f"{Fore.CYAN}Enter your choice: {Style.RESET_ALL}")
+
+        if choice.lower() in ["q", "й"]:
+            from cleanup import cleanup
+            cleanup(data)
+            sys.exit(0)
+
+        if choice.lower() in ["r", "к"] and backup_files:
+            plan = plan_retention(profiles_dir)
+            print_retention_report(plan)
+            if any(record["action"] == "delete" for record in plan):
+                confirm = input(f"{Fore.CYAN}Apply retention now? (Y/N): {Style.RESET_ALL}").strip().lower()
+                if confirm == "y":
+                    result = apply_retention(profiles_dir, plan)
+                    print(f"{Fore.GREEN}✓ Deleted {result['deleted']} backups, "
+                          f"freed {format_bytes(result['freed_bytes'])}.{Style.RESET_ALL}")
+                    run_spinner("Retention applied", 1.0)
+            else:
+                input("Press Enter to continue...")
+            continue
+
+        if choice.lower().startswith("b") and len(choice) > 1:
+            try:
+                backup_idx = int(choice[1:]) - 1
+                if 0 <= backup_idx < len(backup_files):
+                    backup_path = os.path.join(profiles_dir, backup_files[backup_idx])
+                    target_dir = os.path.join(profiles_dir,
+                                              os.path.splitext(backup_files[backup_idx])[0].split("_backup_")[0])
+                    if os.path.exists(target_dir):
+                        if restore_from_backup(target_dir, backup_path, is_rro_agent=True):
+                            print(f"{Fore.GREEN}✓ Profile {os.path.basename(target_dir)} restored.{Style.RESET_ALL}")
+                            run_spinner("Restore completed", 1.0)
+                        else:
+                            print(f"{Fore.RED}✗ Restore failed.{Style.RESET_ALL}")
+                            input("Press Enter to continue...")
+                    else:
+                        print(f"{Fore.RED}✗ Target directory not found for backup.{Style.RESET_ALL}")
+                        run_spinner("Directory not found", 2.0)
+                else:
+                    print(f"{Fore.RED}✗ Invalid backup selection.{Style.RESET_ALL}")
+                    run_spinner("Invalid selection", 2.0)
+            except ValueError:
+                print(f"{Fore.RED}✗ Invalid backup input.{Style.RESET_ALL}")
+                run_spinner("Invalid input", 2.0)
+            except Exception as e:
+                print(f"{Fore.RED}✗ Restore error: {e}{Style.RESET_ALL}")
+                run_spinner("Restore error", 2.0)
+            continue
+
+        if choice.lower().startswith("d") and len(choice) > 1:
+            try:
+                backup_idx = int(choice[1:]) - 1
+                if 0 <= backup_idx < len(backup_files):
+                    backup_path = os.path.join(profiles_dir, backup_files[backup_idx])
+                    if delete_backup(backup_path):
+                        print(f"{Fore.GREEN}✓ Backup deleted.{Style.RESET_ALL}")
+                        run_spinner("Backup deleted", 1.0)
+                    else:
+                        print(f"{Fore.RED}✗ Failed to delete backup.{Style.RESET_ALL}")
+                        input("Press Enter to continue...")
+                else:
+                    print(f"{Fore.RED}✗ Invalid delete selection.{Style.RESET_ALL}")
+                    run_spinner("Invalid selection", 2.0)
+            except ValueError:
+                print(f"{Fore.RED}✗ Invalid delete input.{Style.RESET_ALL}")
+                run_spinner("Invalid input", 2.0)
+            except Exception as e:
+                print(f"{Fore.RED}✗ Delete error: {e}{Style.RESET_ALL}")
+                run_spinner("Delete error", 2.0)
+            continue
+
+        try:
+            choice_int = int(choice)
+            if choice_int == 0:
+                print(f"{Fore.GREEN}✓ Returning to previous menu...{Style.RESET_ALL}")
+                run_spinner("Returning", 1.0)
+                return None
+            elif 1 <= choice_int <= len(profiles_info):
+                selected_profile = profiles_info[choice_int - 1]
+                if selected_profile is None:
+                    print(f"{Fore.RED}✗ Selected profile is invalid.{Style.RESET_ALL}")
+                    run_spinner("Invalid profile", 2.0)
+                    continue
+                if selected_profile["health"] == "BAD":
+                    print(f"{Fore.RED}✗ Cannot update {selected_profile['name']}: Database corrupted.{Style.RESET_ALL}")
+                    run_spinner("Update cancelled", 2.0)
+                    continue
+                return [selected_profile["path"]]
+            elif choice_int == len(profiles_info) + 1:
+                valid_profiles = [p for p in profiles_info if p is not None and p["health"] != "BAD"]
+                if not valid_profiles:
+                    print(f"{Fore.RED}✗ No valid profiles available for update.{Style.RESET_ALL}")
+                    run_spinner("Update cancelled", 2.0)
+                    return None
+                return [profile["path"] for profile in valid_profiles]
+            else:
+                print(f"{Fore.RED}✗ Invalid choice.{Style.RESET_ALL}")
+                run_spinner("Invalid choice", 2.0)
+        except ValueError:
+            print(f"{Fore.RED}✗ Invalid input.{Style.RESET_ALL}")
+            run_spinner("Invalid input", 2.0)
+
+
+@traced()
 def patch_file(patch_data: Dict, folder_name: str, data: Dict, is_rro_agent: bool = False,
-               is_paylink: bool = False, expected_sha256: str = "") -> bool:
+               is_paylink: bool = False, expected_sha256: str = "", interactive: bool = True,
+               targets: Optional[List[str]] = None, backup: bool = False) -> bool:
     """
     Застосовує патч до вказаних профілів або директорій.
 
     Функція завантажує патч, перевіряє його SHA256-хеш, створює резервну копію (за бажанням),
     розпаковує файли патча в цільові директорії, контролює процеси та перезапускає програми
-    після оновлення. Для RRO-агентів дозволяє вибрати профіль або оновити всі профілі.
+    після оновлення. Якщо увімкнено STREAM_PATCHES, архів розпаковується в staging ще під час
+    завантаження, а в цільові директорії файли переносяться лише після перевірки хеша.
+    Для RRO-агентів дозволяє вибрати профіль або оновити всі профілі.
     Перевіряє, чи запущені процеси каси, менеджера або PayLink, і вимагає їх зупинки.
     Для каси перевіряє, чи не заблокована тека com-server. Якщо каса і менеджер запущені,
-    вбиває тільки касу, заморожує менеджер, виконує патчинг, запускає касу, чекає 10 секунд,
-    потім розморожує менеджер.
+    вбиває тільки касу, заморожує менеджер, виконує патчинг, запускає касу, чекає, поки її
+    веб-сервер почне приймати з'єднання, потім розморожує менеджер.
+    У неінтерактивному режимі (cli.py) жодних запитань не ставиться: каси беруться з targets,
+    резервні копії створюються за прапорцем backup, процеси (зокрема запущені під час оновлення)
+    зупиняються без підтвердження, а патч із невірним хешем або каси, що не пройшли перевірку,
+    не запускаються.
 
     Args:
         patch_data (Dict): Словник із даними патча (patch_name, patch_url, sha256).
@@ -167,6 +510,9 @@ def patch_file(patch_data: Dict, folder_name: str, data: Dict, is_rro_agent: boo
         is_rro_agent (bool, optional): Чи є цільовим RRO-агент. Defaults to False.
         is_paylink (bool, optional): Чи є цільовим PayLink. Defaults to False.
         expected_sha256 (str, optional): Очікуваний SHA256-хеш патча. Defaults to "".
+        interactive (bool, optional): Запитувати користувача. Defaults to True.
+        targets (Optional[List[str]], optional): Директорії кас для RRO-агента замість меню вибору. Defaults to None.
+        backup (bool, optional): Створити резервні копії кас у неінтерактивному режимі. Defaults to False.
 
     Returns:
         bool: True, якщо оновлення успішне, False у разі помилки.
@@ -174,14 +520,27 @@ def patch_file(patch_data: Dict, folder_name: str, data: Dict, is_rro_agent: boo
     Raises:
         Exception: Помилки, такі як PermissionError, zipfile.BadZipFile або проблеми з мережею.
     """
+    staging_dir = None
     try:
         patch_file_name = patch_data["patch_name"]
         patch_url = patch_data["patch_url"]
         print(f"{Fore.CYAN}📥 Preparing to apply {patch_file_name}...{Style.RESET_ALL}")
 
-        if not download_file(patch_url, patch_file_name, expected_sha256=expected_sha256):
+        members = None
+        if STREAM_PATCHES and not os.path.exists(patch_file_name):
+            staging_dir = os.path.abspath(f"{os.path.splitext(patch_file_name)[0]}_staging")
+            members = stream_extract_archive(patch_url, staging_dir, expected_sha256=expected_sha256)
+            if members is None:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                staging_dir = None
+                print(f"{Fore.YELLOW}⚠ Falling back to regular download...{Style.RESET_ALL}")
+
+        if members is None and not download_file(patch_url, patch_file_name, expected_sha256=expected_sha256):
             if expected_sha256:
                 print(f"{Fore.YELLOW}⚠ Hash verification failed for {patch_file_name}.{Style.RESET_ALL}")
+                if not interactive:
+                    print(f"{Fore.RED}✗ Update cancelled.{Style.RESET_ALL}")
+                    return False
                 choice = input(f"{Fore.CYAN}Continue with update anyway? (Y/N): {Style.RESET_ALL}").strip().lower()
                 if choice != "y":
                     print(f"{Fore.RED}✗ Update cancelled.{Style.RESET_ALL}")
@@ -190,13 +549,21 @@ def patch_file(patch_data: Dict, folder_name: str, data: Dict, is_rro_agent: boo
             else:
                 print(f"{Fore.YELLOW}⚠ No hash provided for {patch_file_name}. Proceeding without verification.{Style.RESET_ALL}")
 
+        if members is None:
+            try:
+                with zipfile.ZipFile(patch_file_name, 'r') as zip_ref:
+                    members = zip_ref.infolist()
+            except (zipfile.BadZipFile, OSError):
+                print(f"{Fore.RED}✗ Invalid update file.{Style.RESET_ALL}")
+                run_spinner("Invalid file", 2.0)
+                return False
+
         target_folder = "checkbox.kasa.manager" if is_rro_agent else (
             "Checkbox PayLink (Beta)" if is_paylink else "checkbox.kasa.manager")
 
         install_dir = None
-        drives = DRIVES if DRIVES is not None else ["C:\\"]
-        for drive in drives:
-            path = f"{drive}\\{target_folder}"
+        for drive in DRIVES:
+            path = os.path.join(drive, target_folder)
             if os.path.exists(path):
                 install_dir = path
                 break
@@ -223,180 +590,32 @@ def patch_file(patch_data: Dict, folder_name: str, data: Dict, is_rro_agent: boo
         print(f"{Fore.GREEN}✓ Found installation directory: {install_dir}{Style.RESET_ALL}")
 
         if is_rro_agent:
-            profiles_info = []
-            manager_dir = install_dir
-
-            run_spinner("Searching cash registers", 2.0)
-
-            reset_cache()
-            if manager_dir:
-                cash_registers, is_empty, seen_paths = find_cash_registers_by_profiles_json(manager_dir)
-                if is_empty:
-                    print(f"{Fore.RED}! ! ! PROFILES.JSON IS EMPTY ! ! !{Style.RESET_ALL}")
-
-                if cash_registers:
-                    for cash in cash_registers:
-                        if cash and "path" in cash:
-                            profile_info = get_cash_register_info(cash["path"], is_external=False)
-                            if profile_info:
-                                profiles_info.append(profile_info)
-                external_cashes = find_cash_registers_by_exe(manager_dir, drives, max_depth=4)
-                if external_cashes:
-                    for cash in external_cashes:
-                        if cash and "path" in cash:
-                            normalized_path = os.path.normpath(os.path.abspath(cash["path"]))
-                            if normalized_path not in seen_paths:
-                                profile_info = get_cash_register_info(cash["path"], is_external=True)
-                                if profile_info:
-                                    profiles_info.append(profile_info)
-                            seen_paths.add(normalized_path)
+            if targets is not None:
+                target_dirs = list(targets)
+            elif interactive:
+                target_dirs = select_rro_profiles(install_dir, DRIVES, data)
             else:
-                external_cashes = find_cash_registers_by_exe(None, drives, max_depth=4)
-                if external_cashes:
-                    for cash in external_cashes:
-                        if cash and "path" in cash:
-                            profile_info = get_cash_register_info(cash["path"], is_external=True)
-                            if profile_info:
-                                profiles_info.append(profile_info)
-
-            if not profiles_info:
-                print(f"{Fore.RED}✗ No profiles found in {install_dir}.{Style.RESET_ALL}")
-                run_spinner("No profiles", 2.0)
+                target_dirs = None
+            if not target_dirs:
                 return False
 
-            while True:
-                os.system("cls")
-                print(f"{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}")
-                print(f"{Fore.CYAN} SELECT PROFILE TO UPDATE {Style.RESET_ALL}")
-                print(f"{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}\n")
-                print(f"{Fore.CYAN}Available profiles:{Style.RESET_ALL}\n")
-                for i, profile in enumerate(profiles_info, 1):
-                    if profile is None:
-                        continue
-                    health_color = Fore.GREEN if profile["health"] == "OK" else Fore.RED
-                    trans_color = Fore.GREEN if profile["trans_status"] in ["DONE", "EMPTY"] else Fore.RED
-                    shift_color = Fore.GREEN if profile["shift_status"] == "CLOSED" else Fore.RED
-                    status_text = "ON" if profile["is_running"] else "OFF"
-                    status_color = Fore.RED if profile["is_running"] else Fore.GREEN
-                    profile_str = (
-                        f"| {Fore.YELLOW}FN:{profile['fiscal_number']}{Style.RESET_ALL} "
-                        f"| {status_color}{status_text}{Style.RESET_ALL} "
-                        f"| H:{health_color}{profile['health']}{Style.RESET_ALL} "
-                        f"| T:{trans_color}{profile['trans_status']}{Style.RESET_ALL} "
-                        f"| S:{shift_color}{profile['shift_status']}{Style.RESET_ALL} "
-                        f"| v{profile['version']}"
-                    )
-                    print(f"{Fore.WHITE}{i}. {profile['name']} {profile_str}{Style.RESET_ALL}")
-                print(f"\n{Fore.WHITE}{len(profiles_info) + 1}. All profiles{Style.RESET_ALL}")
-                print(f"{Fore.WHITE}0. Back{Style.RESET_ALL}")
-                print(f"{Fore.WHITE}Q. Exit{Style.RESET_ALL}")
-
-                profiles_dir = os.path.join(install_dir, "profiles")
-                backup_files = []
-                try:
-                    if os.path.exists(profiles_dir):
-                        backup_files = [f for f in os.listdir(profiles_dir) if f.endswith(".zip") and "backup" in f.lower()]
-                except Exception as e:
-                    print(f"{Fore.RED}✗ Failed to list backups: {e}{Style.RESET_ALL}")
-
-                if backup_files:
-                    print(f"\n{Fore.YELLOW}Available backups:{Style.RESET_ALL}")
-                    for i, backup in enumerate(backup_files, 1):
-                        print(f"{Fore.WHITE}B{i}. Restore {backup}{Style.RESET_ALL}")
-                        print(f"{Fore.WHITE}D{i}. Delete {backup}{Style.RESET_ALL}")
-                    print()
-
-                print(f"{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}")
-                choice = input(f"{Fore.CYAN}Enter your choice: {Style.RESET_ALL}")
-
-                if choice.lower() in ["q", "й"]:
-                    from cleanup import cleanup
-                    cleanup(data)
-                    sys.exit(0)
-
-                if choice.lower().startswith("b") and len(choice) > 1:
-                    try:
-                        backup_idx = int(choice[1:]) - 1
-                        if 0 <= backup_idx < len(backup_files):
-                            backup_path = os.path.join(profiles_dir, backup_files[backup_idx])
-                            target_dir = os.path.join(profiles_dir,
-                                                      os.path.splitext(backup_files[backup_idx])[0].split("_backup_")[0])
-                            if os.path.exists(target_dir):
-                                if restore_from_backup(target_dir, backup_path, is_rro_agent=is_rro_agent,
-                                                       is_paylink=is_paylink):
-                                    print(f"{Fore.GREEN}✓ Profile {os.path.basename(target_dir)} restored.{Style.RESET_ALL}")
-                                    run_spinner("Restore completed", 1.0)
-                                else:
-                                    print(f"{Fore.RED}✗ Restore failed.{Style.RESET_ALL}")
-                                    input("Press Enter to continue...")
-                            else:
-                                print(f"{Fore.RED}✗ Target directory not found for backup.{Style.RESET_ALL}")
-                                run_spinner("Directory not found", 2.0)
-                        else:
-                            print(f"{Fore.RED}✗ Invalid backup selection.{Style.RESET_ALL}")
-                            run_spinner("Invalid selection", 2.0)
-                    except ValueError:
-                        print(f"{Fore.RED}✗ Invalid backup input.{Style.RESET_ALL}")
-                        run_spinner("Invalid input", 2.0)
-                    except Exception as e:
-                        print(f"{Fore.RED}✗ Restore error: {e}{Style.RESET_ALL}")
-                        run_spinner("Restore error", 2.0)
-                    continue
-
-                if choice.lower().startswith("d") and len(choice) > 1:
-                    try:
-                        backup_idx = int(choice[1:]) - 1
-                        if 0 <= backup_idx < len(backup_files):
-                            backup_path = os.path.join(profiles_dir, backup_files[backup_idx])
-                            if delete_backup(backup_path):
-                                print(f"{Fore.GREEN}✓ Backup deleted.{Style.RESET_ALL}")
-                                run_spinner("Backup deleted", 1.0)
-                            else:
-                                print(f"{Fore.RED}✗ Failed to delete backup.{Style.RESET_ALL}")
-                                input("Press Enter to continue...")
-                        else:
-                            print(f"{Fore.RED}✗ Invalid delete selection.{Style.RESET_ALL}")
-                            run_spinner("Invalid selection", 2.0)
-                    except ValueError:
-                        print(f"{Fore.RED}✗ Invalid delete input.{Style.RESET_ALL}")
-                        run_spinner("Invalid input", 2.0)
-                    except Exception as e:
-                        print(f"{Fore.RED}✗ Delete error: {e}{Style.RESET_ALL}")
-                        run_spinner("Delete error", 2.0)
-                    continue
+            if interactive and not offer_dry_run(members, target_dirs):
+                return False
 
-                try:
-                    choice_int = int(choice)
-                    if choice_int == 0:
-                        print(f"{Fore.GREEN}✓ Returning to previous menu...{Style.RESET_ALL}")
-                        run_spinner("Returning", 1.0)
-                        return False
-                    elif 1 <= choice_int <= len(profiles_info):
-                        selected_profile = profiles_info[choice_int - 1]
-                        if selected_profile is None:
-                            print(f"{Fore.RED}✗ Selected profile is invalid.{Style.RESET_ALL}")
-                            run_spinner("Invalid profile", 2.0)
-                            continue
-                        if selected_profile["health"] == "BAD":
-                            print(f"{Fore.RED}✗ Cannot update {selected_profile['name']}: Database corrupted.{Style.RESET_ALL}")
-                            run_spinner("Update cancelled", 2.0)
-                            continue
-                        target_dirs = [selected_profile["path"]]
-                        break
-                    elif choice_int == len(profiles_info) + 1:
-                        valid_profiles = [p for p in profiles_info if p is not None and p["health"] != "BAD"]
-                        if not valid_profiles:
-                            print(f"{Fore.RED}✗ No valid profiles available for update.{Style.RESET_ALL}")
-                            run_spinner("Update cancelled", 2.0)
-                            return False
-                        target_dirs = [profile["path"] for profile in valid_profiles]
-                        break
-                    else:
-                        print(f"{Fore.RED}✗ Invalid choice.{Style.RESET_ALL}")
-                        run_spinner("Invalid choice", 2.0)
-                except ValueError:
-                    print(f"{Fore.RED}✗ Invalid input.{Style.RESET_ALL}")
-                    run_spinner("Invalid input", 2.0)
+            # Резервна копія знімається до зупинки каси: agent.db копіюється онлайн, тож вона не додає простою
+            names = ", ".join(os.path.basename(target_dir) for target_dir in target_dirs)
+            if interactive:
+                backup = input(
+                    f"{Fore.CYAN}Create backups of {names} before updating? (Y/N): {Style.RESET_ALL}").strip().lower() == "y"
+            if backup:
+                results = create_backups(target_dirs, incremental=INCREMENTAL_BACKUPS, profile=PATCH_BACKUP_PROFILE)
+                if all(results.values()):
+                    run_spinner("Backups created", 1.0)
+                else:
+                    print(f"{Fore.RED}✗ Some backups failed. Continuing without them...{Style.RESET_ALL}")
+                    run_spinner("Backup failed", 2.0)
+            else:
+                print(f"{Fore.GREEN}✓ Backup skipped.{Style.RESET_ALL}")
 
             cash_processes = []
             for target_dir in target_dirs:
@@ -418,7 +637,7 @@ def patch_file(patch_data: Dict, folder_name: str, data: Dict, is_rro_agent: boo
                     print(f"{Fore.RED}Manager processes:{Style.RESET_ALL}")
                     for proc in manager_processes:
                         print(f" - PID: {proc.pid}")
-                choice = input(f"{Fore.CYAN}Close cash register processes and suspend manager to proceed with update? (Y/N): {Style.RESET_ALL}").strip().lower()
+                choice = input(f"{Fore.CYAN}Close cash register processes and suspend manager to proceed with update? (Y/N): {Style.RESET_ALL}").strip().lower() if interactive else "y"
                 if choice == "y":
                     print(f"{Fore.YELLOW}Preparing to stop cash register processes...{Style.RESET_ALL}")
                     if cash_running:
@@ -433,7 +652,7 @@ def patch_file(patch_data: Dict, folder_name: str, data: Dict, is_rro_agent: boo
                                 print(f"{Fore.RED}✗ Failed to kill checkbox_kasa.exe (PID: {proc.pid}): {e}{Style.RESET_ALL}")
                                 run_spinner("Process kill failed", 2.0)
                                 return False
-                    time.sleep(1)
+                        wait_for_exit(cash_processes)
                     if manager_running:
                         print(f"{Fore.YELLOW}Suspending manager processes...{Style.RESET_ALL}")
                         for proc in manager_processes:
@@ -469,22 +688,11 @@ def patch_file(patch_data: Dict, folder_name: str, data: Dict, is_rro_agent: boo
                         run_spinner("Directory check error", 2.0)
                         return False
 
-            for target_dir in target_dirs:
-                choice = input(
-                    f"{Fore.CYAN}Create backup of {os.path.basename(target_dir)} before updating? (Y/N): {Style.RESET_ALL}").strip().lower()
-                if choice == "y":
-                    backup_path = create_backup(target_dir)
-                    if backup_path:
-                        print(f"{Fore.GREEN}✓ Backup created successfully for {os.path.basename(target_dir)}!{Style.RESET_ALL}")
-                        run_spinner("Backup created", 1.0)
-                    else:
-                        print(f"{Fore.RED}✗ Backup failed. Continuing without backup...{Style.RESET_ALL}")
-                        run_spinner("Backup failed", 2.0)
-                else:
-                    print(f"{Fore.GREEN}✓ Backup skipped.{Style.RESET_ALL}")
-
         else:
             target_dirs = [install_dir]
+            if interactive and not offer_dry_run(members, target_dirs):
+                return False
+
             processes_to_kill = ["CheckboxPayLink.exe", "POSServer.exe"] if is_paylink else ["kasa_manager.exe"]
             running_processes = []
             for proc_name in processes_to_kill:
@@ -495,7 +703,7 @@ def patch_file(patch_data: Dict, folder_name: str, data: Dict, is_rro_agent: boo
                 print(f"{Fore.RED}⚠ Processes are running!{Style.RESET_ALL}")
                 for proc in running_processes:
                     print(f" - {proc.name()} (PID: {proc.pid})")
-                choice = input(f"{Fore.CYAN}Close all processes to proceed with update? (Y/N): {Style.RESET_ALL}").strip().lower()
+                choice = input(f"{Fore.CYAN}Close all processes to proceed with update? (Y/N): {Style.RESET_ALL}").strip().lower() if interactive else "y"
                 if choice == "y":
                     print(f"{Fore.YELLOW}Stopping processes...{Style.RESET_ALL}")
                     for proc in running_processes:
@@ -507,41 +715,43 @@ def patch_file(patch_data: Dict, folder_name: str, data: Dict, is_rro_agent: boo
                             print(f"{Fore.YELLOW}⚠ {proc.name()} (PID: {proc.pid}) already terminated.{Style.RESET_ALL}")
                         except Exception as e:
                             print(f"{Fore.RED}✗ Failed to kill {proc.name()} (PID: {proc.pid}): {e}{Style.RESET_ALL}")
-                    time.sleep(1)
+                    wait_for_exit(running_processes)
                 else:
                     print(f"{Fore.RED}✗ Update cancelled: Processes must be stopped.{Style.RESET_ALL}")
                     run_spinner("Update cancelled", 2.0)
                     return False
 
-        stop_monitoring = threading.Event()
-        monitor_threads = []
         processes_to_kill = ["checkbox_kasa.exe"] if is_rro_agent else (
             ["CheckboxPayLink.exe", "POSServer.exe"] if is_paylink else ["kasa_manager.exe"])
-        for target_dir in target_dirs:
-            thread = threading.Thread(target=manage_processes, args=(processes_to_kill, [target_dir], stop_monitoring))
-            thread.start()
-            monitor_threads.append(thread)
+        watcher = ProcessWatcher(processes_to_kill, target_dirs).start()
         print(f"{Fore.CYAN}🔒 Monitoring processes during update...{Style.RESET_ALL}")
 
         print(f"{Fore.CYAN}📦 Extracting {patch_file_name}...{Style.RESET_ALL}")
+        apply_started = time.monotonic()
         try:
-            with zipfile.ZipFile(patch_file_name, 'r') as zip_ref:
-                total_files = len(zip_ref.infolist())
-                if is_rro_agent and len(target_dirs) > 1:
-                    extract_to_multiple_dirs(zip_ref, target_dirs, total_files)
-                else:
-                    with tqdm(total=total_files, desc="Extracting files",
-                              bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}]") as pbar:
-                        for file_info in zip_ref.infolist():
-                            target_path = os.path.join(target_dirs[0], file_info.filename)
-                            if os.path.exists(target_path):
-                                os.remove(target_path)
-                            zip_ref.extract(file_info, target_dirs[0])
-                            pbar.update(1)
-                for target_dir in target_dirs:
-                    need_reboot_file = os.path.join(target_dir, ".need_reboot")
-                    if os.path.exists(need_reboot_file):
-                        os.remove(need_reboot_file)
+            if staging_dir:
+                apply_staged_files(staging_dir, members, target_dirs, watcher, interactive)
+            else:
+                with zipfile.ZipFile(patch_file_name, 'r') as zip_ref:
+                    members = zip_ref.infolist()
+                    total_files = len(members)
+                    if is_rro_agent and len(target_dirs) > 1:
+                        extract_to_multiple_dirs(zip_ref, target_dirs, total_files, watcher, interactive)
+                    else:
+                        with tqdm(total=total_files, desc="Extracting files",
+                                  bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}]") as pbar:
+                            for file_info in zip_ref.infolist():
+                                target_path = os.path.join(target_dirs[0], file_info.filename)
+                                if os.path.exists(target_path):
+                                    os.remove(target_path)
+                                zip_ref.extract(file_info, target_dirs[0])
+                                pbar.update(1)
+                                handle_process_violations(watcher, interactive)
+            for target_dir in target_dirs:
+                need_reboot_file = os.path.join(target_dir, ".need_reboot")
+                if os.path.exists(need_reboot_file):
+                    os.remove(need_reboot_file)
+            apply_seconds = time.monotonic() - apply_started
             print(f"{Fore.GREEN}✓ Files updated successfully in {', '.join(target_dirs)}!{Style.RESET_ALL}")
         except PermissionError:
             print(f"{Fore.RED}✗ Permission denied. Please close applications or run as administrator.{Style.RESET_ALL}")
@@ -556,40 +766,40 @@ def patch_file(patch_data: Dict, folder_name: str, data: Dict, is_rro_agent: boo
             run_spinner("Update error", 2.0)
             return False
         finally:
-            stop_monitoring.set()
-            for thread in monitor_threads:
-                try:
-                    thread.join()
-                except Exception:
-                    pass
+            watcher.stop()
+            handle_process_violations(watcher, interactive)
             print(f"{Fore.GREEN}✓ Process monitoring stopped.{Style.RESET_ALL}")
 
+        print(f"{Fore.CYAN}🔎 Verifying written files...{Style.RESET_ALL}")
+        failed_dirs = print_verification_report(
+            verify_extracted_files(members, target_dirs, skip_names={".need_reboot"}))
+        if failed_dirs and interactive:
+            choice = input(f"{Fore.CYAN}Verification failed for {len(failed_dirs)} directories. "
+                           f"Launch them anyway? (Y/N): {Style.RESET_ALL}").strip().lower()
+            if choice == "y":
+                failed_dirs = []
+
+        restart_seconds = []
         for target_dir in target_dirs:
             try:
-                if is_rro_agent:
+                if target_dir in failed_dirs:
+                    print(f"{Fore.RED}✗ Not launching {target_dir}: installed files are corrupted. "
+                          f"Restore a backup or re-apply the patch.{Style.RESET_ALL}")
+                elif is_rro_agent:
                     print(f"{Fore.CYAN}🚀 Launching cash register in {target_dir}...{Style.RESET_ALL}")
-                    launch_executable("checkbox_kasa.exe", target_dir, "Cash register", spinner_duration=10.0)
-                    print(f"{Fore.GREEN}✓ Cash register launched successfully!{Style.RESET_ALL}")
-                    if manager_running:
-                        print(f"{Fore.YELLOW}⏳ Waiting 10 seconds before resuming manager...{Style.RESET_ALL}")
-                        run_spinner("Waiting for cash register initialization", 10.0)
-                        print(f"{Fore.YELLOW}Resuming manager processes...{Style.RESET_ALL}")
-                        for proc in manager_processes:
-                            try:
-                                proc.resume()
-                                print(f"{Fore.GREEN}✓ Resumed kasa_manager.exe (PID: {proc.pid}).{Style.RESET_ALL}")
-                                run_spinner("Process resumed", 1.0)
-                            except psutil.NoSuchProcess:
-                                print(f"{Fore.YELLOW}⚠ kasa_manager.exe (PID: {proc.pid}) already terminated.{Style.RESET_ALL}")
-                            except Exception as e:
-                                print(f"{Fore.RED}✗ Failed to resume kasa_manager.exe: {e}{Style.RESET_ALL}")
+                    launch_started = time.monotonic()
+                    if launch_executable("checkbox_kasa.exe", target_dir, "Cash register", spinner_duration=0.0):
+                        print(f"{Fore.GREEN}✓ Cash register launched successfully!{Style.RESET_ALL}")
+                        if wait_for_cash_register(target_dir):
+                            restart_seconds.append(time.monotonic() - launch_started)
 
                 elif is_paylink:
                     paylink_path = os.path.join(target_dir, "CheckboxPayLink.exe")
                     if os.path.exists(paylink_path):
                         print(f"{Fore.CYAN}🚀 Launching PayLink...{Style.RESET_ALL}")
-                        subprocess.Popen(f'start "" "{paylink_path}"', cwd=target_dir, shell=True)
+                        launch(paylink_path, target_dir)
                         print(f"{Fore.GREEN}✓ PayLink launched successfully!{Style.RESET_ALL}")
+                        wait_for_process("CheckboxPayLink.exe", target_dir, display_name="PayLink")
                     else:
                         print(f"{Fore.YELLOW}⚠ PayLink executable not found.{Style.RESET_ALL}")
 
@@ -597,17 +807,35 @@ def patch_file(patch_data: Dict, folder_name: str, data: Dict, is_rro_agent: boo
                     manager_path = os.path.join(target_dir, "kasa_manager.exe")
                     if os.path.exists(manager_path):
                         print(f"{Fore.CYAN}🚀 Launching manager...{Style.RESET_ALL}")
-                        subprocess.Popen(f'start "" "{manager_path}"', cwd=target_dir, shell=True)
+                        launch(manager_path, target_dir)
                         print(f"{Fore.GREEN}✓ Manager launched successfully!{Style.RESET_ALL}")
                     else:
                         print(f"{Fore.YELLOW}⚠ Manager executable not found.{Style.RESET_ALL}")
+
+                if is_rro_agent and manager_running:
+                    print(f"{Fore.YELLOW}Resuming manager processes...{Style.RESET_ALL}")
+                    for proc in manager_processes:
+                        try:
+                            proc.resume()
+                            print(f"{Fore.GREEN}✓ Resumed kasa_manager.exe (PID: {proc.pid}).{Style.RESET_ALL}")
+                            run_spinner("Process resumed", 1.0)
+                        except psutil.NoSuchProcess:
+                            print(f"{Fore.YELLOW}⚠ kasa_manager.exe (PID: {proc.pid}) already terminated.{Style.RESET_ALL}")
+                        except Exception as e:
+                            print(f"{Fore.RED}✗ Failed to resume kasa_manager.exe: {e}{Style.RESET_ALL}")
             except Exception as e:
                 print(f"{Fore.RED}✗ Failed to launch process: {e}{Style.RESET_ALL}")
 
+        bytes_written = sum(m.file_size for m in members if not m.is_dir()) * len(target_dirs)
+        record_patch_run(bytes_written, apply_seconds, restart_seconds)
+
         run_spinner("Update completed", 1.0)
         print(f"{Fore.GREEN}✓ Update process completed successfully!{Style.RESET_ALL}")
         return True
     except Exception as e:
         print(f"{Fore.RED}✗ Update error: {e}{Style.RESET_ALL}")
         run_spinner("Update error", 2.0)
-        return False
\ No newline at end of file
+        return False
+    finally:
+        if staging_dir:
+            shutil.rmtree(staging_dir, ignore_errors=True)
\ No newline at end of file
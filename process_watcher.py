@@ -0,0 +1,132 @@
+import os
+import queue
+import threading
+from typing import Dict, List, Optional, Set
+
+import psutil
+
+
+class ProcessWatcher:
+    """
+    Відстежує процеси, що запускаються з цільових директорій під час оновлення.
+
+    Замість окремого потоку на кожну директорію використовується один фоновий потік, який
+    з низькою частотою робить один знімок списку процесів і перевіряє його одразу для всіх
+    директорій. Знайдені порушення не обробляються у фоновому потоці, а передаються через
+    чергу в основний потік, який сам вирішує, що з ними робити.
+
+    Args:
+        process_names (List[str]): Імена процесів, які не повинні працювати під час оновлення.
+        target_dirs (List[str]): Директорії, з яких ці процеси не повинні запускатися.
+        interval (float): Інтервал між знімками в секундах. За замовчуванням 1.0.
+    """
+
+    def __init__(self, process_names: List[str], target_dirs: List[str], interval: float = 1.0):
+        self.process_names = {name.lower() for name in process_names}
+        self.target_dirs = [os.path.normcase(os.path.realpath(d)) for d in target_dirs]
+        self.interval = interval
+        self.violations: "queue.Queue[Dict]" = queue.Queue()
+        self.reported_pids: Set[int] = set()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _owning_dir(self, exe_path: str) -> Optional[str]:
+        """
+        Повертає цільову директорію, в якій розташований виконуваний файл, або None.
+
+        Args:
+            exe_path (str): Шлях до виконуваного файлу процесу.
+
+        Returns:
+            Optional[str]: Нормалізований шлях цільової директорії або None.
+        """
+        exe_dir = os.path.normcase(os.path.realpath(os.path.dirname(exe_path)))
+        for target_dir in self.target_dirs:
+            if exe_dir == target_dir or exe_dir.startswith(target_dir + os.sep):
+                return target_dir
+        return None
+
+    def snapshot(self) -> List[Dict]:
+        """
+        Робить один прохід по списку процесів і повертає ті, що порушують обмеження.
+
+        Шлях до виконуваного файлу запитується лише для процесів із потрібним ім'ям,
+        щоб не звертатися до кожного процесу системи.
+
+        Returns:
+            List[Dict]: Список словників (pid, name, exe, target_dir, process).
+        """
+        found = []
+        try:
+            for proc in psutil.process_iter(['pid', 'name']):
+                name = proc.info.get('name') or ""
+                if name.lower() not in self.process_names:
+                    continue
+                try:
+                    exe_path = proc.exe()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+                if not exe_path:
+                    continue
+                target_dir = self._owning_dir(exe_path)
+                if target_dir:
+                    found.append({
+                        "pid": proc.pid,
+                        "name": name,
+                        "exe": exe_path,
+                        "target_dir": target_dir,
+                        "process": proc
+                    })
+        except Exception:
+            pass
+        return found
+
+    def _run(self) -> None:
+        while True:
+            for violation in self.snapshot():
+                if violation["pid"] not in self.reported_pids:
+                    self.reported_pids.add(violation["pid"])
+                    self.violations.put(violation)
+            if self._stop_event.wait(self.interval):
+                break
+
+    def start(self) -> "ProcessWatcher":
+        """
+        Запускає фоновий потік спостереження.
+
+        Returns:
+            ProcessWatcher: Цей самий об'єкт для зручності ланцюжкових викликів.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="process-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Зупиняє фоновий потік і чекає його завершення.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def drain(self) -> List[Dict]:
+        """
+        Забирає з черги всі накопичені порушення без блокування.
+
+        Returns:
+            List[Dict]: Список порушень у порядку їх виявлення.
+        """
+        items = []
+        while True:
+            try:
+                items.append(self.violations.get_nowait())
+            except queue.Empty:
+                return items
+
+    def __enter__(self) -> "ProcessWatcher":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
@@ -0,0 +1,118 @@
+import os
+import re
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+from config import PROFILE_ACTIONS, PROFILE_TOP
+
+DEFAULT_PROFILE_DIR = "cbx_profiles"
+
+_lock = threading.Lock()
+_directory: Optional[str] = None
+_active = False
+
+
+def enable(directory: Optional[str] = None) -> None:
+    """
+    Вмикає профілювання дій меню та команд CLI до кінця сесії.
+
+    Args:
+        directory (Optional[str]): Директорія для .prof-файлів. За замовчуванням cbx_profiles
+            у поточній директорії.
+    """
+    global _directory
+    _directory = directory or DEFAULT_PROFILE_DIR
+
+
+def is_enabled() -> bool:
+    return _directory is not None
+
+
+def top_hotspots(stats, limit: int = PROFILE_TOP) -> List[Tuple[str, int, float, float]]:
+    """
+    Повертає функції з найбільшим власним часом.
+
+    Args:
+        stats (pstats.Stats): Статистика профілювальника.
+        limit (int): Кількість функцій.
+
+    Returns:
+        List[Tuple[str, int, float, float]]: (функція з файлом і рядком, кількість викликів,
+            власний час, сукупний час) у секундах.
+    """
+    rows = []
+    for (filename, line, func), (_, calls, self_time, cumulative, _) in stats.stats.items():
+        location = func if filename == "~" else f"{func} ({os.path.basename(filename)}:{line})"
+        rows.append((location, calls, self_time, cumulative))
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows[:limit]
+
+
+def print_hotspots(name: str, rows: List[Tuple[str, int, float, float]], path: str,
+                   out: Optional[TextIO] = None) -> None:
+    """
+    Виводить таблицю найгарячіших функцій дії.
+
+    Args:
+        name (str): Назва дії.
+        rows (List[Tuple[str, int, float, float]]): Результат top_hotspots.
+        path (str): Шлях до збереженого .prof-файлу.
+        out (Optional[TextIO]): Потік виводу. За замовчуванням sys.stderr.
+    """
+    out = out or sys.stderr
+    print(f"\nProfile of '{name}' saved to {os.path.abspath(path)}", file=out)
+    print(f"{'self s':>9}{'cumul s':>9}{'calls':>9}  function", file=out)
+    for location, calls, self_time, cumulative in rows:
+        print(f"{self_time:>9.3f}{cumulative:>9.3f}{calls:>9}  {location}", file=out)
+
+
+@contextmanager
+def profile_action(name: str) -> Iterator[None]:
+    """
+    Профілює дію через cProfile, якщо профілювання ввімкнено.
+
+    Після завершення дії (зокрема з помилкою) статистика зберігається у файл
+    <дата>_<час>_<дія>.prof, який можна відкрити через pstats або snakeviz, а в stderr
+    виводиться таблиця найгарячіших функцій. Вкладені дії профілюються разом із зовнішньою.
+
+    Args:
+        name (str): Назва дії, наприклад "patch 1.4.2.zip".
+
+    Yields:
+        None
+    """
+    global _active
+    with _lock:
+        start = is_enabled() and not _active
+        if start:
+            _active = True
+    if not start:
+        yield
+        return
+
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        with _lock:
+            _active = False
+        slug = re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("_") or "action"
+        path = os.path.join(_directory, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{slug}.prof")
+        try:
+            os.makedirs(_directory, exist_ok=True)
+            profiler.dump_stats(path)
+            print_hotspots(name, top_hotspots(pstats.Stats(profiler)), path)
+        except OSError as e:
+            print(f"Failed to save profile of '{name}': {e}", file=sys.stderr)
+
+
+if PROFILE_ACTIONS not in ("", "0"):
+    enable(None if PROFILE_ACTIONS == "1" else PROFILE_ACTIONS)
@@ -0,0 +1,153 @@
+import json
+import os
+import socket
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from colorama import Fore, Style
+
+from config import READINESS_TIMEOUT
+from utils import find_process_by_path, show_spinner
+
+
+def get_web_server_address(cash_path: str) -> Optional[Tuple[str, int]]:
+    """
+    Читає адресу локального веб-сервера каси з її config.json.
+
+    Args:
+        cash_path (str): Шлях до директорії каси.
+
+    Returns:
+        Optional[Tuple[str, int]]: Пара (host, port) або None, якщо config.json відсутній чи некоректний.
+    """
+    config_path = os.path.normpath(os.path.join(cash_path, "config.json"))
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(config, dict):
+        return None
+    web_server = config.get("web_server") or {}
+    host = web_server.get("host", "127.0.0.1")
+    try:
+        port = int(web_server.get("port", 9200))
+    except (TypeError, ValueError):
+        return None
+    return host, port
+
+
+def is_port_open(host: str, port: int, timeout: float = 0.5) -> bool:
+    """
+    Перевіряє, чи приймає вказаний порт TCP-з'єднання.
+
+    Args:
+        host (str): Адреса хоста. "0.0.0.0" та порожній рядок замінюються на 127.0.0.1.
+        port (int): Номер порту.
+        timeout (float): Тайм-аут з'єднання в секундах. За замовчуванням 0.5.
+
+    Returns:
+        bool: True, якщо з'єднання встановлено, False інакше.
+    """
+    if host in ("", "0.0.0.0"):
+        host = "127.0.0.1"
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def wait_until(probe: Callable[[], bool], max_wait: float = READINESS_TIMEOUT, initial_delay: float = 0.25,
+               max_delay: float = 2.0, backoff: float = 1.5) -> Tuple[bool, float]:
+    """
+    Викликає перевірку готовності з експоненційною затримкою до успіху або вичерпання часу.
+
+    Args:
+        probe (Callable[[], bool]): Функція перевірки, що повертає True, коли ресурс готовий.
+        max_wait (float): Максимальний час очікування в секундах.
+        initial_delay (float): Перша затримка між перевірками в секундах. За замовчуванням 0.25.
+        max_delay (float): Найбільша затримка між перевірками в секундах. За замовчуванням 2.0.
+        backoff (float): Множник збільшення затримки. За замовчуванням 1.5.
+
+    Returns:
+        Tuple[bool, float]: Чи став ресурс готовим і скільки секунд минуло.
+    """
+    start = time.monotonic()
+    delay = initial_delay
+    while True:
+        try:
+            if probe():
+                return True, time.monotonic() - start
+        except Exception:
+            pass
+        elapsed = time.monotonic() - start
+        if elapsed >= max_wait:
+            return False, elapsed
+        time.sleep(min(delay, max_wait - elapsed))
+        delay = min(delay * backoff, max_delay)
+
+
+def _wait_with_spinner(message: str, probe: Callable[[], bool], max_wait: float) -> Tuple[bool, float]:
+    stop_event = threading.Event()
+    spinner_thread = threading.Thread(target=show_spinner, args=(stop_event, message))
+    spinner_thread.start()
+    try:
+        return wait_until(probe, max_wait=max_wait)
+    finally:
+        stop_event.set()
+        spinner_thread.join()
+
+
+def wait_for_process(process_name: str, target_dir: str, max_wait: float = READINESS_TIMEOUT,
+                     display_name: Optional[str] = None) -> bool:
+    """
+    Чекає, поки процес із вказаним ім'ям запуститься з цільової директорії.
+
+    Args:
+        process_name (str): Ім'я процесу (наприклад, 'CheckboxPayLink.exe').
+        target_dir (str): Директорія, з якої має працювати процес.
+        max_wait (float): Максимальний час очікування в секундах.
+        display_name (Optional[str]): Назва для повідомлень. За замовчуванням ім'я процесу.
+
+    Returns:
+        bool: True, якщо процес запустився вчасно, False інакше.
+    """
+    display_name = display_name or process_name
+    ready, elapsed = _wait_with_spinner(f"Waiting for {display_name.lower()}",
+                                        lambda: find_process_by_path(process_name, target_dir) is not None,
+                                        max_wait)
+    if ready:
+        print(f"{Fore.GREEN}✓ {display_name} is running ({elapsed:.1f}s).{Style.RESET_ALL}")
+    else:
+        print(f"{Fore.YELLOW}⚠ {display_name} did not start within {max_wait:.0f}s.{Style.RESET_ALL}")
+    return ready
+
+
+def wait_for_cash_register(cash_path: str, max_wait: float = READINESS_TIMEOUT) -> bool:
+    """
+    Чекає фактичної готовності каси після запуску.
+
+    Якщо в config.json каси є адреса веб-сервера, готовність визначається відкриттям його порту.
+    Інакше каса вважається готовою, щойно процес checkbox_kasa.exe з'явиться в її директорії.
+
+    Args:
+        cash_path (str): Шлях до директорії каси.
+        max_wait (float): Максимальний час очікування в секундах.
+
+    Returns:
+        bool: True, якщо каса готова, False, якщо час очікування вичерпано.
+    """
+    address = get_web_server_address(cash_path)
+    if address is None:
+        return wait_for_process("checkbox_kasa.exe", cash_path, max_wait, display_name="Cash register")
+
+    host, port = address
+    ready, elapsed = _wait_with_spinner("Waiting for cash register initialization",
+                                        lambda: is_port_open(host, port), max_wait)
+    if ready:
+        print(f"{Fore.GREEN}✓ Cash register is ready on port {port} ({elapsed:.1f}s).{Style.RESET_ALL}")
+    else:
+        print(f"{Fore.YELLOW}⚠ Cash register did not respond on port {port} within {max_wait:.0f}s.{Style.RESET_ALL}")
+    return ready
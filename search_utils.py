@@ -6,7 +6,9 @@ import json
 from contextlib import contextmanager
 from sqlite3 import Error
 import psutil
+from platform_layer import is_hidden
 from utils import find_process_by_path
+from tracing import annotate, traced
 
 _cache = {
     "manager_dir": None,
@@ -68,14 +70,12 @@ def reset_cache():
     }
 
 def is_hidden_folder(filepath: str) -> bool:
-    if os.path.abspath(filepath) == os.path.abspath(os.path.dirname(filepath + os.sep)):
-        return False
-    try:
-        attrs = os.stat(filepath).st_file_attributes
-        return bool(attrs & 0x02)
-    except (OSError, AttributeError):
+    filepath = os.path.abspath(filepath)
+    if os.path.dirname(filepath) == filepath:
         return False
+    return is_hidden(filepath)
 
+@traced()
 def find_manager_by_exe(drives: list, max_depth: int = 4, use_cache: bool = True) -> Optional[str]:
     """
     Шукає директорію менеджера, знаходячи запущений процес 'kasa_manager.exe' або скануючи
@@ -168,6 +168,7 @@ def find_manager_by_exe(drives: list, max_depth: int = 4, use_cache: bool = True
     _cache["manager_dir"] = None
     return None
 
+@traced(arg="manager_dir")
 def find_cash_registers_by_profiles_json(manager_dir: str, use_cache: bool = True) -> Tuple[List[Dict], bool, Set[str]]:
     """
     Знаходить каси, аналізуючи файл 'profiles.json' у директорії менеджера.
@@ -227,6 +228,7 @@ def find_cash_registers_by_profiles_json(manager_dir: str, use_cache: bool = Tru
     _cache["profile_seen_paths"] = seen_paths
     return cash_registers, is_empty, seen_paths
 
+@traced(arg="manager_dir")
 def find_cash_registers_by_exe(manager_dir: Optional[str], drives: List[str], max_depth: int = 4, use_cache: bool = True) -> List[Dict]:
     """
     Шукає директорії кас, знаходячи запущені процеси 'checkbox_kasa.exe' або
@@ -323,30 +325,19 @@ def find_cash_registers_by_exe(manager_dir: Optional[str], drives: List[str], ma
     _cache["external_cashes"] = external_cashes
     return cash_registers + external_cashes
 
-def get_cash_register_info(cash_path: str, is_external: bool = False) -> Dict:
+@traced(arg="path")
+def read_register_identity(cash_path: str) -> Dict:
     """
-    Отримує детальну інформацію про касу за його шляхом.
+    Швидко читає версію та фіскальний номер каси без перевірки цілісності бази.
 
     Args:
         cash_path (str): Шлях до директорії каси.
-        is_external (bool): Чи є каса зовнішньою (не в profiles.json). За замовчуванням False.
 
     Returns:
-        Dict: Словник із інформацією про касу (назва, шлях, стан здоров’я, статус транзакцій, зміни, версія, фіскальний номер, статус запуску).
-
-    Raises:
-        sqlite3.Error: Якщо не вдалося підключитися до бази даних або виконати запит.
-        Exception: Інші помилки, пов’язані з читанням файлів або доступом до бази даних.
+        Dict: Словник із ключами version і fiscal_number ("Unknown", якщо значення недоступне).
     """
-    cash_path = os.path.normpath(os.path.abspath(cash_path))
-    db_path = os.path.normpath(os.path.join(cash_path, "agent.db"))
     version = "Unknown"
     fiscal_number = "Unknown"
-    health = "BAD"
-    trans_status = "ERROR"
-    shift_status = "OPENED"
-    is_running = bool(find_process_by_path("checkbox_kasa.exe", cash_path))
-
     try:
         version_path = os.path.normpath(os.path.join(cash_path, "version"))
         if os.path.exists(version_path):
@@ -355,6 +346,7 @@ def get_cash_register_info(cash_path: str, is_external: bool = False) -> Dict:
     except Exception:
         pass
 
+    db_path = os.path.normpath(os.path.join(cash_path, "agent.db"))
     if os.path.exists(db_path):
         try:
             with sqlite_connection(db_path) as conn:
@@ -365,7 +357,59 @@ def get_cash_register_info(cash_path: str, is_external: bool = False) -> Dict:
                     fiscal_number = result[0]
         except Error:
             pass
+    return {"version": version, "fiscal_number": fiscal_number}
+
+@traced(arg="path")
+def read_transaction_summary(cash_path: str) -> Dict:
+    """
+    Рахує транзакції каси за статусами (DONE, PENDING, ERROR тощо).
+
+    Args:
+        cash_path (str): Шлях до директорії каси.
+
+    Returns:
+        Dict: total — загальна кількість транзакцій, by_status — кількість за кожним статусом.
+            Якщо базу неможливо прочитати, total дорівнює 0, а by_status порожній.
+    """
+    by_status = {}
+    db_path = os.path.normpath(os.path.join(cash_path, "agent.db"))
+    if os.path.exists(db_path):
+        try:
+            with sqlite_connection(db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT status, COUNT(*) FROM transactions GROUP BY status;")
+                by_status = {str(status): count for status, count in cursor.fetchall()}
+        except Error:
+            pass
+    return {"total": sum(by_status.values()), "by_status": by_status}
+
+@traced(arg="path")
+def get_cash_register_info(cash_path: str, is_external: bool = False) -> Dict:
+    """
+    Отримує детальну інформацію про касу за його шляхом.
+
+    Args:
+        cash_path (str): Шлях до директорії каси.
+        is_external (bool): Чи є каса зовнішньою (не в profiles.json). За замовчуванням False.
+
+    Returns:
+        Dict: Словник із інформацією про касу (назва, шлях, стан здоров’я, статус транзакцій, зміни, версія, фіскальний номер, статус запуску).
+
+    Raises:
+        sqlite3.Error: Якщо не вдалося підключитися до бази даних або виконати запит.
+        Exception: Інші помилки, пов’язані з читанням файлів або доступом до бази даних.
+    """
+    cash_path = os.path.normpath(os.path.abspath(cash_path))
+    db_path = os.path.normpath(os.path.join(cash_path, "agent.db"))
+    identity = read_register_identity(cash_path)
+    version = identity["version"]
+    fiscal_number = identity["fiscal_number"]
+    health = "BAD"
+    trans_status = "ERROR"
+    shift_status = "OPENED"
+    is_running = bool(find_process_by_path("checkbox_kasa.exe", cash_path))
 
+    if os.path.exists(db_path):
         for attempt in range(3):
             try:
                 with sqlite_connection(db_path) as conn:
@@ -406,4 +450,61 @@ def get_cash_register_info(cash_path: str, is_external: bool = False) -> Dict:
         "fiscal_number": fiscal_number,
         "is_running": is_running,
         "is_external": is_external
-    }
\ No newline at end of file
+    }
+
+
+@traced()
+def find_register_paths(drives: List[str], use_cache: bool = True) -> Tuple[Optional[str], bool, List[Tuple[str, bool]]]:
+    """
+    Знаходить менеджер і шляхи до кас без читання їхніх баз: спершу з profiles.json,
+    потім пошуком checkbox_kasa.exe на дисках.
+
+    Args:
+        drives (List[str]): Диски для пошуку.
+        use_cache (bool): Використовувати кеш попереднього пошуку. За замовчуванням True.
+
+    Returns:
+        Tuple[Optional[str], bool, List[Tuple[str, bool]]]: Директорія менеджера (або None),
+            чи порожній profiles.json і список (нормалізований шлях каси, чи вона зовнішня).
+    """
+    paths = []
+    seen_paths = set()
+    profile_paths = set()
+    profiles_empty = False
+
+    manager_dir = find_manager_by_exe(drives, use_cache=use_cache)
+    if manager_dir:
+        profile_cashes, profiles_empty, _ = find_cash_registers_by_profiles_json(manager_dir, use_cache=use_cache)
+        for cash in profile_cashes:
+            normalized_path = os.path.normpath(os.path.abspath(cash["path"]))
+            if normalized_path not in seen_paths:
+                paths.append((normalized_path, False))
+                seen_paths.add(normalized_path)
+                profile_paths.add(normalized_path)
+
+    for cash in find_cash_registers_by_exe(manager_dir, drives, use_cache=use_cache):
+        normalized_path = os.path.normpath(os.path.abspath(cash["path"]))
+        if normalized_path not in seen_paths:
+            paths.append((normalized_path, normalized_path not in profile_paths))
+            seen_paths.add(normalized_path)
+
+    return manager_dir, profiles_empty, paths
+
+
+@traced()
+def discover_cash_registers(drives: List[str], use_cache: bool = True) -> Dict:
+    """
+    Знаходить менеджер і всі каси (find_register_paths) та читає стан кожної каси.
+
+    Args:
+        drives (List[str]): Диски для пошуку.
+        use_cache (bool): Використовувати кеш попереднього пошуку. За замовчуванням True.
+
+    Returns:
+        Dict: manager_dir (або None), profiles_empty (чи порожній profiles.json)
+            і registers — інформація про кожну касу (get_cash_register_info).
+    """
+    manager_dir, profiles_empty, paths = find_register_paths(drives, use_cache=use_cache)
+    registers = [get_cash_register_info(path, is_external=is_external) for path, is_external in paths]
+    annotate(registers=len(registers))
+    return {"manager_dir": manager_dir, "profiles_empty": profiles_empty, "registers": registers}
@@ -0,0 +1,273 @@
+import os
+import struct
+import zipfile
+import zlib
+from typing import List, Optional
+
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+DATA_DESCRIPTOR_SIGNATURE = b"PK\x07\x08"
+END_SIGNATURES = (b"PK\x01\x02", b"PK\x05\x06", b"PK\x06\x06", b"PK\x06\x07")
+LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+
+FLAG_ENCRYPTED = 0x01
+FLAG_DATA_DESCRIPTOR = 0x08
+FLAG_UTF8 = 0x800
+
+
+class StreamingUnsupported(Exception):
+    """
+    Архів використовує можливості ZIP, які неможливо розпакувати потоково
+    (шифрування, невідомий метод стиснення, stored-файли з дескриптором даних).
+    """
+
+
+def safe_member_path(root: str, name: str) -> Optional[str]:
+    """
+    Перетворює ім'я члена архіву на безпечний шлях усередині кореневої директорії.
+
+    Відкидає абсолютні шляхи, літери дисків та компоненти "..", як це робить zipfile.extract.
+
+    Args:
+        root (str): Коренева директорія розпакування.
+        name (str): Ім'я члена архіву.
+
+    Returns:
+        Optional[str]: Повний шлях або None, якщо після очищення ім'я порожнє.
+    """
+    arcname = name.replace("/", os.sep)
+    if os.altsep:
+        arcname = arcname.replace(os.altsep, os.sep)
+    arcname = os.path.splitdrive(arcname)[1]
+    parts = [p for p in arcname.split(os.sep) if p not in ("", os.curdir, os.pardir)]
+    if not parts:
+        return None
+    return os.path.join(root, *parts)
+
+
+def _dos_to_date_time(dos_date: int, dos_time: int) -> tuple:
+    return (
+        (dos_date >> 9) + 1980,
+        max((dos_date >> 5) & 0x0F, 1),
+        max(dos_date & 0x1F, 1),
+        dos_time >> 11,
+        (dos_time >> 5) & 0x3F,
+        (dos_time & 0x1F) * 2,
+    )
+
+
+class StreamingZipExtractor:
+    """
+    Розпаковує ZIP-архів у міру надходження байтів, читаючи локальні заголовки файлів.
+
+    Дані подаються методом feed() довільними шматками (наприклад, прямо з HTTP-відповіді),
+    кожен член архіву одразу записується в директорію staging і перевіряється за CRC-32.
+    Центральний каталог наприкінці архіву не потрібен: розбір завершується, щойно він починається.
+
+    Args:
+        staging_dir (str): Директорія, куди записуються розпаковані файли.
+    """
+
+    def __init__(self, staging_dir: str):
+        self.staging_dir = staging_dir
+        self.members: List[zipfile.ZipInfo] = []
+        self._buffer = bytearray()
+        self._state = "header"
+        self._info: Optional[zipfile.ZipInfo] = None
+        self._zip64 = False
+        self._out = None
+        self._decompressor = None
+        self._remaining = 0
+        self._crc = 0
+        self._written = 0
+
+    def feed(self, data: bytes) -> None:
+        """
+        Передає наступний шматок байтів архіву.
+
+        Args:
+            data (bytes): Байти архіву в порядку їх надходження.
+
+        Raises:
+            zipfile.BadZipFile: Якщо структура архіву або CRC файлу некоректні.
+            StreamingUnsupported: Якщо архів не можна розпакувати потоково.
+        """
+        if self._state == "done":
+            return
+        self._buffer += data
+        try:
+            while self._step():
+                pass
+        except Exception:
+            self._abort()
+            raise
+
+    def close(self) -> List[zipfile.ZipInfo]:
+        """
+        Завершує розбір і повертає метадані розпакованих файлів.
+
+        Returns:
+            List[zipfile.ZipInfo]: Члени архіву в порядку їх розташування.
+
+        Raises:
+            zipfile.BadZipFile: Якщо архів обірвався до початку центрального каталогу.
+        """
+        if self._state != "done":
+            self._abort()
+            raise zipfile.BadZipFile("Truncated archive: central directory not reached")
+        return self.members
+
+    def _abort(self) -> None:
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+
+    def _step(self) -> bool:
+        if self._state == "header":
+            return self._read_header()
+        if self._state == "data":
+            return self._read_data()
+        if self._state == "descriptor":
+            return self._read_descriptor()
+        self._buffer.clear()
+        return False
+
+    def _read_header(self) -> bool:
+        if len(self._buffer) < 4:
+            return False
+        signature = bytes(self._buffer[:4])
+        if signature in END_SIGNATURES:
+            self._state = "done"
+            self._buffer.clear()
+            return False
+        if signature != LOCAL_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile("Bad local file header signature")
+        if len(self._buffer) < LOCAL_HEADER.size:
+            return False
+        (_, _, flags, method, dos_time, dos_date, crc, compress_size, file_size,
+         name_len, extra_len) = LOCAL_HEADER.unpack_from(self._buffer)
+        header_len = LOCAL_HEADER.size + name_len + extra_len
+        if len(self._buffer) < header_len:
+            return False
+
+        raw_name = bytes(self._buffer[LOCAL_HEADER.size:LOCAL_HEADER.size + name_len])
+        extra = bytes(self._buffer[LOCAL_HEADER.size + name_len:header_len])
+        del self._buffer[:header_len]
+
+        if flags & FLAG_ENCRYPTED:
+            raise StreamingUnsupported("Encrypted archives are not supported")
+        if method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            raise StreamingUnsupported(f"Compression method {method} is not supported")
+        if flags & FLAG_DATA_DESCRIPTOR and method == zipfile.ZIP_STORED:
+            raise StreamingUnsupported("Stored members with data descriptor are not supported")
+
+        name = raw_name.decode("utf-8" if flags & FLAG_UTF8 else "cp437")
+        self._zip64 = False
+        if compress_size == 0xFFFFFFFF or file_size == 0xFFFFFFFF:
+            file_size, compress_size = self._parse_zip64_extra(extra, file_size, compress_size)
+
+        info = zipfile.ZipInfo(name, _dos_to_date_time(dos_date, dos_time))
+        info.flag_bits = flags
+        info.compress_type = method
+        info.CRC = crc
+        info.file_size = file_size
+        info.compress_size = compress_size
+        self._info = info
+        self._crc = 0
+        self._written = 0
+        self._remaining = compress_size
+        self._decompressor = zlib.decompressobj(-15) if method == zipfile.ZIP_DEFLATED else None
+
+        target_path = safe_member_path(self.staging_dir, name)
+        if target_path is None or name.endswith("/"):
+            if target_path is not None:
+                os.makedirs(target_path, exist_ok=True)
+            self._out = None
+        else:
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            self._out = open(target_path, "wb")
+        self._state = "data"
+        return True
+
+    def _parse_zip64_extra(self, extra: bytes, file_size: int, compress_size: int) -> tuple:
+        offset = 0
+        while offset + 4 <= len(extra):
+            tag, size = struct.unpack_from("<HH", extra, offset)
+            if tag == 0x0001:
+                self._zip64 = True
+                data = extra[offset + 4:offset + 4 + size]
+                pos = 0
+                if file_size == 0xFFFFFFFF and pos + 8 <= len(data):
+                    file_size = struct.unpack_from("<Q", data, pos)[0]
+                    pos += 8
+                if compress_size == 0xFFFFFFFF and pos + 8 <= len(data):
+                    compress_size = struct.unpack_from("<Q", data, pos)[0]
+                break
+            offset += 4 + size
+        return file_size, compress_size
+
+    def _write(self, data: bytes) -> None:
+        if data:
+            self._crc = zlib.crc32(data, self._crc)
+            self._written += len(data)
+            if self._out is not None:
+                self._out.write(data)
+
+    def _read_data(self) -> bool:
+        info = self._info
+        if info.flag_bits & FLAG_DATA_DESCRIPTOR:
+            if not self._buffer:
+                return False
+            self._write(self._decompressor.decompress(bytes(self._buffer)))
+            if not self._decompressor.eof:
+                self._buffer.clear()
+                return False
+            self._buffer = bytearray(self._decompressor.unused_data)
+            self._state = "descriptor"
+            return True
+
+        if self._remaining:
+            if not self._buffer:
+                return False
+            take = min(len(self._buffer), self._remaining)
+            chunk = bytes(self._buffer[:take])
+            del self._buffer[:take]
+            self._remaining -= take
+            if self._decompressor is not None:
+                self._write(self._decompressor.decompress(chunk))
+            else:
+                self._write(chunk)
+            if self._remaining:
+                return False
+        if self._decompressor is not None:
+            self._write(self._decompressor.flush())
+        self._finish_member()
+        return True
+
+    def _read_descriptor(self) -> bool:
+        size_len = 8 if self._zip64 else 4
+        if len(self._buffer) < 4:
+            return False
+        offset = 4 if bytes(self._buffer[:4]) == DATA_DESCRIPTOR_SIGNATURE else 0
+        needed = offset + 4 + size_len * 2
+        if len(self._buffer) < needed:
+            return False
+        fmt = "<IQQ" if self._zip64 else "<III"
+        crc, compress_size, file_size = struct.unpack_from(fmt, self._buffer, offset)
+        del self._buffer[:needed]
+        self._info.CRC = crc
+        self._info.compress_size = compress_size
+        self._info.file_size = file_size
+        self._finish_member()
+        return True
+
+    def _finish_member(self) -> None:
+        info = self._info
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+        if self._crc != info.CRC or self._written != info.file_size:
+            raise zipfile.BadZipFile(f"Bad CRC-32 or size for file {info.filename!r}")
+        self.members.append(info)
+        self._info = None
+        self._decompressor = None
+        self._state = "header"
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from backup_catalog import describe_backup, file_sha256, get_backup, list_backups
+from backup_restore import create_backup, create_backups, delete_backup
+
+
+class TestBackupCatalog(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.target_dir = os.path.join(self.temp_dir, "profile1")
+        os.makedirs(os.path.join(self.target_dir, "com-server"))
+        for name, data in (("version", b"1.4.2"), ("com-server/app.js", b"console.log(1);" * 100)):
+            with open(os.path.join(self.target_dir, *name.split("/")), "wb") as f:
+                f.write(data)
+        self.spinner = patch("backup_restore.run_spinner")
+        self.spinner.start()
+
+    def tearDown(self):
+        self.spinner.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_create_backup_records_metadata(self):
+        zip_path = create_backup(self.target_dir)
+        manifest_path = create_backup(self.target_dir, incremental=True)
+
+        records = {record["file"]: record for record in list_backups(self.temp_dir)}
+        self.assertEqual(set(records), {os.path.basename(zip_path), os.path.basename(manifest_path)})
+        zip_record = records[os.path.basename(zip_path)]
+        self.assertEqual(zip_record["format"], "zip")
+        self.assertEqual(zip_record["version"], "1.4.2")
+        self.assertEqual(zip_record["member_count"], 2)
+        self.assertEqual(zip_record["content_bytes"], 1505)
+        self.assertEqual(zip_record["size"], os.path.getsize(zip_path))
+        self.assertEqual(zip_record["sha256"], file_sha256(zip_path))
+        manifest_record = records[os.path.basename(manifest_path)]
+        self.assertEqual(manifest_record["format"], "incremental")
+        self.assertEqual(manifest_record["member_count"], 2)
+        self.assertIn("v1.4.2", describe_backup(manifest_record))
+
+        delete_backup(zip_path)
+        self.assertEqual([r["file"] for r in list_backups(self.temp_dir)], [os.path.basename(manifest_path)])
+
+    def test_listing_reconciles_with_directory(self):
+        manifest_path = create_backup(self.target_dir, incremental=True)
+        legacy_path = os.path.join(self.temp_dir, "profile2_backup_20240101_000000.zip")
+        with open(legacy_path, "wb") as f:
+            f.write(b"PK")
+        os.remove(manifest_path)
+
+        records = list_backups(self.temp_dir)
+        self.assertEqual([r["file"] for r in records], [os.path.basename(legacy_path)])
+        self.assertEqual(records[0]["source"], "profile2")
+        self.assertIsNone(records[0]["member_count"])
+
+    def test_batch_backup_of_several_registers(self):
+        second_dir = os.path.join(self.temp_dir, "profile2")
+        shutil.copytree(self.target_dir, second_dir)
+        missing_dir = os.path.join(self.temp_dir, "profile3")
+
+        results = create_backups([self.target_dir, second_dir, missing_dir], incremental=True)
+        self.assertIsNone(results[missing_dir])
+        for target_dir in (self.target_dir, second_dir):
+            record = get_backup(results[target_dir])
+            self.assertEqual(record["source"], os.path.basename(target_dir))
+            self.assertTrue(record["verified"]["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,6 +16,7 @@ from colorama import Fore, Style
 
 from backup_restore import create_backup, delete_backup, restore_from_backup
 from utils import show_spinner, is_admin, find_process_by_path, find_all_processes_by_name, manage_processes
+from utils import get_sleep_time, run_spinner, settle_status, spinner
 
 class TestBackupRestoreUtils(unittest.TestCase):
     def setUp(self):
@@ -72,33 +73,39 @@ class TestBackupRestoreUtils(unittest.TestCase):
             self.assertTrue(result.endswith(".zip"))
 
     def test_create_backup_zipfile_error(self):
-        with self.mock_zipfile(fail=True), self.mock_os_walk(), self.mock_tqdm():
+        with patch("backup_restore.write_parallel_zip", side_effect=OSError("Zip write error")), \
+                self.mock_os_walk(), self.mock_tqdm():
             result = create_backup(self.target_dir)
             self.assertIsNone(result)
 
     def test_create_backup_permission_denied(self):
-        with patch("os.walk", side_effect=PermissionError("Permission denied")):
+        with patch("os.scandir", side_effect=PermissionError("Permission denied")):
             result = create_backup(self.target_dir)
             self.assertIsNone(result)
 
     def test_create_backup_invalid_directory(self):
         invalid_dir = os.path.join(self.temp_dir, "nonexistent")
-        with patch("os.walk", side_effect=FileNotFoundError("Directory not found")):
+        with patch("os.scandir", side_effect=FileNotFoundError("Directory not found")):
             with self.mock_zipfile(fail=True), self.mock_tqdm():
                 result = create_backup(invalid_dir)
                 self.assertIsNone(result)
 
     def test_create_backup_disk_full(self):
         with self.mock_zipfile(fail=True), self.mock_os_walk(), self.mock_tqdm():
-            with patch("os.walk", side_effect=OSError("Disk full")):
+            with patch("os.scandir", side_effect=OSError("Disk full")):
                 result = create_backup(self.target_dir)
                 self.assertIsNone(result)
 
     def test_create_backup_many_files(self):
-        many_files = [(self.target_dir, [], [f"file_{i}.txt" for i in range(1000)])]
-        with self.mock_zipfile(), self.mock_os_walk(files=many_files), self.mock_tqdm():
-            result = create_backup(self.target_dir)
-            self.assertIsNotNone(result)
+        for i in range(1000):
+            with open(os.path.join(self.target_dir, f"file_{i}.txt"), "w") as f:
+                f.write(f"content {i}\n" * (i % 50))
+        result = create_backup(self.target_dir)
+        self.assertIsNotNone(result)
+        with zipfile.ZipFile(result) as zip_ref:
+            self.assertIsNone(zip_ref.testzip())
+            self.assertEqual(len(zip_ref.infolist()), 1001)
+            self.assertEqual(zip_ref.read("file_7.txt"), b"content 7\n" * 7)
 
     def test_delete_backup_success(self):
         with patch("os.remove") as mock_remove:
@@ -340,6 +347,33 @@ class TestBackupRestoreUtils(unittest.TestCase):
             mock_stdout.write.assert_called_once()
             mock_stdout.flush.assert_called_once()
 
+    def test_run_spinner_no_delay(self):
+        with patch("utils.NO_DELAY", True), patch("utils.time.sleep") as mock_sleep, \
+                patch("sys.stdout") as mock_stdout:
+            run_spinner("Test", 5.0)
+            mock_sleep.assert_not_called()
+            self.assertIn("Test completed", mock_stdout.write.call_args[0][0])
+
+    def test_run_spinner_does_not_block_and_settles_remaining_time(self):
+        before = get_sleep_time()
+        with patch("utils.NO_DELAY", False), patch("utils._status_deadline", 0.0), patch("sys.stdout"), \
+                patch("utils.time.sleep") as mock_sleep, patch("utils.time.monotonic", side_effect=[100.0, 100.0, 100.3, 100.3]):
+            run_spinner("First", 0.5)
+            run_spinner("Second", 0.2)
+            mock_sleep.assert_not_called()
+            settle_status()
+            settle_status()
+        mock_sleep.assert_called_once()
+        self.assertAlmostEqual(mock_sleep.call_args[0][0], 0.2)
+        self.assertAlmostEqual(get_sleep_time() - before, 0.2)
+
+    def test_spinner_context_reports_failure(self):
+        with patch("sys.stdout") as mock_stdout:
+            with self.assertRaises(ValueError):
+                with spinner("Test"):
+                    raise ValueError("boom")
+            self.assertIn("Test failed", mock_stdout.write.call_args[0][0])
+
     def test_is_admin_true(self):
         with patch("ctypes.windll.shell32.IsUserAnAdmin", return_value=1):
             result = is_admin()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+
+from backup_catalog import list_backups, update_backup
+from backup_retention import apply_retention, plan_retention
+from chunk_store import create_incremental_backup
+
+
+class TestBackupRetention(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.now = datetime(2026, 10, 18, 12, 0, 0)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _backup(self, source, age_hours, size=1000):
+        created = self.now - timedelta(hours=age_hours)
+        name = f"{source}_backup_{created.strftime('%Y%m%d_%H%M%S')}.zip"
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        timestamp = time.mktime(created.timetuple())
+        os.utime(path, (timestamp, timestamp))
+        return name
+
+    def _actions(self, plan):
+        return {record["file"]: record["action"] for record in plan}
+
+    def test_keep_last_and_daily(self):
+        recent = [self._backup("profile1", hours) for hours in (1, 2, 3)]
+        daily = self._backup("profile1", 50)
+        same_day = self._backup("profile1", 52)
+        previous_day = self._backup("profile1", 74)
+        ancient = self._backup("profile1", 24 * 30)
+        other = self._backup("profile2", 24 * 60)
+
+        plan = plan_retention(self.temp_dir, {"keep_last": 2, "keep_daily_days": 7, "max_total_bytes": None},
+                              now=self.now)
+        actions = self._actions(plan)
+        self.assertEqual(actions[recent[0]], "keep")
+        self.assertEqual(actions[recent[1]], "keep")
+        self.assertEqual(actions[recent[2]], "delete")
+        self.assertEqual(actions[daily], "keep")
+        self.assertEqual(actions[same_day], "delete")
+        self.assertEqual(actions[previous_day], "keep")
+        self.assertEqual(actions[ancient], "delete")
+        self.assertEqual(actions[other], "keep")
+
+    def test_size_budget_never_removes_latest(self):
+        names = [self._backup("profile1", hours, size=600) for hours in (1, 2, 3)]
+        plan = plan_retention(self.temp_dir, {"keep_last": 10, "max_total_bytes": 1000}, now=self.now)
+        self.assertEqual([self._actions(plan)[name] for name in names], ["keep", "delete", "delete"])
+
+        plan = plan_retention(self.temp_dir, {"max_total_bytes": 100}, now=self.now)
+        self.assertEqual(self._actions(plan)[names[0]], "keep")
+
+        result = apply_retention(self.temp_dir, plan)
+        self.assertEqual(result, {"deleted": 2, "freed_bytes": 1200})
+        self.assertEqual([record["file"] for record in list_backups(self.temp_dir)], [names[0]])
+
+    def test_failed_verification_is_never_the_latest(self):
+        names = [self._backup("profile1", hours, size=600) for hours in (1, 2, 3)]
+        list_backups(self.temp_dir)
+        update_backup(os.path.join(self.temp_dir, names[0]), verified={"ok": False})
+        update_backup(os.path.join(self.temp_dir, names[1]), verified={"ok": True})
+
+        plan = plan_retention(self.temp_dir, {"keep_last": 10, "max_total_bytes": 1000}, now=self.now)
+        reasons = {record["file"]: (record["action"], record["reason"]) for record in plan}
+        self.assertEqual([reasons[name] for name in names],
+                         [("delete", "failed verification"), ("keep", "latest"), ("delete", "over 1000 B budget")])
+
+    def test_size_budget_counts_shared_chunks_once(self):
+        target_dir = os.path.join(self.temp_dir, "profile1")
+        os.makedirs(target_dir)
+        manifests = []
+        for age_hours, data in ((3, os.urandom(300000)), (2, os.urandom(300000)), (1, None)):
+            if data is not None:
+                with open(os.path.join(target_dir, "agent.db"), "wb") as f:
+                    f.write(data)
+            manifest = create_incremental_backup(target_dir)
+            timestamp = time.mktime((self.now - timedelta(hours=age_hours)).timetuple())
+            os.utime(manifest, (timestamp, timestamp))
+            manifests.append(os.path.basename(manifest))
+
+        plan = plan_retention(self.temp_dir, {"max_total_bytes": 400000}, now=self.now)
+        self.assertEqual([self._actions(plan)[name] for name in manifests], ["delete", "keep", "keep"])
+
+
+if __name__ == "__main__":
+    unittest.main()
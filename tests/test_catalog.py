@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from catalog import CatalogError, get_catalog
+
+
+def make_payload():
+    return {
+        "legacy": {
+            "kasa_manager": [{"name": "manager_1.exe", "url": "http://x/manager_1.exe", "sha256": "aa",
+                              "patch_name": "manager_patch.zip", "patch_url": "http://x/manager_patch.zip"}],
+            "rro_agent": [{"name": "agent_1.exe", "url": "http://x/agent_1.exe"},
+                          {"patch_name": "agent_fix.zip", "patch_url": "http://x/agent_fix.zip",
+                           "patch_sha256": "bb"}],
+            "cloudlike": [{"name": "cloud.exe", "url": "http://x/cloud.exe"}, {"name": "broken"}]
+        },
+        "dev": {
+            "kasa_manager": [],
+            "rro_agent": [],
+            "paylink": [{"name": "paylink_0.9.exe", "url": "http://x/p9.exe"},
+                        {"name": "paylink_1.0.exe", "url": "http://x/p10.exe",
+                         "patch_name": "paylink_patch.zip", "patch_url": "http://x/paylink_patch.zip"}]
+        },
+        "tools": {
+            "paylink": {"terminal_drivers": [{"name": "driver.exe", "url": "http://x/driver.exe"}], "os_tools": []},
+            "rro_agent_tools": {"diagnostics": [], "config_tools": [{"name": "cfg.exe", "url": "http://x/cfg.exe"}]}
+        }
+    }
+
+
+class TestCatalog(unittest.TestCase):
+    def test_records_indexes_and_cache(self):
+        payload = make_payload()
+        catalog = get_catalog(payload)
+        self.assertIs(get_catalog(payload), catalog)
+        self.assertIsNot(get_catalog(make_payload()), catalog)
+
+        self.assertEqual(catalog.problems, ["legacy/cloudlike[1]: name or url missing"])
+        self.assertEqual([installer.name for installer in catalog.installers[("dev", "paylink")]],
+                         ["paylink_0.9.exe", "paylink_1.0.exe"])
+        self.assertEqual(catalog.installer_for_file("paylink_0.9.exe").product, "paylink")
+        self.assertIsNone(catalog.installer_for_file("unknown.exe"))
+
+        self.assertEqual(catalog.find_patch("legacy", "rro_agent").to_dict(),
+                         {"patch_name": "agent_fix.zip", "patch_url": "http://x/agent_fix.zip", "sha256": "bb"})
+        self.assertEqual(catalog.find_patch("legacy", "kasa_manager", "manager_patch.zip").url,
+                         "http://x/manager_patch.zip")
+        self.assertIsNone(catalog.find_patch("legacy", "kasa_manager", "missing.zip"))
+        self.assertEqual(catalog.latest_paylink_patch().name, "paylink_patch.zip")
+        self.assertEqual(sorted(catalog.files()),
+                         sorted(["manager_1.exe", "agent_1.exe", "cloud.exe", "paylink_0.9.exe", "paylink_1.0.exe",
+                                 "manager_patch.zip", "agent_fix.zip", "paylink_patch.zip", "driver.exe", "cfg.exe"]))
+
+    def test_products_outside_schema_are_indexed(self):
+        payload = make_payload()
+        payload["legacy"]["kiosk"] = [{"name": "kiosk.exe", "url": "http://x/kiosk.exe",
+                                       "patch_name": "kiosk_fix.zip", "patch_url": "http://x/kiosk_fix.zip"}]
+        payload["legacy"]["notes"] = "not a section"
+        payload["tools"]["printers"] = {"drivers": [{"name": "printer.exe", "url": "http://x/printer.exe"}]}
+        catalog = get_catalog(payload)
+
+        self.assertEqual(catalog.find_patch("legacy", "kiosk").name, "kiosk_fix.zip")
+        self.assertTrue({"kiosk.exe", "kiosk_fix.zip", "printer.exe"} <= set(catalog.files()))
+        self.assertNotIn("kiosk", catalog.menu_options()["legacy"])
+        self.assertNotIn("printers", catalog.menu_options()["tools"])
+
+    def test_menu_options_match_menu_structure(self):
+        payload = make_payload()
+        options = get_catalog(payload).menu_options()
+        self.assertEqual(list(options), ["legacy", "dev", "cloudlike", "patching", "tools"])
+        self.assertIs(options["legacy"]["rro_agent"][0], payload["legacy"]["rro_agent"][0])
+        self.assertEqual(options["cloudlike"]["cloudlike"], [payload["legacy"]["cloudlike"][0]])
+        self.assertEqual([patch["patch_name"] for patch in options["patching"]["legacy"]["rro_agent"]],
+                         ["agent_fix.zip"])
+        self.assertEqual(options["patching"]["dev"]["paylink"][0]["sha256"], "")
+        self.assertEqual(options["tools"]["rro_agent_tools"]["config_tools"][0]["name"], "cfg.exe")
+
+    def test_missing_section_raises(self):
+        payload = make_payload()
+        del payload["tools"]["paylink"]
+        with self.assertRaises(CatalogError):
+            get_catalog(payload)
+        payload = make_payload()
+        payload["dev"]["paylink"] = {}
+        with self.assertRaises(CatalogError):
+            get_catalog(payload)
+
+
+if __name__ == "__main__":
+    unittest.main()
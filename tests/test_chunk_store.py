@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from chunk_store import (STORE_DIR_NAME, _writing_store, collect_garbage, create_incremental_backup,
+                         load_manifest, restore_incremental_backup)
+
+
+class TestChunkStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.target_dir = os.path.join(self.temp_dir, "profile1")
+        os.makedirs(os.path.join(self.target_dir, "com-server", "empty"))
+        self._write("agent.db", os.urandom(300000))
+        self._write("com-server/lib.bin", os.urandom(100000))
+        self._write("version", b"1.2.3")
+        self.store_dir = os.path.join(self.temp_dir, STORE_DIR_NAME)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, rel_path, data):
+        with open(os.path.join(self.target_dir, *rel_path.split("/")), "wb") as f:
+            f.write(data)
+
+    def _store_size(self):
+        return sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, names in os.walk(self.store_dir) for name in names)
+
+    @patch("chunk_store.CHUNK_SIZE", 64 * 1024)
+    def test_second_backup_stores_only_changed_bytes(self):
+        first = create_incremental_backup(self.target_dir)
+        size_after_first = self._store_size()
+        self._write("version", b"1.2.4")
+        second = create_incremental_backup(self.target_dir)
+
+        self.assertNotEqual(first, second)
+        self.assertLess(self._store_size() - size_after_first, 1024)
+        entries = {e["path"]: e for e in load_manifest(second)["files"]}
+        self.assertEqual(entries["agent.db"], {e["path"]: e for e in load_manifest(first)["files"]}["agent.db"])
+
+    def test_restore_reproduces_tree(self):
+        manifest = create_incremental_backup(self.target_dir)
+        restore_dir = os.path.join(self.temp_dir, "restored")
+
+        self.assertEqual(restore_incremental_backup(manifest, restore_dir), 3)
+        for rel_path in ("agent.db", "com-server/lib.bin", "version"):
+            with open(os.path.join(self.target_dir, *rel_path.split("/")), "rb") as original, \
+                    open(os.path.join(restore_dir, *rel_path.split("/")), "rb") as restored:
+                self.assertEqual(original.read(), restored.read())
+        self.assertTrue(os.path.isdir(os.path.join(restore_dir, "com-server", "empty")))
+
+    def test_garbage_collection_keeps_referenced_chunks(self):
+        first = create_incremental_backup(self.target_dir)
+        self._write("agent.db", os.urandom(300000))
+        second = create_incremental_backup(self.target_dir)
+
+        os.remove(first)
+        self.assertGreater(collect_garbage(self.temp_dir), 0)
+        restore_dir = os.path.join(self.temp_dir, "restored")
+        self.assertEqual(restore_incremental_backup(second, restore_dir), 3)
+
+        os.remove(second)
+        collect_garbage(self.temp_dir)
+        self.assertEqual(self._store_size(), 0)
+
+    def test_garbage_collection_spares_backups_in_progress(self):
+        create_incremental_backup(self.target_dir)
+        bucket_dir = os.path.join(self.store_dir, "ab")
+        os.makedirs(bucket_dir, exist_ok=True)
+        old = time.time() - 3600
+        for name in ("ab" + "0" * 62, "ab" + "1" * 62 + ".1234.tmp", "ab" + "2" * 62):
+            with open(os.path.join(bucket_dir, name), "wb") as f:
+                f.write(b"chunk")
+            os.utime(os.path.join(bucket_dir, name), (old, old))
+        fresh = os.path.join(bucket_dir, "ab" + "2" * 62)
+        os.utime(fresh, (time.time() + 60, time.time() + 60))
+
+        with _writing_store(self.store_dir):
+            collector = threading.Thread(target=collect_garbage, args=(self.temp_dir,))
+            collector.start()
+            collector.join(0.2)
+            self.assertTrue(collector.is_alive())
+        collector.join(5)
+        self.assertFalse(collector.is_alive())
+
+        self.assertEqual(sorted(os.listdir(bucket_dir)), ["ab" + "1" * 62 + ".1234.tmp", "ab" + "2" * 62])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -25,13 +25,22 @@ class TestCleanup(unittest.TestCase):
             f.write("dummy patch content")
         self.data = {
             "legacy": {
-                "item1": {"name": self.sample_file, "patch_name": self.sample_patch}
+                "kasa_manager": [{"name": self.sample_file, "url": "http://x/test.exe",
+                                  "patch_name": self.sample_patch, "patch_url": "http://x/patch.exe"}],
+                "rro_agent": [],
+                "cloudlike": []
             },
             "dev": {
-                "item2": {"name": os.path.join(self.temp_dir, "dev.exe"), "patch_name": os.path.join(self.temp_dir, "dev_patch.exe")}
+                "kasa_manager": [],
+                "rro_agent": [{"name": os.path.join(self.temp_dir, "dev.exe"), "url": "http://x/dev.exe",
+                               "patch_name": os.path.join(self.temp_dir, "dev_patch.exe"),
+                               "patch_url": "http://x/dev_patch.exe"}],
+                "paylink": []
             },
             "tools": {
-                "item3": {"name": os.path.join(self.temp_dir, "tool.exe"), "patch_name": ""}
+                "paylink": {"terminal_drivers": [], "os_tools": []},
+                "rro_agent_tools": {"diagnostics": [], "config_tools": [
+                    {"name": os.path.join(self.temp_dir, "tool.exe"), "url": "http://x/tool.exe"}]}
             }
         }
 
@@ -46,11 +55,14 @@ class TestCleanup(unittest.TestCase):
     def test_cleanup_file_permission_error(self):
         with self.mock_sys_exit() as mock_exit, \
              patch("os.path.exists", side_effect=lambda x: x in [self.sample_file, self.sample_patch]), \
-             patch("os.remove", side_effect=PermissionError("Permission denied")), \
-             patch("utils.find_all_processes_by_name", return_value=[]), \
+             patch("os.remove", side_effect=PermissionError("Permission denied")) as mock_remove, \
+             patch("cleanup.find_all_processes_by_name", return_value=[]), \
+             patch.object(sys, "frozen", True, create=True), \
              patch("subprocess.Popen") as mock_popen, \
              patch("builtins.open", mock_open()) as mock_file:
             cleanup(self.data)
+            self.assertEqual(sorted(call.args[0] for call in mock_remove.call_args_list),
+                             sorted([self.sample_file, self.sample_patch]))
             self.assertTrue(mock_popen.called)
             mock_file.assert_called_once()
             mock_exit.assert_called_with(0)
@@ -59,7 +71,8 @@ class TestCleanup(unittest.TestCase):
         with self.mock_sys_exit() as mock_exit, \
              patch("os.path.exists", return_value=False), \
              patch("os.remove") as mock_remove, \
-             patch("utils.find_all_processes_by_name", return_value=[]), \
+             patch("cleanup.find_all_processes_by_name", return_value=[]), \
+             patch.object(sys, "frozen", True, create=True), \
              patch("subprocess.Popen") as mock_popen, \
              patch("builtins.open", mock_open()) as mock_file:
             cleanup(self.data)
@@ -72,7 +85,8 @@ class TestCleanup(unittest.TestCase):
         with self.mock_sys_exit() as mock_exit, \
              patch("os.path.exists", return_value=True), \
              patch("os.remove") as mock_remove, \
-             patch("utils.find_all_processes_by_name", return_value=[]), \
+             patch("cleanup.find_all_processes_by_name", return_value=[]), \
+             patch.object(sys, "frozen", True, create=True), \
              patch("subprocess.Popen") as mock_popen, \
              patch("builtins.open", mock_open()) as mock_file:
             cleanup({})
@@ -90,7 +104,8 @@ class TestCleanup(unittest.TestCase):
         with self.mock_sys_exit() as mock_exit, \
              patch("os.path.exists", return_value=True), \
              patch("os.remove") as mock_remove, \
-             patch("utils.find_all_processes_by_name", return_value=[]), \
+             patch("cleanup.find_all_processes_by_name", return_value=[]), \
+             patch.object(sys, "frozen", True, create=True), \
              patch("subprocess.Popen") as mock_popen, \
              patch("builtins.open", mock_open()) as mock_file:
             cleanup(invalid_data)
@@ -99,5 +114,44 @@ class TestCleanup(unittest.TestCase):
             mock_file.assert_called_once()
             mock_exit.assert_called_with(0)
 
+    def test_cleanup_removes_files_of_products_unknown_to_catalog(self):
+        def path(name):
+            return os.path.join(self.temp_dir, name)
+
+        data = {
+            "legacy": {
+                "kasa_manager": [{"name": path("manager.exe"), "url": "http://x/manager.exe",
+                                  "patch_name": path("manager_patch.zip"), "patch_url": "http://x/m.zip"}],
+                "rro_agent": [],
+                "cloudlike": [],
+                "kiosk": [{"name": path("kiosk.exe"), "url": "http://x/kiosk.exe"}]
+            },
+            "dev": {"kasa_manager": [], "rro_agent": [], "paylink": []},
+            "tools": {
+                "paylink": {"terminal_drivers": [], "os_tools": []},
+                "rro_agent_tools": {"diagnostics": [], "config_tools": []},
+                "printers": {"drivers": [{"name": path("printer.exe"), "url": "http://x/printer.exe"}]}
+            }
+        }
+        with self.mock_sys_exit() as mock_exit, \
+             patch("os.path.exists", return_value=True), \
+             patch("os.remove") as mock_remove, \
+             patch("cleanup.find_all_processes_by_name", return_value=[]), \
+             patch("cleanup.schedule_self_delete"):
+            cleanup(data)
+            removed = [call.args[0] for call in mock_remove.call_args_list]
+            self.assertEqual(sorted(removed), sorted(path(name) for name in
+                                                     ("manager.exe", "manager_patch.zip", "kiosk.exe", "printer.exe")))
+            mock_exit.assert_called_with(0)
+
+    def test_cleanup_from_source_does_not_delete_itself(self):
+        with self.mock_sys_exit() as mock_exit, \
+             patch("os.path.exists", return_value=False), \
+             patch("cleanup.find_all_processes_by_name", return_value=[]), \
+             patch("cleanup.schedule_self_delete") as mock_delete:
+            cleanup(self.data)
+            mock_delete.assert_not_called()
+            mock_exit.assert_called_with(0)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+import zipfile
+from contextlib import redirect_stderr, redirect_stdout
+from unittest.mock import MagicMock, patch
+
+import backup_retention
+import utils
+from backup_catalog import list_backups
+from catalog import Patch
+from cli import EXIT_FAILED, EXIT_NOT_FOUND, EXIT_OK, EXIT_USAGE, main
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.target_dir = os.path.join(self.temp_dir, "profile1")
+        os.makedirs(self.target_dir)
+        with open(os.path.join(self.target_dir, "version"), "w", encoding="utf-8") as f:
+            f.write("1.4.2")
+
+    def tearDown(self):
+        utils.set_no_delay(False)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run(self, *argv):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            code = main(list(argv))
+        return code, stdout.getvalue()
+
+    def test_backup_and_restore_by_path(self):
+        code, output = self._run("backup", "--json", "--full", "--targets", self.target_dir)
+        self.assertEqual(code, EXIT_OK)
+        backup_path = json.loads(output)["backups"][os.path.normpath(self.target_dir)]
+        self.assertTrue(os.path.isfile(backup_path))
+
+        with open(os.path.join(self.target_dir, "version"), "w", encoding="utf-8") as f:
+            f.write("9.9.9")
+        with patch("backup_restore.manage_process_lifecycle", return_value=True) as mock_lifecycle, \
+                patch("backup_restore.launch_executable", return_value=False):
+            code, output = self._run("restore", "--json", "--targets", self.target_dir)
+        self.assertEqual(code, EXIT_OK)
+        self.assertTrue(json.loads(output)["ok"])
+        self.assertFalse(mock_lifecycle.call_args.kwargs["prompt"])
+        with open(os.path.join(self.target_dir, "version"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "1.4.2")
+
+    def test_backup_waits_for_retention_before_exit(self):
+        for index in range(3):
+            with open(os.path.join(self.temp_dir, f"profile1_backup_2026010{index + 1}_120000.zip"), "wb") as f:
+                f.write(b"PK")
+            os.utime(f.name, (time.time() - 86400 * (index + 1),) * 2)
+
+        plan_retention = backup_retention.plan_retention
+
+        def slow_plan(*args, **kwargs):
+            time.sleep(0.3)
+            return plan_retention(*args, **kwargs)
+
+        with patch("backup_retention.BACKUP_RETENTION", {"keep_last": 2}), \
+                patch("backup_retention.plan_retention", side_effect=slow_plan):
+            code, _ = self._run("backup", "--full", "--targets", self.target_dir)
+        self.assertEqual(code, EXIT_OK)
+        self.assertEqual(len(list_backups(self.temp_dir)), 2)
+
+    def test_exit_codes(self):
+        code, _ = self._run("backup")
+        self.assertEqual(code, EXIT_USAGE)
+        with patch("cli.discover_cash_registers",
+                   return_value={"manager_dir": None, "profiles_empty": False, "registers": []}):
+            code, output = self._run("discover", "--json")
+        self.assertEqual(code, EXIT_NOT_FOUND)
+        self.assertEqual(json.loads(output)["registers"], [])
+
+    def _write_database(self):
+        conn = sqlite3.connect(os.path.join(self.target_dir, "agent.db"))
+        conn.execute("CREATE TABLE cash_register (fiscal_number TEXT)")
+        conn.execute("CREATE TABLE transactions (status TEXT)")
+        conn.execute("CREATE TABLE shifts (id INTEGER PRIMARY KEY, status TEXT)")
+        conn.commit()
+        conn.close()
+
+    def test_patch_refuses_explicit_register_with_corrupted_database(self):
+        catalog = MagicMock()
+        catalog.find_patch.return_value = Patch("1.4.3.zip", "http://localhost/1.4.3.zip", "")
+        with patch("cli.fetch_json", return_value={"legacy": {}}), \
+                patch("cli.get_catalog", return_value=catalog), \
+                patch("cli.patch_file", return_value=True) as mock_patch:
+            code, output = self._run("patch", "--json", "--product", "rro_agent", "--targets", self.target_dir)
+            self.assertEqual(code, EXIT_FAILED)
+            self.assertIn("database corrupted in profile1", json.loads(output)["error"])
+            mock_patch.assert_not_called()
+
+            code, _ = self._run("patch", "--product", "rro_agent", "--targets", self.target_dir, "--force")
+            self.assertEqual(code, EXIT_OK)
+            self.assertEqual(mock_patch.call_args.kwargs["targets"], [os.path.normpath(self.target_dir)])
+
+    def test_patch_runs_headless_with_stdin_closed(self):
+        self._write_database()
+        os.makedirs(os.path.join(self.temp_dir, "checkbox.kasa.manager"))
+        patch_path = os.path.join(self.temp_dir, "1.4.3.zip")
+        with zipfile.ZipFile(patch_path, "w") as zip_ref:
+            zip_ref.writestr("version", "1.4.3")
+        catalog = MagicMock()
+        catalog.find_patch.return_value = Patch(patch_path, "http://localhost/1.4.3.zip", "")
+        # Каса запущена з цільової директорії під час розпакування
+        process = MagicMock()
+        violations = [[{"pid": 4242, "name": "checkbox_kasa.exe", "target_dir": self.target_dir,
+                        "process": process}]]
+
+        with patch("cli.fetch_json", return_value={"legacy": {}}), \
+                patch("cli.get_catalog", return_value=catalog), \
+                patch("patching.DRIVES", [self.temp_dir]), \
+                patch("patching.download_file", return_value=True), \
+                patch("patching.find_process_by_path", return_value=None), \
+                patch("patching.find_all_processes_by_name", return_value=[]), \
+                patch("patching.ProcessWatcher.drain", side_effect=lambda: violations.pop() if violations else []), \
+                patch("patching.record_patch_run"), \
+                patch("sys.stdin", io.StringIO()):
+            code, output = self._run("patch", "--json", "--product", "rro_agent", "--targets", self.target_dir)
+
+        self.assertEqual(code, EXIT_OK)
+        self.assertTrue(json.loads(output)["ok"])
+        process.terminate.assert_called_once()
+        with open(os.path.join(self.target_dir, "version"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "1.4.3")
+
+
+if __name__ == "__main__":
+    unittest.main()
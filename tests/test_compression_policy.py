@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from backup_writer import write_parallel_zip
+from compression_policy import choose_compression, classify_file
+
+
+class TestCompressionPolicy(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.files = {
+            "checkbox_kasa.exe": os.urandom(50000),
+            "bundle.jar": os.urandom(50000),
+            "agent.db": b"\x00" * 50000,
+            "logs/kasa.log": b"INFO shift opened\n" * 3000,
+            "noext_random": os.urandom(50000),
+            "noext_text": b"receipt " * 6000,
+        }
+        for name, data in self.files.items():
+            path = os.path.join(self.temp_dir, *name.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _path(self, name):
+        return os.path.join(self.temp_dir, *name.split("/"))
+
+    def test_classify_file(self):
+        self.assertEqual(classify_file("lib/App.DLL"), "binary")
+        self.assertEqual(classify_file("update.zip"), "compressed")
+        self.assertEqual(classify_file("config.json"), "text")
+        self.assertEqual(classify_file("README"), "unknown")
+
+    def test_fast_profile_stores_binaries_and_compressed_types(self):
+        self.assertEqual(choose_compression(self._path("checkbox_kasa.exe"), "fast"), (zipfile.ZIP_STORED, 0))
+        self.assertEqual(choose_compression(self._path("bundle.jar"), "default"), (zipfile.ZIP_STORED, 0))
+        self.assertEqual(choose_compression(self._path("agent.db"), "fast"), (zipfile.ZIP_DEFLATED, 1))
+
+    def test_unknown_files_are_sampled(self):
+        self.assertEqual(choose_compression(self._path("noext_random")), (zipfile.ZIP_STORED, 0))
+        self.assertEqual(choose_compression(self._path("noext_text"))[0], zipfile.ZIP_DEFLATED)
+
+    def test_archive_with_mixed_methods_is_readable(self):
+        zip_path = os.path.join(self.temp_dir, "backup.zip")
+        for profile in ("fast", "default", "max"):
+            write_parallel_zip(zip_path, [(self._path(name), name) for name in self.files], profile)
+            with zipfile.ZipFile(zip_path) as zip_ref:
+                self.assertIsNone(zip_ref.testzip())
+                for name, data in self.files.items():
+                    self.assertEqual(zip_ref.read(name), data)
+                methods = {info.filename: info.compress_type for info in zip_ref.infolist()}
+            self.assertEqual(methods["bundle.jar"], zipfile.ZIP_STORED)
+            if profile == "max":
+                self.assertEqual(methods["logs/kasa.log"], zipfile.ZIP_BZIP2)
+
+
+if __name__ == "__main__":
+    unittest.main()
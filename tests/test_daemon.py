@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import daemon
+from daemon import RegisterCache, fetch_registers, start_server
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.kasa = os.path.join(self.temp_dir, "kasa1")
+        os.makedirs(self.kasa)
+        with open(os.path.join(self.kasa, "version"), "w", encoding="utf-8") as f:
+            f.write("1.4.2")
+        self.db_path = os.path.join(self.kasa, "agent.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE cash_register (fiscal_number TEXT)")
+        conn.execute("INSERT INTO cash_register VALUES ('4000000001')")
+        conn.execute("CREATE TABLE transactions (id INTEGER PRIMARY KEY, status TEXT)")
+        conn.executemany("INSERT INTO transactions (status) VALUES (?)", [("DONE",), ("DONE",), ("PENDING",)])
+        conn.execute("CREATE TABLE shifts (id INTEGER PRIMARY KEY, status TEXT)")
+        conn.execute("INSERT INTO shifts (status) VALUES ('opened')")
+        conn.commit()
+        conn.close()
+
+        self.discovery = patch("daemon.find_register_paths",
+                               return_value=(None, False, [(os.path.normpath(self.kasa), True)]))
+        self.mock_discovery = self.discovery.start()
+        self.cache = RegisterCache([self.temp_dir], refresh_interval=60, rediscover_interval=60)
+
+    def tearDown(self):
+        self.discovery.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_refresh_reinspects_only_changed_registers(self):
+        with patch("daemon.get_cash_register_info", wraps=daemon.get_cash_register_info) as mock_info:
+            first = self.cache.refresh()
+            second = self.cache.refresh()
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("UPDATE transactions SET status = 'DONE'")
+            conn.execute("INSERT INTO transactions (status) VALUES ('ERROR')")
+            conn.commit()
+            conn.close()
+            third = self.cache.refresh()
+
+        self.assertEqual((first["inspected"], second["inspected"], second["reused"]), (1, 0, 1))
+        self.assertEqual(third["inspected"], 1)
+        self.assertEqual(mock_info.call_count, 2)
+        self.assertEqual(self.mock_discovery.call_count, 1)
+
+        register = json.loads(self.cache.body("/registers"))["registers"][0]
+        self.assertEqual(register["trans_status"], "ERROR")
+        self.assertEqual(register["transactions"], {"total": 4, "by_status": {"DONE": 3, "ERROR": 1}})
+        self.assertFalse(register["healthy"])
+        self.assertEqual(json.loads(self.cache.body("/shifts")),
+                         [{"name": "[Ext] kasa1", "path": os.path.normpath(self.kasa),
+                           "fiscal_number": "4000000001", "shift_status": "OPENED"}])
+
+    def test_http_api_and_client(self):
+        server = start_server(self.cache, "127.0.0.1", 0)
+        port = server.server_address[1]
+        base = f"http://127.0.0.1:{port}"
+        try:
+            with self.assertRaises(HTTPError) as warming:
+                urlopen(f"{base}/registers", timeout=5)
+            self.assertEqual(warming.exception.code, 503)
+
+            found = fetch_registers(fresh=True, port=port)
+            self.assertEqual(found["registers"][0]["fiscal_number"], "4000000001")
+            self.assertEqual(found["registers"][0]["transactions"]["total"], 3)
+            with patch.dict(os.environ, {"http_proxy": "http://127.0.0.1:9", "HTTP_PROXY": "http://127.0.0.1:9",
+                                         "no_proxy": "", "NO_PROXY": ""}), \
+                    patch("urllib.request._opener", None):
+                self.assertIsNotNone(fetch_registers(port=port))
+
+            with urlopen(f"{base}/registers/%5BExt%5D%20kasa1", timeout=5) as response:
+                self.assertEqual(json.loads(response.read())["version"], "1.4.2")
+            with urlopen(Request(f"{base}/refresh?rediscover=1", method="POST"), timeout=5) as response:
+                status = json.loads(response.read())
+            self.assertEqual((status["generation"], status["registers"], status["reused"]), (2, 1, 1))
+            self.assertEqual(self.mock_discovery.call_count, 2)
+            with self.assertRaises(HTTPError) as missing:
+                urlopen(f"{base}/registers/4000000002", timeout=5)
+            self.assertEqual(missing.exception.code, 404)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            free_port = sock.getsockname()[1]
+        self.assertIsNone(fetch_registers(port=free_port, timeout=0.5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import zipfile
+
+from backup_restore import create_backup
+from chunk_store import restore_incremental_backup
+from db_snapshot import is_sqlite_database, snapshot_database
+
+
+class TestDbSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.target_dir = os.path.join(self.temp_dir, "profile1")
+        os.makedirs(self.target_dir)
+        self.db_path = os.path.join(self.target_dir, "agent.db")
+        # Відкрите з'єднання в режимі WAL імітує працюючу касу: дані лежать у agent.db-wal
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA wal_autocheckpoint=0")
+        self.connection.execute("CREATE TABLE receipts (id INTEGER PRIMARY KEY, total TEXT)")
+        self.connection.executemany("INSERT INTO receipts (total) VALUES (?)", [(str(i),) for i in range(500)])
+        self.connection.commit()
+        with open(os.path.join(self.target_dir, "version"), "w") as f:
+            f.write("1.0.0")
+
+    def tearDown(self):
+        self.connection.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _count_rows(self, db_path):
+        with sqlite3.connect(db_path) as connection:
+            return connection.execute("SELECT COUNT(*) FROM receipts").fetchone()[0]
+
+    def test_snapshot_includes_uncheckpointed_wal(self):
+        self.assertTrue(os.path.exists(self.db_path + "-wal"))
+        snapshot_path = os.path.join(self.temp_dir, "snapshot.db")
+        snapshot_database(self.db_path, snapshot_path, pages=1)
+        self.assertEqual(self._count_rows(snapshot_path), 500)
+        self.assertTrue(is_sqlite_database(self.db_path))
+        self.assertFalse(is_sqlite_database(os.path.join(self.target_dir, "version")))
+
+    def test_zip_backup_of_running_register(self):
+        backup_path = create_backup(self.target_dir)
+        self.assertIsNotNone(backup_path)
+        with zipfile.ZipFile(backup_path) as zip_ref:
+            names = set(zip_ref.namelist())
+            self.assertEqual(names, {"agent.db", "version"})
+            zip_ref.extract("agent.db", os.path.join(self.temp_dir, "extracted"))
+        self.assertEqual(self._count_rows(os.path.join(self.temp_dir, "extracted", "agent.db")), 500)
+
+    def test_incremental_backup_of_running_register(self):
+        manifest_path = create_backup(self.target_dir, incremental=True)
+        self.assertIsNotNone(manifest_path)
+        restore_dir = os.path.join(self.temp_dir, "restored")
+        restore_incremental_backup(manifest_path, restore_dir)
+        self.assertEqual(sorted(os.listdir(restore_dir)), ["agent.db", "version"])
+        self.assertEqual(self._count_rows(os.path.join(restore_dir, "agent.db")), 500)
+
+    def test_backup_of_stopped_register_with_leftover_side_files(self):
+        # Каса завершилася аварійно: -wal і -shm лишилися на диску, а SQLite видалить їх
+        # під час закриття з'єднання онлайн-копії
+        side_files = {}
+        for suffix in ("-wal", "-shm"):
+            with open(self.db_path + suffix, "rb") as f:
+                side_files[suffix] = f.read()
+        self.connection.close()
+        self.connection = sqlite3.connect(":memory:")
+
+        for incremental in (False, True):
+            for suffix, data in side_files.items():
+                with open(self.db_path + suffix, "wb") as f:
+                    f.write(data)
+            backup_path = create_backup(self.target_dir, incremental=incremental)
+            self.assertIsNotNone(backup_path)
+            restore_dir = os.path.join(self.temp_dir, f"restored_{incremental}")
+            if incremental:
+                restore_incremental_backup(backup_path, restore_dir)
+            else:
+                with zipfile.ZipFile(backup_path) as zip_ref:
+                    zip_ref.extractall(restore_dir)
+            self.assertEqual(sorted(os.listdir(restore_dir)), ["agent.db", "version"])
+            self.assertEqual(self._count_rows(os.path.join(restore_dir, "agent.db")), 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+
+from backup_writer import write_parallel_zip
+from chunk_store import STORE_DIR_NAME, create_incremental_backup
+from diff_restore import OLD_SUFFIX, differential_restore
+
+
+class TestDiffRestore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.target_dir = os.path.join(self.temp_dir, "profile1")
+        self.files = {
+            "checkbox_kasa.exe": os.urandom(20000),
+            "version": b"1.0.0",
+            "com-server/lib.bin": os.urandom(5000),
+        }
+        for name, data in self.files.items():
+            self._write(name, data)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _path(self, name):
+        return os.path.join(self.target_dir, *name.split("/"))
+
+    def _write(self, name, data):
+        os.makedirs(os.path.dirname(self._path(name)), exist_ok=True)
+        with open(self._path(name), "wb") as f:
+            f.write(data)
+
+    def _read(self, name):
+        with open(self._path(name), "rb") as f:
+            return f.read()
+
+    def _damage_tree(self):
+        self._write("version", b"2.0.0")
+        self._write("extra.log", b"not in backup")
+        os.remove(self._path("com-server/lib.bin"))
+
+    def _assert_restored(self, summary):
+        self.assertEqual(summary, {"unchanged": 1, "changed": 2, "removed": 1})
+        for name, data in self.files.items():
+            self.assertEqual(self._read(name), data)
+        self.assertFalse(os.path.exists(self._path("extra.log")))
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), sorted(self.expected_entries))
+
+    def test_zip_restore_rewrites_only_changed_files(self):
+        backup_path = os.path.join(self.temp_dir, "profile1_backup.zip")
+        write_parallel_zip(backup_path, [(self._path(name), name) for name in self.files])
+        self.expected_entries = ["profile1", "profile1_backup.zip"]
+        self._damage_tree()
+        self._assert_restored(differential_restore(self.target_dir, backup_path))
+
+    def test_manifest_restore_rewrites_only_changed_files(self):
+        manifest_path = create_incremental_backup(self.target_dir)
+        self.expected_entries = ["profile1", os.path.basename(manifest_path), STORE_DIR_NAME]
+        self._damage_tree()
+        self._assert_restored(differential_restore(self.target_dir, manifest_path))
+
+    def test_failure_leaves_tree_untouched(self):
+        manifest_path = create_incremental_backup(self.target_dir)
+        self._damage_tree()
+        shutil.rmtree(os.path.join(self.temp_dir, STORE_DIR_NAME))
+        with self.assertRaises(OSError):
+            differential_restore(self.target_dir, manifest_path)
+        self.assertEqual(self._read("version"), b"2.0.0")
+        self.assertTrue(os.path.exists(self._path("extra.log")))
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), sorted(["profile1", os.path.basename(manifest_path)]))
+
+    def test_interrupted_swap_restores_old_tree(self):
+        manifest_path = create_incremental_backup(self.target_dir)
+        self._damage_tree()
+        os.rename(self.target_dir, self.target_dir + OLD_SUFFIX)
+        shutil.rmtree(os.path.join(self.temp_dir, STORE_DIR_NAME))
+        with self.assertRaises(OSError):
+            differential_restore(self.target_dir, manifest_path)
+        self.assertEqual(self._read("version"), b"2.0.0")
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), sorted(["profile1", os.path.basename(manifest_path)]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from backup_catalog import get_backup, list_backups
+from backup_restore import create_backup, create_backups, restore_from_backup
+from chunk_store import create_incremental_backup, get_store_dir, load_manifest
+from integrity import verify_backups, verify_extracted_files, verify_manifest, verify_zip_archive
+from patching import patch_file
+
+
+class TestBackupVerification(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.target_dir = os.path.join(self.temp_dir, "profile1")
+        os.makedirs(os.path.join(self.target_dir, "com-server"))
+        for name, data in (("version", b"1.4.2"), ("com-server/app.js", b"console.log(1);" * 100),
+                           ("agent.bin", os.urandom(200000))):
+            with open(os.path.join(self.target_dir, *name.split("/")), "wb") as f:
+                f.write(data)
+        self.spinner = patch("backup_restore.run_spinner")
+        self.spinner.start()
+
+    def tearDown(self):
+        self.spinner.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _corrupted_zip(self):
+        zip_path_stored = os.path.join(self.temp_dir, "profile2_backup_20240101_000000.zip")
+        with zipfile.ZipFile(zip_path_stored, "w", zipfile.ZIP_STORED) as zip_ref:
+            zip_ref.writestr("version", b"1.4.2")
+            zip_ref.writestr("data.txt", b"A" * 5000)
+        with open(zip_path_stored, "r+b") as f:
+            content = f.read()
+            f.seek(content.index(b"A" * 5000) + 100)
+            f.write(b"B")
+        return zip_path_stored
+
+    def test_zip_archive_verification(self):
+        good = create_backup(self.target_dir, verify=False)
+        bad = self._corrupted_zip()
+
+        self.assertEqual(verify_zip_archive(good), [])
+        problems = verify_zip_archive(bad)
+        self.assertEqual([problem["file"] for problem in problems], ["data.txt"])
+        results = verify_backups([good, bad])
+        self.assertEqual(results[good], [])
+        self.assertEqual(len(results[bad]), 1)
+
+    def test_manifest_verification_detects_damaged_chunk(self):
+        manifest_path = create_incremental_backup(self.target_dir)
+        self.assertEqual(verify_manifest(manifest_path), [])
+
+        entry = next(e for e in load_manifest(manifest_path)["files"] if e["path"] == "agent.bin")
+        digest = entry["chunks"][0]
+        os.remove(os.path.join(get_store_dir(self.target_dir), digest[:2], digest))
+        problems = verify_manifest(manifest_path)
+        self.assertEqual(problems, [{"file": "agent.bin", "reason": "missing chunk"}])
+
+    def test_backup_failing_verification_is_removed(self):
+        with patch("backup_restore.check_backups", side_effect=lambda paths: {path: False for path in paths}), \
+                patch("backup_restore.start_retention") as mock_retention:
+            self.assertIsNone(create_backup(self.target_dir))
+            manifest_results = create_backups([self.target_dir], incremental=True)
+        self.assertEqual(manifest_results, {self.target_dir: None})
+        self.assertEqual([name for name in os.listdir(self.temp_dir) if "_backup_" in name], [])
+        self.assertEqual(list_backups(self.temp_dir), [])
+        mock_retention.assert_not_called()
+
+    @patch("backup_restore.manage_process_lifecycle")
+    def test_create_records_result_and_restore_refuses_corrupt_backup(self, mock_lifecycle):
+        zip_path = create_backup(self.target_dir)
+        self.assertTrue(get_backup(zip_path)["verified"]["ok"])
+
+        with open(zip_path, "r+b") as f:
+            f.seek(40)
+            f.write(b"\x00" * 16)
+        self.assertFalse(restore_from_backup(self.target_dir, zip_path))
+        self.assertFalse(get_backup(zip_path)["verified"]["ok"])
+        mock_lifecycle.assert_not_called()
+
+
+class TestExtractedFilesVerification(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.patch_path = os.path.join(self.temp_dir, "1.4.3.zip")
+        with zipfile.ZipFile(self.patch_path, "w") as zip_ref:
+            zip_ref.writestr("version", b"1.4.3")
+            zip_ref.writestr("com-server/", b"")
+            zip_ref.writestr("com-server/app.js", b"console.log(2);" * 100)
+            zip_ref.writestr(".need_reboot", b"")
+        with zipfile.ZipFile(self.patch_path) as zip_ref:
+            self.members = zip_ref.infolist()
+        self.manager_dir = os.path.join(self.temp_dir, "checkbox.kasa.manager")
+        self.target_dirs = [os.path.join(self.manager_dir, "profiles", name) for name in ("kasa1", "kasa2")]
+        for target_dir in self.target_dirs:
+            os.makedirs(target_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _extract(self, target_dir):
+        with zipfile.ZipFile(self.patch_path) as zip_ref:
+            zip_ref.extractall(target_dir)
+        os.remove(os.path.join(target_dir, ".need_reboot"))
+
+    def test_matching_missing_and_damaged_files(self):
+        for target_dir in self.target_dirs:
+            self._extract(target_dir)
+        results = verify_extracted_files(self.members, self.target_dirs, skip_names={".need_reboot"})
+        self.assertEqual(results, {target_dir: [] for target_dir in self.target_dirs})
+
+        kasa1, kasa2 = self.target_dirs
+        os.remove(os.path.join(kasa1, "version"))
+        with open(os.path.join(kasa2, "version"), "wb") as f:
+            f.write(b"1.4.30")
+        with open(os.path.join(kasa2, "com-server", "app.js"), "r+b") as f:
+            f.write(b"C")
+        results = verify_extracted_files(self.members, self.target_dirs, skip_names={".need_reboot"})
+        self.assertEqual(results[kasa1], [{"file": "version", "reason": "missing"}])
+        self.assertEqual(sorted((problem["file"], problem["reason"]) for problem in results[kasa2]),
+                         [("com-server/app.js", "crc"), ("version", "size")])
+
+        results = verify_extracted_files(self.members, [kasa1])
+        self.assertIn({"file": ".need_reboot", "reason": "missing"}, results[kasa1])
+
+    def _patch(self, damage=None):
+        def verify(members, target_dirs, **kwargs):
+            if damage:
+                with open(os.path.join(damage, "com-server", "app.js"), "ab") as f:
+                    f.write(b"//")
+            return verify_extracted_files(members, target_dirs, **kwargs)
+
+        patch_data = {"patch_name": self.patch_path, "patch_url": "http://localhost/1.4.3.zip", "sha256": ""}
+        with patch("patching.DRIVES", [self.temp_dir]), \
+                patch("patching.download_file", return_value=True), \
+                patch("patching.find_process_by_path", return_value=None), \
+                patch("patching.find_all_processes_by_name", return_value=[]), \
+                patch("patching.verify_extracted_files", side_effect=verify), \
+                patch("patching.launch_executable", return_value=False) as mock_launch, \
+                patch("patching.run_spinner"), \
+                patch("patching.record_patch_run"), \
+                redirect_stdout(io.StringIO()):
+            ok = patch_file(patch_data, "checkbox.kasa.manager", {}, is_rro_agent=True, interactive=False,
+                            targets=self.target_dirs)
+        return ok, [call.args[1] for call in mock_launch.call_args_list]
+
+    def test_patch_launches_only_verified_registers(self):
+        ok, launched = self._patch()
+        self.assertTrue(ok)
+        self.assertEqual(launched, self.target_dirs)
+        for target_dir in self.target_dirs:
+            with open(os.path.join(target_dir, "version"), "rb") as f:
+                self.assertEqual(f.read(), b"1.4.3")
+            self.assertFalse(os.path.exists(os.path.join(target_dir, ".need_reboot")))
+
+    def test_patch_does_not_launch_damaged_register(self):
+        ok, launched = self._patch(damage=self.target_dirs[1])
+        self.assertTrue(ok)
+        self.assertEqual(launched, self.target_dirs[:1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import unittest
+from unittest.mock import patch
+
+from menu import display_menu
+from menu_model import compile_menu
+
+
+class TestMenuModel(unittest.TestCase):
+    def setUp(self):
+        self.data = {
+            "legacy": {
+                "kasa_manager": [{"name": "Manager 1.0", "url": "http://x/m.exe"}],
+                "rro_agent": [{"name": "Agent 1.0", "url": "http://x/a.exe"},
+                              {"name": "Agent 1.1", "url": "http://x/b.exe"}],
+                "cloudlike": [{"name": "Cloud 2.0", "url": "http://x/c.exe"}]
+            },
+            "dev": {
+                "kasa_manager": [], "rro_agent": [],
+                "paylink": [{"name": "PayLink 0.9", "url": "http://x/p.exe",
+                             "patch_name": "p.zip", "patch_url": "http://x/p.zip"}]
+            }
+        }
+        self.options = {
+            "legacy": {"rro_agent": self.data["legacy"]["rro_agent"],
+                       "kasa_manager": self.data["legacy"]["kasa_manager"]},
+            "dev": {"paylink": self.data["dev"]["paylink"]},
+            "cloudlike": {"cloudlike": self.data["legacy"]["cloudlike"]},
+            "patching": {"legacy": {"rro_agent": [{"patch_name": "fix.zip", "patch_url": "http://x/fix.zip"}]}}
+        }
+
+    def test_compiled_tree_orders_sections_and_numbers_entries(self):
+        root = compile_menu("Main Menu", self.options, self.data)
+        self.assertTrue(root.is_main)
+        self.assertEqual([entry.label for entry in root.entries], ["Legacy", "Dev", "Cloudlike", "Patching"])
+        self.assertTrue(all(entry.kind == "submenu" for entry in root.entries))
+
+        legacy = root.entries[0].submenu
+        self.assertEqual([(entry.number, entry.label, entry.section) for entry in legacy.entries],
+                         [(1, "Manager 1.0", "kasa_manager"), (2, "Agent 1.0", "cash_register"),
+                          (3, "Agent 1.1", "cash_register")])
+        self.assertIn("=== Managers ===", legacy.lines[0])
+        self.assertIn("1. Manager 1.0", legacy.lines[1])
+
+        paylink = root.entries[1].submenu.entries[0]
+        self.assertEqual(paylink.kind, "install")
+        self.assertIs(paylink.paylink_patch_data, self.data["dev"]["paylink"][-1])
+        self.assertEqual(root.entries[2].submenu.entries[0].section, "cash_register")
+
+        patch_entry = root.entries[3].submenu.entries[0].submenu.entries[0]
+        self.assertEqual(patch_entry.kind, "patch")
+        self.assertTrue(patch_entry.is_rro_agent)
+        self.assertEqual(patch_entry.product_folder, "checkbox.kasa.manager")
+
+    @patch("menu.run_spinner")
+    @patch("menu.os.system")
+    @patch("cleanup.cleanup")
+    @patch("patching.install_file")
+    @patch("menu.compile_menu", wraps=compile_menu)
+    def test_display_menu_navigates_compiled_tree(self, mock_compile, mock_install, mock_cleanup,
+                                                  mock_system, mock_spinner):
+        with patch("builtins.input", side_effect=["1", "3", "0", "1", "0", "q"]), \
+                patch("builtins.print"), self.assertRaises(SystemExit):
+            display_menu("Main Menu", self.options, self.data)
+
+        self.assertEqual(mock_compile.call_count, 1)
+        self.assertEqual(mock_install.call_count, 1)
+        self.assertEqual(mock_install.call_args[0][0]["name"], "Agent 1.1")
+        mock_cleanup.assert_called_once_with(self.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
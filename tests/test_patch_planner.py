@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+import patch_planner
+from patch_planner import (DEFAULT_RESTART_SECONDS, DEFAULT_THROUGHPUT, HISTORY_LIMIT, build_patch_plan,
+                           estimate_rates, load_patch_history, print_patch_plan, record_patch_run)
+
+
+class TestPatchPlanner(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.history_file = os.path.join(self.temp_dir, "patch_history.json")
+        self.history = patch("patch_planner.PATCH_HISTORY_FILE", self.history_file)
+        self.history.start()
+
+    def tearDown(self):
+        self.history.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write_history(self, content):
+        with open(self.history_file, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def test_history_load_and_save(self):
+        self.assertEqual(load_patch_history(), [])
+        for corrupt in ("{not json", json.dumps({"bytes": 1})):
+            self._write_history(corrupt)
+            self.assertEqual(load_patch_history(), [])
+
+        record_patch_run(1000, 0.12345, [4.0, 6.5])
+        history = load_patch_history()
+        self.assertEqual(len(history), 1)
+        self.assertEqual((history[0]["bytes"], history[0]["seconds"], history[0]["restart_seconds"]),
+                         (1000, 0.123, [4.0, 6.5]))
+
+        for index in range(HISTORY_LIMIT + 5):
+            record_patch_run(index, 1.0, [])
+        history = load_patch_history()
+        self.assertEqual(len(history), HISTORY_LIMIT)
+        self.assertEqual(history[-1]["bytes"], HISTORY_LIMIT + 4)
+
+    def test_estimate_rates(self):
+        self.assertEqual(estimate_rates([]), {"throughput": DEFAULT_THROUGHPUT,
+                                              "restart_seconds": DEFAULT_RESTART_SECONDS, "measured": False})
+        history = [{"bytes": 3000, "seconds": 1.0, "restart_seconds": [4.0, 8.0]},
+                   {"bytes": 1000, "seconds": 1.0, "restart_seconds": [5.0]},
+                   {"timestamp": "2026-01-01T00:00:00"}]
+        self.assertEqual(estimate_rates(history), {"throughput": 2000.0, "restart_seconds": 5.0, "measured": True})
+        self.assertFalse(estimate_rates([{"bytes": 1000, "seconds": 0}])["measured"])
+
+    def test_build_patch_plan(self):
+        patch_path = os.path.join(self.temp_dir, "1.4.3.zip")
+        with zipfile.ZipFile(patch_path, "w") as zip_ref:
+            zip_ref.writestr("version", b"1.4.3")
+            zip_ref.writestr("com-server/", b"")
+            zip_ref.writestr("com-server/app.js", b"x" * 3000)
+            zip_ref.writestr("com-server/new.js", b"y" * 1000)
+        with zipfile.ZipFile(patch_path) as zip_ref:
+            members = zip_ref.infolist()
+        current, outdated = os.path.join(self.temp_dir, "kasa1"), os.path.join(self.temp_dir, "kasa2")
+        with zipfile.ZipFile(patch_path) as zip_ref:
+            zip_ref.extractall(current)
+            zip_ref.extract("com-server/app.js", outdated)
+        with open(os.path.join(outdated, "version"), "wb") as f:
+            f.write(b"1.4.2")
+
+        history = [{"bytes": 4005, "seconds": 2.0, "restart_seconds": [3.0]}]
+        plan = build_patch_plan(members, [current, outdated], history)
+
+        self.assertEqual([entry["target_dir"] for entry in plan], [current, outdated])
+        self.assertEqual((plan[0]["changes"], plan[0]["bytes_to_change"]), ([], 0))
+        self.assertEqual(plan[1]["changes"], [{"file": "version", "size": 5, "action": "update"},
+                                              {"file": "com-server/new.js", "size": 1000, "action": "add"}])
+        self.assertEqual(plan[1]["bytes_to_change"], 1005)
+        for entry in plan:
+            self.assertEqual(entry["bytes_to_write"], 4005)
+            self.assertEqual(entry["estimated_downtime"], 5.0)
+            self.assertTrue(entry["estimate_measured"])
+            self.assertTrue(entry["enough_space"])
+
+        with patch("patch_planner.shutil.disk_usage", side_effect=OSError):
+            plan = build_patch_plan(members, [outdated], [])
+        self.assertEqual((plan[0]["free_bytes"], plan[0]["enough_space"]), (None, True))
+        self.assertFalse(plan[0]["estimate_measured"])
+
+        with redirect_stdout(io.StringIO()) as out:
+            print_patch_plan(build_patch_plan(members, [current, outdated], history))
+        self.assertIn("Files to change: 2 (1005 B)", out.getvalue())
+        self.assertIn("Total estimated downtime: 10.0s", out.getvalue())
+
+    def test_build_patch_plan_reads_history_file(self):
+        self._write_history(json.dumps([{"bytes": 100, "seconds": 1.0, "restart_seconds": [2.0]}]))
+        member = zipfile.ZipInfo("version")
+        member.file_size = 50
+        with patch.object(patch_planner, "check_member", return_value="missing"):
+            plan = build_patch_plan([member], [self.temp_dir])
+        self.assertEqual(plan[0]["estimated_downtime"], 2.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from platform_layer import PosixPlatform, WindowsPlatform
+from search_utils import find_cash_registers_by_exe, reset_cache
+
+
+class TestPlatformLayer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _make_register(self, *parts):
+        path = os.path.join(self.temp_dir, *parts)
+        os.makedirs(path)
+        with open(os.path.join(path, "checkbox_kasa.exe"), "wb") as f:
+            f.write(b"MZ")
+        return path
+
+    @unittest.skipIf(os.name == "nt", "POSIX backend")
+    def test_posix_discovery_skips_dot_folders_and_launches(self):
+        visible = self._make_register("profiles", "kasa1")
+        self._make_register(".cache", "kasa2")
+        with patch("platform_layer.current", PosixPlatform()):
+            reset_cache()
+            found = find_cash_registers_by_exe(None, [self.temp_dir], use_cache=False)
+        self.assertEqual([item["path"] for item in found], [os.path.normpath(visible)])
+
+        script = os.path.join(visible, "run.sh")
+        with open(script, "w", encoding="utf-8") as f:
+            f.write("#!/bin/sh\ntouch started\n")
+        os.chmod(script, 0o755)
+        PosixPlatform().launch(script, visible)
+        deadline = time.monotonic() + 5
+        while not os.path.exists(os.path.join(visible, "started")) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertTrue(os.path.exists(os.path.join(visible, "started")))
+
+    def test_self_delete_scripts(self):
+        exe_path = os.path.join(self.temp_dir, "cbx multi'tool.exe")
+        with patch("subprocess.Popen") as mock_popen, \
+                patch.object(subprocess, "CREATE_NO_WINDOW", 0x08000000, create=True):
+            WindowsPlatform().schedule_self_delete(exe_path)
+            PosixPlatform().schedule_self_delete(exe_path)
+
+        with open(os.path.join(self.temp_dir, "delete_me.bat"), encoding="utf-8") as f:
+            self.assertIn(f"del /f /q \"{exe_path}\"", f.read())
+        with open(os.path.join(self.temp_dir, "delete_me.sh"), encoding="utf-8") as f:
+            script = f.read()
+        self.assertIn(f"kill -0 {os.getpid()}", script)
+        self.assertIn(f"rm -f {shlex.quote(exe_path)}", script)
+        self.assertEqual(mock_popen.call_count, 2)
+        self.assertEqual(mock_popen.call_args[0][0][0], "/bin/sh")
+
+    def test_windows_hidden_attribute(self):
+        stat_result = type("Stat", (), {"st_file_attributes": 0x02})()
+        with patch("os.stat", return_value=stat_result):
+            self.assertTrue(WindowsPlatform().is_hidden(self.temp_dir))
+        self.assertFalse(WindowsPlatform().is_hidden(os.path.join(self.temp_dir, "missing")))
+        self.assertTrue(PosixPlatform().is_hidden(os.path.join(self.temp_dir, ".git") + os.sep))
+
+
+if __name__ == "__main__":
+    unittest.main()
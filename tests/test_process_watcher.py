@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+import psutil
+
+from process_watcher import ProcessWatcher
+
+
+class TestProcessWatcher(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.target_dir = os.path.join(self.temp_dir, "kasa1")
+        self.sibling_dir = os.path.join(self.temp_dir, "kasa10")
+        os.makedirs(self.target_dir)
+        os.makedirs(self.sibling_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def make_proc(self, pid, name, exe):
+        proc = MagicMock(pid=pid, info={"pid": pid, "name": name})
+        proc.exe.return_value = exe
+        return proc
+
+    def test_snapshot_matches_name_and_dir(self):
+        procs = [
+            self.make_proc(1, "checkbox_kasa.exe", os.path.join(self.target_dir, "checkbox_kasa.exe")),
+            self.make_proc(2, "checkbox_kasa.exe", os.path.join(self.sibling_dir, "checkbox_kasa.exe")),
+            self.make_proc(3, "other.exe", os.path.join(self.target_dir, "other.exe")),
+        ]
+        watcher = ProcessWatcher(["CHECKBOX_KASA.EXE"], [self.target_dir])
+        with patch("psutil.process_iter", return_value=procs):
+            found = watcher.snapshot()
+        self.assertEqual([v["pid"] for v in found], [1])
+        procs[2].exe.assert_not_called()
+
+    def test_snapshot_skips_access_denied(self):
+        proc = self.make_proc(1, "checkbox_kasa.exe", None)
+        proc.exe.side_effect = psutil.AccessDenied(1)
+        watcher = ProcessWatcher(["checkbox_kasa.exe"], [self.target_dir])
+        with patch("psutil.process_iter", return_value=[proc]):
+            self.assertEqual(watcher.snapshot(), [])
+
+    def test_violations_reported_once_through_queue(self):
+        proc = self.make_proc(7, "checkbox_kasa.exe", os.path.join(self.target_dir, "checkbox_kasa.exe"))
+        with patch("psutil.process_iter", return_value=[proc]):
+            watcher = ProcessWatcher(["checkbox_kasa.exe"], [self.target_dir], interval=0.01)
+            with watcher:
+                watcher._stop_event.wait(0.1)
+        violations = watcher.drain()
+        self.assertEqual(len(violations), 1)
+        self.assertEqual(violations[0]["pid"], 7)
+        self.assertEqual(watcher.drain(), [])
+        proc.terminate.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
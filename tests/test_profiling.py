@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import profiling
+from profiling import profile_action, top_hotspots
+
+
+def _busy_work():
+    return sum(i * i for i in range(20000))
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.profile_dir = os.path.join(self.temp_dir, "profiles")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_action_writes_profile_and_hotspots(self):
+        out = io.StringIO()
+        with patch.object(profiling, "_directory", self.profile_dir), patch("sys.stderr", out):
+            with profile_action("patch 1.4.2.zip"):
+                _busy_work()
+                with profile_action("nested"):
+                    _busy_work()
+
+        files = os.listdir(self.profile_dir)
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].endswith("_patch_1.4.2.zip.prof"))
+        stats = pstats.Stats(os.path.join(self.profile_dir, files[0]))
+        self.assertTrue(any("_busy_work" in row[0] for row in top_hotspots(stats, limit=50)))
+        self.assertIn("Profile of 'patch 1.4.2.zip'", out.getvalue())
+        self.assertFalse(profiling._active)
+
+    def test_disabled_profiling_writes_nothing(self):
+        with patch.object(profiling, "_directory", None):
+            with profile_action("health check"):
+                _busy_work()
+        self.assertFalse(os.path.exists(self.profile_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
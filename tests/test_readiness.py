@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from readiness import get_web_server_address, is_port_open, wait_for_cash_register, wait_for_process, wait_until
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestReadiness(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.clock = FakeClock()
+        self.patches = [
+            patch("readiness.time", SimpleNamespace(monotonic=self.clock.monotonic, sleep=self.clock.sleep)),
+            patch("readiness.show_spinner")
+        ]
+        for patcher in self.patches:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patches:
+            patcher.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write_config(self, content):
+        with open(os.path.join(self.temp_dir, "config.json"), "w", encoding="utf-8") as f:
+            f.write(content if isinstance(content, str) else json.dumps(content))
+
+    def _process(self, name, exe):
+        return SimpleNamespace(info={"pid": 1, "name": name, "exe": exe})
+
+    def test_wait_until_backs_off_until_ready(self):
+        results = iter([False, False, RuntimeError("not yet"), False, True])
+
+        def probe():
+            result = next(results)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        ready, elapsed = wait_until(probe, max_wait=10, initial_delay=0.25, max_delay=0.5, backoff=2)
+        self.assertTrue(ready)
+        self.assertEqual(self.clock.sleeps, [0.25, 0.5, 0.5, 0.5])
+        self.assertEqual(elapsed, 1.75)
+
+    def test_wait_until_times_out(self):
+        probe = MagicMock(return_value=False)
+        ready, elapsed = wait_until(probe, max_wait=1.0, initial_delay=0.4, backoff=2)
+        self.assertFalse(ready)
+        self.assertEqual(elapsed, 1.0)
+        self.assertEqual(self.clock.sleeps, [0.4, 0.6])
+        self.assertEqual(probe.call_count, 3)
+
+    def test_get_web_server_address(self):
+        self.assertIsNone(get_web_server_address(self.temp_dir))
+        self._write_config({"web_server": {"host": "0.0.0.0", "port": "9300"}})
+        self.assertEqual(get_web_server_address(self.temp_dir), ("0.0.0.0", 9300))
+        self._write_config({})
+        self.assertEqual(get_web_server_address(self.temp_dir), ("127.0.0.1", 9200))
+        for bad in ("{broken", "[1, 2]", json.dumps({"web_server": {"port": "http"}})):
+            self._write_config(bad)
+            self.assertIsNone(get_web_server_address(self.temp_dir))
+
+    def test_is_port_open(self):
+        with patch("readiness.socket.create_connection") as mock_connect:
+            self.assertTrue(is_port_open("0.0.0.0", 9200, timeout=0.1))
+            mock_connect.assert_called_once_with(("127.0.0.1", 9200), timeout=0.1)
+            mock_connect.side_effect = ConnectionRefusedError()
+            self.assertFalse(is_port_open("10.0.0.5", 9200))
+
+    def test_wait_for_process(self):
+        kasa_exe = os.path.join(self.temp_dir, "checkbox_kasa.exe")
+        other_exe = os.path.join(self.temp_dir + "_other", "CheckboxPayLink.exe")
+        listings = iter([[], [self._process("CheckboxPayLink.exe", other_exe)],
+                         [self._process("checkbox_kasa.exe", kasa_exe)]])
+        with patch("psutil.process_iter", side_effect=lambda attrs: next(listings)), redirect_stdout(io.StringIO()):
+            self.assertTrue(wait_for_process("checkbox_kasa.exe", self.temp_dir, max_wait=10))
+        self.assertEqual(len(self.clock.sleeps), 2)
+
+        with patch("psutil.process_iter", return_value=[]), redirect_stdout(io.StringIO()) as out:
+            self.assertFalse(wait_for_process("CheckboxPayLink.exe", self.temp_dir, max_wait=3,
+                                              display_name="PayLink"))
+        self.assertIn("PayLink did not start within 3s", out.getvalue())
+
+    def test_wait_for_cash_register_uses_web_server_port(self):
+        self._write_config({"web_server": {"port": 9400}})
+        attempts = iter([ConnectionRefusedError(), ConnectionRefusedError(), MagicMock()])
+
+        def connect(address, timeout):
+            result = next(attempts)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        with patch("readiness.socket.create_connection", side_effect=connect) as mock_connect, \
+                redirect_stdout(io.StringIO()) as out:
+            self.assertTrue(wait_for_cash_register(self.temp_dir, max_wait=10))
+        self.assertEqual(mock_connect.call_args[0][0], ("127.0.0.1", 9400))
+        self.assertIn("ready on port 9400", out.getvalue())
+
+        with patch("readiness.socket.create_connection", side_effect=ConnectionRefusedError()), \
+                redirect_stdout(io.StringIO()) as out:
+            self.assertFalse(wait_for_cash_register(self.temp_dir, max_wait=2))
+        self.assertIn("did not respond on port 9400 within 2s", out.getvalue())
+
+    def test_wait_for_cash_register_without_config_waits_for_process(self):
+        self._write_config("{broken")
+        kasa_exe = os.path.join(self.temp_dir, "checkbox_kasa.exe")
+        with patch("psutil.process_iter", return_value=[self._process("checkbox_kasa.exe", kasa_exe)]), \
+                patch("readiness.socket.create_connection") as mock_connect, \
+                redirect_stdout(io.StringIO()) as out:
+            self.assertTrue(wait_for_cash_register(self.temp_dir, max_wait=5))
+        mock_connect.assert_not_called()
+        self.assertIn("Cash register is running", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
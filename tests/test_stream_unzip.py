@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from stream_unzip import StreamingZipExtractor, StreamingUnsupported, safe_member_path
+
+
+class _UnseekableWriter:
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def write(self, data):
+        return self.buffer.write(data)
+
+    def flush(self):
+        pass
+
+    def tell(self):
+        raise OSError("unseekable")
+
+
+class TestStreamUnzip(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.staging_dir = os.path.join(self.temp_dir, "staging")
+        random.seed(42)
+        self.files = {
+            "checkbox_kasa.exe": os.urandom(70000),
+            "com-server/lib/data.txt": b"line\n" * 20000,
+            "empty.txt": b"",
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def build_zip(self, compression=zipfile.ZIP_DEFLATED, seekable=True):
+        target = io.BytesIO() if seekable else _UnseekableWriter()
+        with zipfile.ZipFile(target, "w", compression) as zf:
+            zf.writestr("com-server/", b"")
+            for name, content in self.files.items():
+                zf.writestr(name, content)
+        return (target if seekable else target.buffer).getvalue()
+
+    def feed_in_chunks(self, payload):
+        extractor = StreamingZipExtractor(self.staging_dir)
+        pos = 0
+        while pos < len(payload):
+            size = random.randint(1, 5000)
+            extractor.feed(payload[pos:pos + size])
+            pos += size
+        return extractor.close()
+
+    def assert_extracted(self, members):
+        self.assertEqual(sorted(m.filename for m in members if not m.is_dir()), sorted(self.files))
+        for name, content in self.files.items():
+            with open(os.path.join(self.staging_dir, *name.split("/")), "rb") as f:
+                self.assertEqual(f.read(), content)
+
+    def test_deflated_archive(self):
+        self.assert_extracted(self.feed_in_chunks(self.build_zip()))
+
+    def test_stored_archive(self):
+        self.assert_extracted(self.feed_in_chunks(self.build_zip(zipfile.ZIP_STORED)))
+
+    def test_deflated_with_data_descriptor(self):
+        payload = self.build_zip(seekable=False)
+        members = self.feed_in_chunks(payload)
+        self.assertTrue(all(m.flag_bits & 0x08 for m in members))
+        self.assert_extracted(members)
+
+    def test_stored_with_data_descriptor_unsupported(self):
+        payload = self.build_zip(zipfile.ZIP_STORED, seekable=False)
+        with self.assertRaises(StreamingUnsupported):
+            self.feed_in_chunks(payload)
+
+    def test_truncated_archive(self):
+        payload = self.build_zip()
+        extractor = StreamingZipExtractor(self.staging_dir)
+        extractor.feed(payload[:len(payload) // 2])
+        with self.assertRaises(zipfile.BadZipFile):
+            extractor.close()
+
+    def test_corrupted_member(self):
+        payload = bytearray(self.build_zip(zipfile.ZIP_STORED))
+        offset = payload.find(b"line\n")
+        payload[offset] ^= 0xFF
+        with self.assertRaises(zipfile.BadZipFile):
+            self.feed_in_chunks(bytes(payload))
+
+    def test_safe_member_path(self):
+        root = os.path.join(self.temp_dir, "root")
+        self.assertEqual(safe_member_path(root, "../../evil.txt"), os.path.join(root, "evil.txt"))
+        self.assertEqual(safe_member_path(root, "/abs/file"), os.path.join(root, "abs", "file"))
+        self.assertIsNone(safe_member_path(root, "../"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import tracing
+from tracing import annotate, export_trace, span, summarize, traced
+
+
+@traced(arg="path")
+def _outer(path):
+    with span("inner", files=2) as inner:
+        inner.set(bytes=10)
+    annotate(done=True)
+    return path
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.enabled = patch.object(tracing, "_enabled", True)
+        self.spans = patch.object(tracing, "_spans", [])
+        self.enabled.start()
+        self.spans.start()
+
+    def tearDown(self):
+        self.spans.stop()
+        self.enabled.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_nested_spans_summary_and_export(self):
+        self.assertEqual(_outer("C:\\profiles\\kasa1"), "C:\\profiles\\kasa1")
+        worker = threading.Thread(target=_outer, args=("D:\\kasa2",))
+        worker.start()
+        worker.join()
+
+        spans = {(item.name, item.attrs.get("path")): item for item in tracing._spans}
+        outer = spans[("tests.test_tracing._outer", "C:\\profiles\\kasa1")]
+        self.assertEqual(outer.attrs["done"], True)
+        inner = next(item for item in tracing._spans if item.name == "inner" and item.parent is outer)
+        self.assertEqual(inner.attrs, {"files": 2, "bytes": 10})
+        self.assertEqual(outer.child_ns, inner.duration_ns)
+
+        rows = {row["name"]: row for row in summarize()}
+        self.assertEqual(rows["inner"]["count"], 2)
+        self.assertEqual(rows["tests.test_tracing._outer"]["count"], 2)
+        self.assertLessEqual(rows["tests.test_tracing._outer"]["self_ms"],
+                             rows["tests.test_tracing._outer"]["total_ms"])
+
+        path = export_trace(os.path.join(self.temp_dir, "trace.json"))
+        with open(path, encoding="utf-8") as f:
+            events = json.load(f)["traceEvents"]
+        self.assertEqual(len(events), 4)
+        self.assertEqual({event["ph"] for event in events}, {"X"})
+        self.assertEqual(len({event["tid"] for event in events}), 2)
+
+    def test_error_is_recorded_and_disabled_tracing_is_noop(self):
+        with self.assertRaises(ValueError):
+            with span("failing"):
+                raise ValueError("boom")
+        self.assertEqual(tracing._spans[0].attrs["error"], "ValueError")
+
+        with patch.object(tracing, "_enabled", False):
+            with span("ignored") as ignored:
+                ignored.set(bytes=1)
+            annotate(files=1)
+            _outer("x")
+        self.assertEqual(len(tracing._spans), 1)
+
+    def test_spans_are_capped(self):
+        with patch.object(tracing, "TRACE_SPAN_LIMIT", 10), patch.object(tracing, "_dropped", 0):
+            for index in range(25):
+                with span("tick", index=index):
+                    pass
+            self.assertLessEqual(len(tracing._spans), 10)
+            self.assertEqual(tracing._spans[-1].attrs["index"], 24)
+            self.assertEqual(tracing._dropped + len(tracing._spans), 25)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,266 @@
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, TextIO
+
+from config import TRACE, TRACE_SPAN_LIMIT
+
+_lock = threading.Lock()
+_local = threading.local()
+_spans: List["Span"] = []
+_dropped = 0
+_enabled = False
+_trace_path: Optional[str] = None
+_finished = False
+_origin_ns = time.perf_counter_ns()
+
+
+class Span:
+    """
+    Інтервал виконання операції з атрибутами.
+
+    Args:
+        name (str): Назва операції, наприклад "backup.create".
+        attrs (Dict): Атрибути (шлях каси, байти, кількість файлів тощо).
+        parent (Optional[Span]): Зовнішній інтервал у тому ж потоці.
+    """
+
+    __slots__ = ("name", "attrs", "parent", "thread_id", "start_ns", "end_ns", "child_ns")
+
+    def __init__(self, name: str, attrs: Dict, parent: Optional["Span"]):
+        self.name = name
+        self.attrs = attrs
+        self.parent = parent
+        self.thread_id = threading.get_ident()
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = self.start_ns
+        self.child_ns = 0
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **attrs) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def enable(path: Optional[str] = None) -> None:
+    """
+    Вмикає трасування до кінця сесії.
+
+    Під час завершення процесу трасу буде записано у файл, а зведення виведено в stderr.
+
+    Args:
+        path (Optional[str]): Файл траси. За замовчуванням cbx_trace_<дата>_<час>.json у поточній директорії.
+    """
+    global _enabled, _trace_path
+    with _lock:
+        if not _enabled:
+            atexit.register(finish)
+        _enabled = True
+        _trace_path = path or f"cbx_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _stack() -> List[Span]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator:
+    """
+    Вимірює вкладений інтервал виконання.
+
+    Коли трасування вимкнене, повертає об'єкт-заглушку, тож виклик коштує лише перевірку прапорця.
+
+    Args:
+        name (str): Назва операції.
+        **attrs: Початкові атрибути інтервалу.
+
+    Yields:
+        Span: Інтервал, до якого можна додати атрибути через set().
+    """
+    if not _enabled:
+        yield _NULL_SPAN
+        return
+    stack = _stack()
+    current = Span(name, attrs, stack[-1] if stack else None)
+    stack.append(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        current.end_ns = time.perf_counter_ns()
+        stack.pop()
+        if current.parent is not None:
+            current.parent.child_ns += current.duration_ns
+        _record(current)
+
+
+def _record(item: Span) -> None:
+    """
+    Зберігає завершений інтервал, відкидаючи найстаріші, коли їх більше за TRACE_SPAN_LIMIT.
+
+    Відкидається відразу половина ліміту, тож обрізання списку відбувається рідко.
+    """
+    global _dropped
+    with _lock:
+        _spans.append(item)
+        if len(_spans) > TRACE_SPAN_LIMIT:
+            excess = len(_spans) - TRACE_SPAN_LIMIT // 2
+            del _spans[:excess]
+            _dropped += excess
+
+
+def annotate(**attrs) -> None:
+    """
+    Додає атрибути до поточного інтервалу в цьому потоці.
+
+    Args:
+        **attrs: Атрибути, наприклад bytes=..., files=....
+    """
+    stack = getattr(_local, "stack", None) if _enabled else None
+    if stack:
+        stack[-1].attrs.update(attrs)
+
+
+def traced(name: Optional[str] = None, arg: Optional[str] = None) -> Callable:
+    """
+    Декоратор, що огортає виклики функції в інтервал.
+
+    Args:
+        name (Optional[str]): Назва операції. За замовчуванням "<модуль>.<функція>".
+        arg (Optional[str]): Якщо задано, перший аргумент виклику записується в цей атрибут
+            (наприклад, шлях каси).
+
+    Returns:
+        Callable: Декоратор.
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or f"{func.__module__}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            attrs = {arg: args[0]} if arg and args else {}
+            with span(span_name, **attrs):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def summarize() -> List[Dict]:
+    """
+    Групує завершені інтервали за назвою.
+
+    Returns:
+        List[Dict]: Рядки з полями name, count, total_ms, self_ms (без вкладених інтервалів)
+            і max_ms, від найбільшого власного часу.
+    """
+    rows: Dict[str, Dict] = {}
+    with _lock:
+        spans = list(_spans)
+    for item in spans:
+        row = rows.setdefault(item.name, {"name": item.name, "count": 0, "total_ms": 0.0, "self_ms": 0.0, "max_ms": 0.0})
+        duration_ms = item.duration_ns / 1e6
+        row["count"] += 1
+        row["total_ms"] += duration_ms
+        row["self_ms"] += (item.duration_ns - item.child_ns) / 1e6
+        row["max_ms"] = max(row["max_ms"], duration_ms)
+    return sorted(rows.values(), key=lambda row: row["self_ms"], reverse=True)
+
+
+def print_summary(out: Optional[TextIO] = None) -> None:
+    """
+    Виводить таблицю зведення інтервалів сесії.
+
+    Args:
+        out (Optional[TextIO]): Потік виводу. За замовчуванням sys.stderr, щоб не змішувати
+            зведення з результатом команд CLI.
+    """
+    out = out or sys.stderr
+    rows = summarize()
+    if not rows:
+        return
+    print(f"\n{'operation':<45}{'calls':>7}{'total ms':>12}{'self ms':>12}{'max ms':>12}", file=out)
+    for row in rows:
+        print(f"{row['name']:<45}{row['count']:>7}{row['total_ms']:>12.1f}{row['self_ms']:>12.1f}"
+              f"{row['max_ms']:>12.1f}", file=out)
+
+
+def export_trace(path: str) -> str:
+    """
+    Записує інтервали у форматі Chrome Trace Event (відкривається в chrome://tracing або Perfetto).
+
+    Args:
+        path (str): Шлях до JSON-файлу.
+
+    Returns:
+        str: Шлях до записаного файлу.
+
+    Raises:
+        OSError: Якщо файл неможливо записати.
+    """
+    with _lock:
+        spans = list(_spans)
+    pid = os.getpid()
+    events = [{
+        "name": item.name,
+        "ph": "X",
+        "ts": (item.start_ns - _origin_ns) / 1000,
+        "dur": item.duration_ns / 1000,
+        "pid": pid,
+        "tid": item.thread_id,
+        "args": {key: value if isinstance(value, (int, float, bool)) or value is None else str(value)
+                 for key, value in item.attrs.items()}
+    } for item in spans]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+    return path
+
+
+def finish() -> None:
+    """
+    Записує трасу та виводить зведення один раз за сесію (викликається також під час завершення процесу).
+    """
+    global _finished
+    with _lock:
+        if not _enabled or _finished:
+            return
+        _finished = True
+    print_summary()
+    if _dropped:
+        print(f"{_dropped} earliest spans were dropped (limit {TRACE_SPAN_LIMIT})", file=sys.stderr)
+    try:
+        print(f"Trace written to {os.path.abspath(export_trace(_trace_path))}", file=sys.stderr)
+    except OSError as e:
+        print(f"Failed to write trace {_trace_path}: {e}", file=sys.stderr)
+
+
+if TRACE not in ("", "0"):
+    enable(None if TRACE == "1" else TRACE)
@@ -0,0 +1,72 @@
+import os
+from typing import Callable, Iterator, Optional
+
+
+class TreeEntry:
+    """
+    Файл, знайдений під час обходу дерева.
+
+    Args:
+        path (str): Повний шлях до файлу.
+        rel_path (str): Шлях відносно кореня обходу з "/" як роздільником.
+        stat (os.stat_result): Метадані файлу з DirEntry.
+    """
+
+    __slots__ = ("path", "rel_path", "stat")
+
+    def __init__(self, path: str, rel_path: str, stat: os.stat_result):
+        self.path = path
+        self.rel_path = rel_path
+        self.stat = stat
+
+    @property
+    def size(self) -> int:
+        return self.stat.st_size
+
+    @property
+    def mtime_ns(self) -> int:
+        return self.stat.st_mtime_ns
+
+
+def scan_tree(root: str, on_dir: Optional[Callable[[str], None]] = None,
+              skip_file: Optional[Callable[[str], bool]] = None) -> Iterator[TreeEntry]:
+    """
+    Обходить дерево директорій за один прохід через os.scandir і видає файли з їхніми метаданими.
+
+    На Windows розмір і час зміни приходять разом із записом директорії, тому окремий
+    виклик stat для кожного файлу не потрібен. Символічні посилання на директорії
+    не відвідуються, як і в os.walk за замовчуванням. Файли, які зникли між читанням
+    директорії та stat (наприклад, службові файли SQLite, видалені під час закриття бази),
+    пропускаються.
+
+    Args:
+        root (str): Коренева директорія.
+        on_dir (Optional[Callable[[str], None]]): Викликається з відносним шляхом кожної піддиректорії.
+        skip_file (Optional[Callable[[str], bool]]): Повний шлях -> True, якщо файл слід пропустити
+            ще до виклику stat.
+
+    Yields:
+        TreeEntry: Файли дерева.
+
+    Raises:
+        OSError: Якщо директорію або файл неможливо прочитати. Неповний обхід для резервної
+            копії неприйнятний, тому помилки не приховуються.
+    """
+    stack = [(root, "")]
+    while stack:
+        current, prefix = stack.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                rel_path = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if on_dir:
+                        on_dir(rel_path)
+                    stack.append((entry.path, rel_path + "/"))
+                elif entry.is_file():
+                    if skip_file and skip_file(entry.path):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    yield TreeEntry(entry.path, rel_path, stat)
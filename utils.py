@@ -1,4 +1,3 @@
-import ctypes
 import json
 import os
 import time
@@ -6,43 +5,169 @@ import threading
 import itertools
 import sys
 import subprocess
-from typing import List, Optional, Dict, Tuple
-import psutil
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, List, Optional, Dict, Tuple
 from colorama import Fore, Style
 
+import platform_layer
+from config import NO_DELAY
+from tracing import traced
+
+if TYPE_CHECKING:
+    import psutil
+
+
+_sleep_lock = threading.Lock()
+_slept_seconds = 0.0
+# Момент (time.monotonic), до якого останнє повідомлення статусу має лишатися на екрані
+_status_deadline = 0.0
+
+
+@traced(arg="seconds")
+def pause(duration: float) -> None:
+    """
+    Штучна пауза, щоб користувач встиг прочитати повідомлення.
+
+    У режимі config.NO_DELAY (змінна середовища CBX_NO_DELAY=1) пауза пропускається.
+    Фактично витрачений час додається до метрики get_sleep_time().
+
+    Args:
+        duration (float): Тривалість паузи в секундах.
+    """
+    global _slept_seconds
+    if NO_DELAY or duration <= 0:
+        return
+    time.sleep(duration)
+    with _sleep_lock:
+        _slept_seconds += duration
+
+
+def set_no_delay(enabled: bool) -> None:
+    """
+    Вмикає або вимикає режим без штучних пауз на час сесії (наприклад, для cli.py).
+
+    Args:
+        enabled (bool): True, щоб пропускати паузи та анімацію спінерів.
+    """
+    global NO_DELAY
+    NO_DELAY = enabled
+
+
+def get_sleep_time() -> float:
+    """
+    Повертає сумарний час штучних пауз за сесію.
+
+    Returns:
+        float: Кількість секунд, витрачених на pause() та очікування в settle_status().
+    """
+    return _slept_seconds
+
 
 def run_spinner(message: str, duration: float = 2.0) -> None:
     """
-    Запускає анімований спінер із повідомленням на заданий час.
+    Виводить повідомлення статусу, не блокуючи виконання.
+
+    Повідомлення має лишатися на екрані щонайменше duration секунд, але програма продовжує
+    роботу одразу: чекає лише settle_status() (її викликає clear_screen() і вихід із програми),
+    і тільки на ту частину duration, яка ще не минула. У режимі config.NO_DELAY очікування немає.
+    Для спінера на час реальної операції використовуйте spinner().
+
+    Args:
+        message (str): Повідомлення статусу.
+        duration (float): Скільки секунд повідомлення має бути видно.
+    """
+    global _status_deadline
+    sys.stdout.write(f"{Fore.GREEN}✓ {message} completed!{Style.RESET_ALL}\n")
+    sys.stdout.flush()
+    if NO_DELAY or duration <= 0:
+        return
+    with _sleep_lock:
+        _status_deadline = max(_status_deadline, time.monotonic() + duration)
+
+
+def settle_status() -> None:
+    """
+    Чекає, поки останнє повідомлення статусу пробуде на екрані свій час, перед тим як екран
+    буде очищено чи програма завершиться. Очікування враховується в get_sleep_time().
+    """
+    global _status_deadline
+    with _sleep_lock:
+        remaining = _status_deadline - time.monotonic()
+        _status_deadline = 0.0
+    pause(remaining)
+
+
+def clear_screen() -> None:
+    """
+    Очищає вікно консолі, спершу давши дочитати останнє повідомлення статусу.
+    """
+    settle_status()
+    platform_layer.clear_screen()
+
+
+def wait_for_exit(processes: List["psutil.Process"], timeout: float = 5.0) -> None:
+    """
+    Чекає фактичного завершення процесів після kill() замість фіксованої паузи.
+
+    Args:
+        processes (List[psutil.Process]): Процеси, яким надіслано сигнал завершення.
+        timeout (float): Максимальний час очікування в секундах. За замовчуванням 5.0.
+    """
+    import psutil
+
+    if processes:
+        with spinner("Waiting for processes to exit"):
+            psutil.wait_procs(processes, timeout=timeout)
+
+
+@contextmanager
+def spinner(message: str) -> Iterator[None]:
+    """
+    Показує спінер, поки виконується блок коду, без додаткових пауз.
 
     Args:
         message (str): Повідомлення, яке відображається поряд зі спінером.
-        duration (float): Тривалість роботи спінера в секундах.
+
+    Yields:
+        None
     """
     stop_event = threading.Event()
-    spinner_thread = threading.Thread(target=show_spinner, args=(stop_event, message))
+    failed_event = threading.Event()
+    spinner_thread = threading.Thread(target=show_spinner, args=(stop_event, message, failed_event), daemon=True)
     spinner_thread.start()
-    time.sleep(duration)
-    stop_event.set()
-    spinner_thread.join()
+    try:
+        yield
+    except BaseException:
+        failed_event.set()
+        raise
+    finally:
+        stop_event.set()
+        spinner_thread.join()
+
 
-def show_spinner(stop_event: threading.Event, message: str = "Processing") -> None:
+def show_spinner(stop_event: threading.Event, message: str = "Processing",
+                 failed_event: Optional[threading.Event] = None) -> None:
     """
     Відображає анімований спінер у консолі до отримання сигналу зупинки.
 
     Args:
         stop_event (threading.Event): Подія для зупинки спінера.
         message (str): Повідомлення, яке відображається поряд зі спінером.
+        failed_event (Optional[threading.Event]): Якщо встановлена, операція вважається невдалою.
     """
-    spinner = itertools.cycle(['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏'])
+    frames = itertools.cycle(['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏'])
     while not stop_event.is_set():
-        sys.stdout.write(f"\r{Fore.CYAN}{message} {next(spinner)}{Style.RESET_ALL}")
+        sys.stdout.write(f"\r{Fore.CYAN}{message} {next(frames)}{Style.RESET_ALL}")
         sys.stdout.flush()
-        time.sleep(0.1)
-    sys.stdout.write(f"\r{Fore.GREEN}✓ {message} completed!{Style.RESET_ALL}\n")
+        stop_event.wait(0.1)
+    if failed_event is not None and failed_event.is_set():
+        sys.stdout.write(f"\r{Fore.RED}✗ {message} failed!{Style.RESET_ALL}\n")
+    else:
+        sys.stdout.write(f"\r{Fore.GREEN}✓ {message} completed!{Style.RESET_ALL}\n")
     sys.stdout.flush()
 
 
+@traced()
 def manage_process_lifecycle(
         process_names: List[str],
         target_dirs: List[str],
@@ -71,6 +196,8 @@ def manage_process_lifecycle(
         psutil.AccessDenied: Якщо відсутні права доступу до процесу.
         Exception: Інші непередбачені помилки.
     """
+    import psutil
+
     success = True
     for target_dir in target_dirs:
         for proc_name in process_names:
@@ -114,6 +241,7 @@ def manage_process_lifecycle(
     return success
 
 
+@traced(arg="path")
 def read_json_file(file_path: str) -> Optional[Dict]:
     """
     Читає JSON-файл із обробкою помилок.
@@ -143,6 +271,7 @@ def read_json_file(file_path: str) -> Optional[Dict]:
         return None
 
 
+@traced(arg="path")
 def write_json_file(file_path: str, data: Dict, indent: int = 4) -> bool:
     """
     Записує дані у JSON-файл із форматуванням.
@@ -198,6 +327,24 @@ def check_write_permissions(directory: str) -> bool:
         return False
 
 
+def format_bytes(size: float) -> str:
+    """
+    Форматує кількість байтів у зручний для читання вигляд.
+
+    Args:
+        size (float): Кількість байтів.
+
+    Returns:
+        str: Рядок на кшталт "12.3 MB".
+    """
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+@traced()
 def launch_executable(
         executable_name: str,
         target_dir: str,
@@ -215,7 +362,8 @@ def launch_executable(
         display_name (str): Назва для відображення в повідомленнях.
         spinner_duration (float): Тривалість роботи спінера в секундах. За замовчуванням 2.0.
         shell (bool): Чи використовувати shell-режим для запуску. За замовчуванням False.
-        command (Optional[str]): Кастомна команда для запуску. Якщо None, формується стандартна.
+        command (Optional[str]): Кастомна команда для запуску. Якщо None, файл запускається
+            через platform_layer.launch.
 
     Returns:
         bool: True, якщо запуск успішний, False у разі помилки.
@@ -230,8 +378,10 @@ def launch_executable(
 
     try:
         print(f"{Fore.CYAN}🚀 Launching {display_name.lower()}...{Style.RESET_ALL}")
-        cmd = command or f'start "" "{executable_path}"'
-        subprocess.Popen(cmd, cwd=target_dir, shell=shell)
+        if command:
+            subprocess.Popen(command, cwd=target_dir, shell=shell)
+        else:
+            platform_layer.launch(executable_path, target_dir)
         print(f"{Fore.GREEN}✓ {display_name} launched successfully!{Style.RESET_ALL}")
         run_spinner(f"{display_name} launched", spinner_duration)
         return True
@@ -265,7 +415,7 @@ def display_list_and_choose(
         ValueError: Якщо введено некоректний вибір.
     """
     while True:
-        os.system("cls" if os.name == "nt" else "clear")
+        clear_screen()
         print(f"{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}")
         print(f"{Fore.CYAN}{title.center(50)}{Style.RESET_ALL}")
         print(f"{Fore.CYAN}{'=' * 50}{Style.RESET_ALL}\n")
@@ -307,13 +457,11 @@ def is_admin() -> bool:
     Raises:
         Exception: Помилки, пов’язані з перевіркою прав доступу.
     """
-    try:
-        return ctypes.windll.shell32.IsUserAnAdmin() != 0
-    except Exception:
-        return False
+    return platform_layer.is_admin()
 
 
-def find_process_by_path(process_name: str, target_path: str) -> Optional[psutil.Process]:
+@traced(arg="process")
+def find_process_by_path(process_name: str, target_path: str) -> Optional["psutil.Process"]:
     """
     Знаходить процес за ім’ям і шляхом до виконуваного файлу.
 
@@ -327,6 +475,8 @@ def find_process_by_path(process_name: str, target_path: str) -> Optional[psutil
     Raises:
         Exception: Помилки, пов’язані з доступом до процесів або їх пошуком.
     """
+    import psutil
+
     try:
         for proc in psutil.process_iter(['pid', 'name', 'exe']):
             if proc.info['name'].lower() == process_name.lower():
@@ -340,7 +490,8 @@ def find_process_by_path(process_name: str, target_path: str) -> Optional[psutil
         return None
 
 
-def find_all_processes_by_name(process_name: str) -> List[psutil.Process]:
+@traced(arg="process")
+def find_all_processes_by_name(process_name: str) -> List["psutil.Process"]:
     """
     Знаходить усі процеси за їх ім’ям.
 
@@ -353,6 +504,8 @@ def find_all_processes_by_name(process_name: str) -> List[psutil.Process]:
     Raises:
         Exception: Помилки, пов’язані з переглядом процесів.
     """
+    import psutil
+
     processes = []
     try:
         for proc in psutil.process_iter(['pid', 'name']):
@@ -363,6 +516,7 @@ def find_all_processes_by_name(process_name: str) -> List[psutil.Process]:
         return processes
 
 
+@traced()
 def manage_processes(processes_to_kill: List[str], target_dirs: List[str],
                      stop_event: Optional[threading.Event] = None) -> bool:
     """
@@ -379,6 +533,8 @@ def manage_processes(processes_to_kill: List[str], target_dirs: List[str],
     Raises:
         Exception: Помилки, пов’язані з завершенням процесів або доступом до них.
     """
+    import psutil
+
     try:
         if stop_event:
             while not stop_event.is_set():
@@ -441,6 +597,7 @@ def manage_processes(processes_to_kill: List[str], target_dirs: List[str],
         return False
 
 
+@traced()
 def launch_executable(
         executable_name: str,
         target_dir: str,
@@ -457,8 +614,10 @@ def launch_executable(
 
     try:
         print(f"{Fore.CYAN}🚀 Launching {display_name.lower()}...{Style.RESET_ALL}")
-        cmd = command or f'start "" "{executable_path}"'
-        subprocess.Popen(cmd, cwd=target_dir, shell=shell)
+        if command:
+            subprocess.Popen(command, cwd=target_dir, shell=shell)
+        else:
+            platform_layer.launch(executable_path, target_dir)
         print(f"{Fore.GREEN}✓ {display_name} launched successfully!{Style.RESET_ALL}")
         run_spinner(f"{display_name} launched", spinner_duration)
         return True